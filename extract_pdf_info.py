@@ -3,45 +3,16 @@
 Extract relevant information from A220 PDFs for Performance questions
 """
 
-from pypdf import PdfReader
 import json
-import re
+import os
+import sys
 
-def search_pdf_for_keywords(pdf_path, keywords, context_lines=3):
-    """Search PDF for keywords and return matches with context"""
-    try:
-        reader = PdfReader(pdf_path)
-        results = []
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "data"))
 
-        for page_num, page in enumerate(reader.pages, 1):
-            text = page.extract_text()
-            if not text:
-                continue
-
-            lines = text.split('\n')
-            for keyword in keywords:
-                for i, line in enumerate(lines):
-                    if keyword.lower() in line.lower():
-                        # Get context around the match
-                        start = max(0, i - context_lines)
-                        end = min(len(lines), i + context_lines + 1)
-                        context = '\n'.join(lines[start:end])
-
-                        results.append({
-                            'page': page_num,
-                            'keyword': keyword,
-                            'context': context
-                        })
-
-        return results
-    except Exception as e:
-        print(f"Error reading {pdf_path}: {e}")
-        return []
+import pipeline_profile
+from manual_corpus import ManualCorpus
 
 def main():
-    fcom_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
-    ops_manual_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/Operations_Manual_Part_B_A220_TR027.6.pdf"
-
     # Define search keywords for each topic
     search_topics = {
         'PTOW': ['PTOW', 'planned takeoff weight', 'maximum takeoff weight', 'takeoff weight limit'],
@@ -53,35 +24,27 @@ def main():
         'Autopilot': ['autopilot', 'AP', 'autopilot limitation', 'autopilot disconnect', 'minimum altitude']
     }
 
-    print("Searching FCOM...")
-    fcom_results = {}
-    for topic, keywords in search_topics.items():
-        print(f"  Searching for {topic}...")
-        fcom_results[topic] = search_pdf_for_keywords(fcom_path, keywords, context_lines=5)
-
-    print("\nSearching Operations Manual...")
-    ops_results = {}
-    for topic, keywords in search_topics.items():
-        print(f"  Searching for {topic}...")
-        ops_results[topic] = search_pdf_for_keywords(ops_manual_path, keywords, context_lines=5)
+    # Every manual listed in page_references.json is extracted in parallel
+    print("Indexing manuals...")
+    corpus = ManualCorpus.from_page_references().build()
 
-    # Save results
-    output = {
-        'FCOM': fcom_results,
-        'Operations_Manual': ops_results
-    }
+    print("\nSearching all manuals...")
+    output = corpus.search_topics(search_topics, context_lines=5)
 
-    with open('/Users/petruinstagram/Desktop/web-apps/gabi-airbus/quiz-app/pdf_search_results.json', 'w') as f:
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_search_results.json'), 'w') as f:
         json.dump(output, f, indent=2)
 
     print("\nSearch complete. Results saved to pdf_search_results.json")
 
     # Print summary
     print("\n=== SUMMARY ===")
-    for topic in search_topics.keys():
-        fcom_count = len(fcom_results[topic])
-        ops_count = len(ops_results[topic])
-        print(f"{topic}: {fcom_count} matches in FCOM, {ops_count} matches in Ops Manual")
+    for topic, matches in output.items():
+        counts = ', '.join(
+            f"{sum(1 for m in matches if m['pdf'] == doc_id)} matches in {doc_id}"
+            for doc_id in corpus.documents
+        )
+        print(f"{topic}: {counts}")
 
 if __name__ == '__main__':
-    main()
+    with pipeline_profile.profiled_run("extract_pdf_info"):
+        main()
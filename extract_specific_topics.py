@@ -5,6 +5,12 @@ Extract specific performance topics from A220 PDFs - targeted extraction
 
 from pypdf import PdfReader
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "data"))
+
+from manual_corpus import FCOM1_PDF, MANUALS_DIR
 
 def extract_page_text(pdf_path, page_num):
     """Extract text from a specific page"""
@@ -45,8 +51,8 @@ def search_term_in_pdf(pdf_path, search_term, max_pages=50):
         return []
 
 def main():
-    fcom_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
-    ops_manual_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/Operations_Manual_Part_B_A220_TR027.6.pdf"
+    fcom_path = FCOM1_PDF
+    ops_manual_path = os.path.join(MANUALS_DIR, "Operations_Manual_Part_B_A220_TR027.6.pdf")
 
     # Key search terms for each topic
     topics = {
@@ -70,7 +76,7 @@ def main():
         results[f"OpsManual_{topic}"] = search_term_in_pdf(ops_manual_path, term, max_pages=50)
 
     # Save results
-    with open('/Users/petruinstagram/Desktop/web-apps/gabi-airbus/quiz-app/pdf_limited_search.json', 'w') as f:
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_limited_search.json'), 'w') as f:
         json.dump(results, f, indent=2)
 
     print("\n\nSearch complete. Results saved to pdf_limited_search.json")
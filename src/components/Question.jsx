@@ -141,6 +141,8 @@ const Question = ({
               <img
                 src={imageUrl}
                 alt={`Question illustration ${index + 1}`}
+                loading="lazy"
+                decoding="async"
                 className="w-full rounded-lg max-h-96 object-contain bg-slate-800"
                 onError={(e) => {
                   // Show placeholder for failed images
@@ -1,10 +1,33 @@
-import { useState } from 'react'
+import { useState, useEffect, useMemo } from 'react'
+import { loadSearchIndex, loadSourcePages, searchIndex } from '../utils/quizUtils'
+import pageReferencesData from '../data/page_references.json'
 
 function ReviewScreen({ questionResults, onBack }) {
   const [filter, setFilter] = useState('all') // 'all', 'correct', 'incorrect'
   const [expandedQuestion, setExpandedQuestion] = useState(null)
+  const [query, setQuery] = useState('')
+  const [keywordIndex, setKeywordIndex] = useState(null)
+  const [sourcePages, setSourcePages] = useState(null)
+
+  // Fetch the keyword index the first time something is typed
+  useEffect(() => {
+    if (!query.trim() || keywordIndex) return
+    loadSearchIndex().then(setKeywordIndex).catch(() => {})
+  }, [query, keywordIndex])
+
+  // Fetch the pre-rendered source pages the first time a question is expanded
+  useEffect(() => {
+    if (expandedQuestion === null || sourcePages) return
+    loadSourcePages().then(setSourcePages).catch(() => {})
+  }, [expandedQuestion, sourcePages])
+
+  const matchingCodes = useMemo(() => {
+    if (!query.trim() || !keywordIndex) return null
+    return new Set(searchIndex(keywordIndex, query))
+  }, [query, keywordIndex])
 
   const filteredResults = questionResults.filter(result => {
+    if (matchingCodes && !matchingCodes.has(result.question.code)) return false
     if (filter === 'correct') return result.isCorrect
     if (filter === 'incorrect') return !result.isCorrect
     return true
@@ -71,6 +94,15 @@ function ReviewScreen({ questionResults, onBack }) {
           </button>
         </div>
 
+        {/* Keyword Search */}
+        <input
+          type="search"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder="Search questions and explanations (e.g. IASC, waiv)"
+          className="mb-3 flex-shrink-0 w-full px-3 py-2 rounded-lg bg-white/10 text-white text-sm placeholder-gray-400 border border-white/10 focus:outline-none focus:border-blue-500"
+        />
+
         {/* Questions List - Scrollable */}
         <div className="flex-1 min-h-0 overflow-auto space-y-3 pr-1">
         {filteredResults.map((result, index) => {
@@ -134,6 +166,8 @@ function ReviewScreen({ questionResults, onBack }) {
                           key={imgIndex}
                           src={img}
                           alt={`Question ${originalIndex + 1} image ${imgIndex + 1}`}
+                          loading="lazy"
+                          decoding="async"
                           className="rounded-lg max-w-full h-auto bg-white/5 p-2"
                           onError={(e) => {
                             e.target.style.display = 'none'
@@ -185,6 +219,32 @@ function ReviewScreen({ questionResults, onBack }) {
                     })}
                   </div>
 
+                  {/* Cited Source Pages */}
+                  {sourcePages && pageReferencesData.references?.[question.code]?.pages && (
+                    <div className="mt-4 grid grid-cols-1 gap-3">
+                      {pageReferencesData.references[question.code].pages.map((ref) => {
+                        const rendered = sourcePages.pages?.[ref.pdf]?.[ref.page]
+                        if (!rendered) return null
+                        return (
+                          <figure key={`${ref.pdf}-${ref.page}`} className="bg-white/5 rounded-lg p-2 border border-white/10">
+                            <img
+                              src={rendered.image}
+                              width={rendered.width}
+                              height={rendered.height}
+                              alt={`${ref.pdf} page ${ref.page}`}
+                              loading="lazy"
+                              decoding="async"
+                              className="rounded max-w-full h-auto bg-white"
+                            />
+                            <figcaption className="text-xs text-gray-400 mt-1">
+                              {ref.pdf} page {ref.page}
+                            </figcaption>
+                          </figure>
+                        )
+                      })}
+                    </div>
+                  )}
+
                   {/* Answer Summary */}
                   <div className="mt-4 pt-4 border-t border-white/10 text-sm">
                     <p className="text-gray-400">
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Re-grade stored attempts against the current answer key in bulk.
+
+Grading mirrors calculateScore in src/utils/quizUtils.js:
+    single     correct when exactly one letter was selected and the key has
+               exactly one letter, the same one
+    multiple   correct when the selected set equals the key set
+and the attempt score is Math.round(correct / questions * 100), passing
+when score >= passingGrade (Results.jsx).
+
+Answers and keys are option bitmasks (a=1, b=2, c=4, ...). A single
+question answered with more than one letter gets a mask that matches
+nothing, and so does the key of a question no answer can satisfy (a
+`single` question with several correct letters, an unknown type), so
+one vectorized comparison grades every response. Attempts are read in
+chunks and each chunk is graded with NumPy in one pass.
+
+Attempts come from results_service.py's SQLite store or from JSONL in
+either shape item_analysis.py reads. Like calculateScore, the score is
+out of the attempt's question count (its `questions` list,
+`totalQuestions`, or the store's total_questions column), so skipped
+questions count as wrong. Attempts that do not record it are not
+regraded, only counted.
+
+    python3 batch_grader.py --db .fcom_cache/results.sqlite3
+    python3 batch_grader.py attempts.jsonl --old-key quizData.before.json
+    python3 batch_grader.py --db results.sqlite3 --write   # store the new scores
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from array import array
+
+import numpy as np
+
+from explanation_data import QUIZ_DATA, load_json
+from item_analysis import LETTERS
+from manual_corpus import CACHE_DIR
+from results_service import DB_PATH
+
+REPORT_PATH = os.path.join(CACHE_DIR, "regrade_report.json")
+CHUNK_ATTEMPTS = 200_000
+
+NO_ANSWER = 0xFFFE     # selection that can never be correct
+NO_KEY = 0xFFFF        # key that no selection matches
+
+
+def selection_mask(letters, single):
+    if isinstance(letters, str):
+        letters = list(letters)
+    if single and len(letters) != 1:
+        return NO_ANSWER
+    mask = 0
+    for letter in letters:
+        index = LETTERS.find(letter)
+        if index < 0:
+            return NO_ANSWER
+        mask |= 1 << index
+    return mask
+
+
+def answer_key(quiz_data=QUIZ_DATA):
+    """Codes in bank order, their key masks, single-select flags and the passing grade."""
+    data = load_json(quiz_data)
+    codes, keys, single = [], [], []
+    for quiz in data["quizzes"]:
+        for question in quiz["questions"]:
+            correct = question.get("correct") or []
+            is_single = question.get("type") == "single"
+            if (is_single and len(correct) != 1) or question.get("type") not in ("single", "multiple"):
+                key = NO_KEY
+            else:
+                key = 0
+                for letter in correct:
+                    key |= 1 << LETTERS.index(letter)
+            codes.append(question["code"])
+            keys.append(key)
+            single.append(is_single)
+    return codes, np.array(keys, dtype=np.uint16), single, data.get("passingGrade", 75)
+
+
+class Chunk:
+    """Columns for a run of attempts: one entry per response, plus per-attempt fields."""
+
+    def __init__(self, code_index, single):
+        self.code_index = code_index
+        self.single = single
+        self.ids = []
+        self.trainees = []
+        self.totals = array("i")
+        self.stored = array("d")
+        self.attempt = array("i")
+        self.question = array("i")
+        self.masks = array("H")
+        self.skipped = 0
+        self._mask_cache = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, attempt_id, trainee, answers, total, stored_score):
+        if not total:
+            self.skipped += 1  # the denominator is unknown; never guess it from the answers
+            return
+        row = len(self.ids)
+        for code, letters in answers.items():
+            index = self.code_index.get(code)
+            if index is None or letters is None:
+                continue  # unanswered, or no longer in the bank; calculateScore skips both
+            key = (tuple(letters), self.single[index])
+            mask = self._mask_cache.get(key)
+            if mask is None:
+                mask = self._mask_cache[key] = selection_mask(letters, key[1])
+            self.attempt.append(row)
+            self.question.append(index)
+            self.masks.append(mask)
+        self.ids.append(attempt_id)
+        self.trainees.append(trainee)
+        self.totals.append(total)
+        self.stored.append(float("nan") if stored_score is None else stored_score)
+
+    def columns(self):
+        """attempt, question (int32) and selection mask (uint16) per response."""
+        return (np.frombuffer(self.attempt, dtype=np.intc), np.frombuffer(self.question, dtype=np.intc),
+                np.frombuffer(self.masks, dtype=np.uint16))
+
+
+def grade(attempt, question, masks, keys, totals):
+    """Scores (0-100, rounded like Math.round) of every attempt in one pass."""
+    correct = masks == keys[question]
+    counts = np.bincount(attempt, weights=correct, minlength=len(totals))
+    totals = np.asarray(totals, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, np.floor(counts * 100 / totals + 0.5), 0)
+
+
+def _total(record):
+    if isinstance(record.get("questions"), list):
+        return len(record["questions"])
+    return record.get("totalQuestions")
+
+
+def jsonl_chunks(path, code_index, single, size=CHUNK_ATTEMPTS):
+    """Chunks from a JSONL export (per-attempt `answers` or one record per response)."""
+    chunk = Chunk(code_index, single)
+    grouped = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "answers" not in record:
+                key = (record.get("trainee"), record.get("attempt"))
+                answers, total = grouped.setdefault(key, ({}, [None]))
+                answers[record.get("code")] = record.get("selected") or []
+                total[0] = _total(record) or total[0]
+                continue
+            chunk.add(record.get("attempt"), record.get("trainee"), record["answers"],
+                      _total(record), record.get("score"))
+            if len(chunk) >= size:
+                yield chunk
+                chunk = Chunk(code_index, single)
+    for (trainee, attempt_id), (answers, total) in grouped.items():
+        chunk.add(attempt_id, trainee, answers, total[0], None)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = Chunk(code_index, single)
+    if len(chunk):
+        yield chunk
+
+
+def db_chunks(db, code_index, single, size=CHUNK_ATTEMPTS):
+    """Chunks from the results_service.py store."""
+    rows = db.execute("SELECT id, trainee, score, total_questions, answers FROM attempts ORDER BY id")
+    while True:
+        batch = rows.fetchmany(size)
+        if not batch:
+            return
+        chunk = Chunk(code_index, single)
+        for attempt_id, trainee, score, total, answers in batch:
+            chunk.add(attempt_id, trainee, json.loads(answers), total, score)
+        yield chunk
+
+
+def regrade(chunks, key, old_key=None):
+    """Grade each chunk; yields (chunk, new scores, old scores).
+
+    Old scores come from old_key when given, else from the stored score.
+    """
+    codes, keys, _, _ = key
+    if old_key is not None:
+        old_index = {code: i for i, code in enumerate(old_key[0])}
+        # Old key masks in the current bank order; questions new since then cannot score
+        old_keys = np.array([old_key[1][old_index[c]] if c in old_index else NO_KEY for c in codes],
+                            dtype=np.uint16)
+    for chunk in chunks:
+        attempt, question, masks = chunk.columns()
+        new = grade(attempt, question, masks, keys, chunk.totals)
+        if old_key is not None:
+            old = grade(attempt, question, masks, old_keys, chunk.totals)
+        else:
+            old = np.frombuffer(chunk.stored, dtype=np.float64)
+        yield chunk, new, old
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk re-grade stored attempts against quizData.json.")
+    parser.add_argument("exports", nargs="*", help="JSONL attempt exports")
+    parser.add_argument("--db", help=f"results_service.py store (e.g. {DB_PATH})")
+    parser.add_argument("--key", default=QUIZ_DATA, help="current answer key")
+    parser.add_argument("--old-key", help="previous quizData.json to compare against (default: stored scores)")
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument("--write", action="store_true", help="store the new scores in --db")
+    args = parser.parse_args()
+
+    if not args.exports and not args.db:
+        args.db = DB_PATH
+    key = answer_key(args.key)
+    old_key = answer_key(args.old_key) if args.old_key else None
+    passing = key[3]
+    code_index = {code: i for i, code in enumerate(key[0])}
+    unsatisfiable = [code for code, k in zip(key[0], key[1]) if k == NO_KEY]
+
+    single = key[2]
+    sources = [(jsonl_chunks(path, code_index, single), False) for path in args.exports]
+    db = None
+    if args.db:
+        db = sqlite3.connect(args.db)
+        sources.append((db_chunks(db, code_index, single), True))
+
+    graded = 0
+    skipped = 0
+    score_changes = 0
+    changed = []
+    updates = []
+    for source, from_db in sources:
+        for chunk, new, old in regrade(source, key, old_key):
+            graded += len(chunk)
+            skipped += chunk.skipped
+            known = ~np.isnan(old)
+            score_changes += int(np.count_nonzero(known & (new != old)))
+            flipped = np.flatnonzero(known & ((new >= passing) != (old >= passing)))
+            for i in flipped:
+                changed.append({
+                    "attempt": chunk.ids[i], "trainee": chunk.trainees[i],
+                    "oldScore": float(old[i]), "newScore": float(new[i]),
+                    "passed": bool(new[i] >= passing),
+                })
+            if args.write and from_db:
+                updates.extend(zip(new.tolist(), chunk.ids))
+
+    if updates:
+        with db:
+            db.executemany("UPDATE attempts SET score = ? WHERE id = ?", updates)
+    if db is not None:
+        db.close()
+
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump({
+            "passingGrade": passing, "graded": graded, "skippedNoQuestionCount": skipped,
+            "scoreChanges": score_changes,
+            "unsatisfiableQuestions": unsatisfiable, "passFailChanged": changed,
+        }, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 80)
+    print(f"Attempts graded:     {graded}")
+    print(f"Scores changed:      {score_changes}")
+    if skipped:
+        print(f"Not regraded:        {skipped} (no question count recorded)")
+    print(f"Now passing:         {sum(1 for c in changed if c['passed'])}")
+    print(f"Now failing:         {sum(1 for c in changed if not c['passed'])}")
+    if unsatisfiable:
+        print(f"Questions no answer can satisfy: {', '.join(unsatisfiable)}")
+    if updates:
+        print(f"Stored {len(updates)} new scores in {args.db}")
+    print(f"Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
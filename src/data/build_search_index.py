@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Build the client-side keyword search index over the question bank.
+
+Question text, option text and explanations are tokenized the same way the
+browser tokenizes a query (uppercase A-Z/0-9 runs) and written to
+public/search_index.json as:
+
+    codes     question codes; postings refer to positions in this list
+    terms     every distinct token, sorted
+    offsets   postings of terms[i] are postings[offsets[i]:offsets[i + 1]]
+    postings  ascending code positions per term, delta-encoded
+
+A prefix query ("WAIV") is a binary search for the first term >= the
+prefix followed by a walk while terms still start with it; see
+searchIndex() in src/utils/quizUtils.js.
+"""
+
+import argparse
+import json
+import os
+
+from explanation_data import MERGED_EXPLANATIONS, QUIZ_DATA, REPO_DIR, load_json
+from manual_corpus import tokenize
+
+SEARCH_INDEX = os.path.join(REPO_DIR, "public", "search_index.json")
+VERSION = 1
+
+
+def question_texts(quiz_data, explanations):
+    """Yield (code, searchable text) for every question in the bank."""
+    for quiz in quiz_data["quizzes"]:
+        for question in quiz["questions"]:
+            code = question["code"]
+            parts = [code, question.get("text", "")]
+            parts.extend(option.get("text", "") for option in question.get("options", []))
+            explanation = explanations.get(code)
+            if isinstance(explanation, dict):
+                parts.append(explanation.get("explanation") or "")
+            yield code, "\n".join(parts)
+
+
+def build_index(documents):
+    """Sorted term table plus delta-encoded postings for (code, text) pairs."""
+    codes = []
+    postings = {}
+    for position, (code, text) in enumerate(documents):
+        codes.append(code)
+        for term in set(tokenize(text)):
+            postings.setdefault(term, []).append(position)
+
+    terms = sorted(postings)
+    offsets = [0]
+    flat = []
+    for term in terms:
+        previous = 0
+        for position in postings[term]:
+            flat.append(position - previous)
+            previous = position
+        offsets.append(len(flat))
+
+    return {"version": VERSION, "codes": codes, "terms": terms, "offsets": offsets, "postings": flat}
+
+
+def search(index, query):
+    """Python reference of searchIndex(): codes matching every query token as a prefix."""
+    import bisect
+
+    result = None
+    for token in tokenize(query):
+        matches = set()
+        i = bisect.bisect_left(index["terms"], token)
+        while i < len(index["terms"]) and index["terms"][i].startswith(token):
+            position = 0
+            for delta in index["postings"][index["offsets"][i]:index["offsets"][i + 1]]:
+                position += delta
+                matches.add(position)
+            i += 1
+        result = matches if result is None else result & matches
+    return [index["codes"][p] for p in sorted(result or ())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build public/search_index.json from the question bank.")
+    parser.add_argument("--output", default=SEARCH_INDEX)
+    parser.add_argument("--query", help="search the freshly built index and print matching codes")
+    args = parser.parse_args()
+
+    quiz_data = load_json(QUIZ_DATA)
+    explanations = load_json(MERGED_EXPLANATIONS).get("explanations", {})
+    index = build_index(question_texts(quiz_data, explanations))
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    print(f"Questions: {len(index['codes'])}")
+    print(f"Terms:     {len(index['terms'])}")
+    print(f"Postings:  {len(index['postings'])}")
+    print(f"Size:      {os.path.getsize(args.output) / 1024:.1f} KB -> {args.output}")
+
+    if args.query:
+        matches = search(index, args.query)
+        print(f"\n{args.query!r}: {len(matches)} questions")
+        print(", ".join(matches))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Helpers for reading and writing the explanation files.
+
+The files under explanations/ were written in several shapes (code-keyed
+dicts, `explanations`/`questions` dicts or lists of records with a `code`).
+`iter_entries` walks all of them and yields (code, entry) pairs.
+"""
+
+import glob
+import json
+import os
+import re
+import tempfile
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(DATA_DIR))
+EXPLANATIONS_DIR = os.path.join(REPO_DIR, "explanations")
+MERGED_EXPLANATIONS = os.path.join(DATA_DIR, "explanations.json")
+QUIZ_DATA = os.path.join(DATA_DIR, "quizData.json")
+
+CODE_RE = re.compile(r"^\d{0,2}[A-Z]{2,5}\d{1,3}$")
+
+
+def iter_entries(data):
+    """Yield (question code, entry dict) pairs from any explanation file shape."""
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict) and isinstance(item.get("code"), str):
+                yield item["code"], item
+        return
+
+    if not isinstance(data, dict):
+        return
+
+    for key in ("explanations", "questions"):
+        if isinstance(data.get(key), (dict, list)):
+            yield from iter_entries(data[key])
+
+    for key, value in data.items():
+        if CODE_RE.match(key) and isinstance(value, dict):
+            yield key, value
+
+
+def explanation_files(directory=EXPLANATIONS_DIR):
+    """All per-chapter and batch explanation files, in name order."""
+    return sorted(glob.glob(os.path.join(directory, "*.json")))
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    """Write JSON atomically in the same layout as quizData.json/explanations.json."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
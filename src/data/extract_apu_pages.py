@@ -1,24 +1,31 @@
 #!/usr/bin/env python3
 """
-Extract text from APU chapter pages to understand structure.
+Extract header/footer text from APU chapter pages to understand structure.
 """
 
-from pypdf import PdfReader
+from header_scan import load_edges
+from manual_corpus import FCOM1_PDF
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+pdf_path = FCOM1_PDF
 
-reader = PdfReader(pdf_path)
 
-# Check pages around 1403 (where APU chapter was found)
-pages_to_check = list(range(1400, 1510, 5))  # Every 5th page
+def main():
+    edges = load_edges("FCOM1", pdf_path)
 
-for page_num in pages_to_check:
-    if page_num < len(reader.pages):
-        page = reader.pages[page_num - 1]  # Convert to 0-indexed
-        text = page.extract_text()
+    # Check pages around 1403 (where APU chapter was found)
+    pages_to_check = list(range(1400, 1510, 5))  # Every 5th page
 
-        print(f"\n{'='*80}")
-        print(f"PAGE {page_num}")
-        print(f"{'='*80}")
-        print(text[:800])  # First 800 characters
-        print("...")
+    for page_num in pages_to_check:
+        if page_num <= len(edges):
+            edge = edges[page_num - 1]  # Convert to 0-indexed
+
+            print(f"\n{'='*80}")
+            print(f"PAGE {page_num}  markers: {', '.join(edge['markers']) or '-'}")
+            print(f"{'='*80}")
+            print(edge["header"])
+            print("...")
+            print(edge["footer"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Extract figures from the pages referenced in page_references.json and write
+small WebP (or PNG) thumbnails for the quiz.
+
+Two backends:
+
+    embedded   the image XObjects stored in the page, decoded with pypdf (default)
+    render     each image region rendered with pdfplumber, so callouts and
+               labels drawn over a panel picture are kept
+
+Thumbnails are named by content hash (public/figures/<hash>.webp), so the
+same panel referenced from several questions is stored once. Pages are
+split across worker processes; pages already processed with the same
+settings, and thumbnails already on disk, are skipped.
+
+public/figures/manifest.json maps question codes to their figure URLs.
+--write also fills empty `images` arrays in quizData.json with them.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_profile
+from explanation_data import QUIZ_DATA, REPO_DIR, load_json, write_json
+from manual_corpus import CACHE_DIR, PAGE_REFERENCES, ManualCorpus, file_sha1
+
+FIGURES_DIR = os.path.join(REPO_DIR, "public", "figures")
+FIGURES_URL = "/figures"
+MANIFEST = os.path.join(FIGURES_DIR, "manifest.json")
+
+MAX_SIZE = 800        # longest thumbnail side in pixels
+MIN_SIZE = 96         # smaller images are icons, logos or bullets
+RENDER_DPI = 150
+WEBP_QUALITY = 80
+
+
+def thumbnail_format(requested):
+    """WebP when this Pillow build can write it, PNG otherwise."""
+    if requested == "webp":
+        from PIL import features
+        if not features.check("webp"):
+            print("Pillow has no WebP support - writing PNG thumbnails")
+            return "png"
+    return requested
+
+
+def save_thumbnail(image, source_hash, out_dir, max_size, fmt):
+    """Write one thumbnail unless it is already cached; return its manifest record."""
+    name = f"{source_hash}.{fmt}"
+    path = os.path.join(out_dir, name)
+    width, height = image.size
+
+    scale = min(1.0, max_size / max(width, height))
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    if os.path.exists(path):
+        pipeline_profile.count("thumbnails_cached")
+        return {"file": name, "width": size[0], "height": size[1]}
+
+    with pipeline_profile.stage("thumbnail"):
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        if scale < 1.0:
+            image = image.resize(size)
+
+        buffer = io.BytesIO()
+        if fmt == "webp":
+            image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            image.save(buffer, "PNG", optimize=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+    pipeline_profile.count("thumbnails_written")
+    return {"file": name, "width": size[0], "height": size[1]}
+
+
+def source_hash(data, max_size):
+    """Content hash of the source image, salted with the thumbnail size."""
+    digest = hashlib.sha1(data)
+    digest.update(f"@{max_size}".encode())
+    return digest.hexdigest()[:20]
+
+
+def _embedded_images(pdf_path, pages):
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    for page_num in pages:
+        images = []
+        with pipeline_profile.stage("extract_images", pages=1):
+            try:
+                for image_file in reader.pages[page_num - 1].images:
+                    images.append((image_file.data, image_file.image))
+            except Exception as e:
+                print(f"Page {page_num}: could not decode images ({e})")
+        yield page_num, images
+
+
+def _rendered_images(pdf_path, pages):
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in pages:
+            page = pdf.pages[page_num - 1]
+            images = []
+            with pipeline_profile.stage("render", pages=1):
+                for obj in page.images:
+                    bbox = (
+                        max(obj["x0"], 0), max(obj["top"], 0),
+                        min(obj["x1"], page.width), min(obj["bottom"], page.height),
+                    )
+                    if bbox[2] - bbox[0] < 1 or bbox[3] - bbox[1] < 1:
+                        continue
+                    image = page.crop(bbox).to_image(resolution=RENDER_DPI).original
+                    images.append((image.tobytes() + repr(image.size).encode(), image))
+            page.flush_cache()
+            yield page_num, images
+
+
+BACKENDS = {"embedded": _embedded_images, "render": _rendered_images}
+
+
+def _extract_chunk(backend, doc_id, pdf_path, pages, out_dir, max_size, fmt):
+    figures = {}
+    with pipeline_profile.worker_profile(f"figures {doc_id} {pages[0]}-{pages[-1]}") as profile:
+        for page_num, images in BACKENDS[backend](pdf_path, pages):
+            records = []
+            for data, image in images:
+                if min(image.size) < MIN_SIZE:
+                    pipeline_profile.count("images_too_small")
+                    continue
+                record = save_thumbnail(image, source_hash(data, max_size), out_dir, max_size, fmt)
+                if record["file"] not in (r["file"] for r in records):
+                    records.append(record)
+            figures[page_num] = records
+    return doc_id, figures, profile.to_dict()
+
+
+def referenced_pages(page_references=PAGE_REFERENCES):
+    """PDF ID -> {page: [question codes]} for every page reference."""
+    references = load_json(page_references)["references"]
+    pages = {}
+    for code, reference in references.items():
+        for ref in reference.get("pages", []):
+            if isinstance(ref.get("page"), int):
+                pages.setdefault(ref["pdf"], {}).setdefault(ref["page"], []).append(code)
+    return pages
+
+
+def load_page_cache(doc_id, digest, settings, cache_dir=CACHE_DIR):
+    """Per-page figure lists from a previous run with the same PDF and settings."""
+    path = os.path.join(cache_dir, f"{doc_id}.figures.json")
+    if os.path.exists(path):
+        cached = load_json(path)
+        if cached.get("sha1") == digest and cached.get("settings") == settings:
+            return cached["pages"]
+    return {}
+
+
+def save_page_cache(doc_id, digest, settings, pages, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, f"{doc_id}.figures.json"), "w", encoding="utf-8") as f:
+        json.dump({"sha1": digest, "settings": settings, "pages": pages}, f)
+
+
+def extract_figures(backend="embedded", fmt="webp", max_size=MAX_SIZE, out_dir=FIGURES_DIR,
+                    workers=None, chunk_size=20, pdfs=None):
+    """Thumbnail every figure on the referenced pages; return (manifest, page -> codes map)."""
+    fmt = thumbnail_format(fmt)
+    settings = {"backend": backend, "format": fmt, "maxSize": max_size, "minSize": MIN_SIZE}
+    manuals = ManualCorpus.from_page_references().manuals
+    wanted = referenced_pages()
+    os.makedirs(out_dir, exist_ok=True)
+
+    page_figures = {}
+    jobs = []
+    digests = {}
+    for doc_id, pages in wanted.items():
+        if pdfs and doc_id not in pdfs:
+            continue
+        pdf_path = manuals.get(doc_id)
+        if not pdf_path or not os.path.exists(pdf_path):
+            print(f"{doc_id}: PDF not found, skipping")
+            continue
+
+        digests[doc_id] = file_sha1(pdf_path)
+        cached = load_page_cache(doc_id, digests[doc_id], settings)
+        page_figures[doc_id] = {}
+        todo = []
+        for page_num in sorted(pages):
+            records = cached.get(str(page_num))
+            if records is not None and all(os.path.exists(os.path.join(out_dir, r["file"])) for r in records):
+                page_figures[doc_id][str(page_num)] = records
+                pipeline_profile.count("pages_cached")
+            else:
+                todo.append(page_num)
+
+        print(f"{doc_id}: {len(pages)} referenced pages, {len(todo)} to extract")
+        for start in range(0, len(todo), chunk_size):
+            jobs.append((doc_id, pdf_path, todo[start:start + chunk_size]))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_extract_chunk, backend, doc_id, pdf_path, pages, out_dir, max_size, fmt)
+                for doc_id, pdf_path, pages in jobs
+            ]
+            for future in futures:
+                doc_id, figures, profile = future.result()
+                pipeline_profile.merge(profile)
+                for page_num, records in figures.items():
+                    page_figures[doc_id][str(page_num)] = records
+
+    for doc_id, pages in page_figures.items():
+        save_page_cache(doc_id, digests[doc_id], settings, pages)
+
+    return build_manifest(page_figures, wanted, settings), wanted
+
+
+def build_manifest(page_figures, wanted, settings):
+    """Figure metadata by file name and figure URLs by question code."""
+    figures = {}
+    questions = {}
+    for doc_id, pages in page_figures.items():
+        for page_num, records in sorted(pages.items(), key=lambda item: int(item[0])):
+            for record in records:
+                figure = figures.setdefault(record["file"], {
+                    "width": record["width"], "height": record["height"], "sources": [],
+                })
+                figure["sources"].append({"pdf": doc_id, "page": int(page_num)})
+                for code in wanted[doc_id][int(page_num)]:
+                    urls = questions.setdefault(code, [])
+                    url = f"{FIGURES_URL}/{record['file']}"
+                    if url not in urls:
+                        urls.append(url)
+    return {
+        "settings": settings,
+        "figures": figures,
+        "questions": dict(sorted(questions.items())),
+    }
+
+
+def attach_to_questions(manifest, max_per_question, quiz_data=QUIZ_DATA):
+    """Fill empty `images` arrays in quizData.json; returns the number of questions changed."""
+    data = load_json(quiz_data)
+    changed = 0
+    for quiz in data["quizzes"]:
+        for question in quiz["questions"]:
+            urls = manifest["questions"].get(question["code"])
+            if urls and not question.get("images"):
+                question["images"] = urls[:max_per_question]
+                changed += 1
+    if changed:
+        write_json(quiz_data, data)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract thumbnails of figures on referenced manual pages.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="embedded")
+    parser.add_argument("--format", choices=["webp", "png"], default="webp")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--pdf", action="append", help="only this manual (repeatable)")
+    parser.add_argument("--write", action="store_true", help="fill empty question images in quizData.json")
+    parser.add_argument("--max-per-question", type=int, default=2)
+    args = parser.parse_args()
+
+    with pipeline_profile.profiled_run("extract_figures"):
+        manifest, _ = extract_figures(args.backend, args.format, args.max_size,
+                                      workers=args.workers, pdfs=args.pdf)
+
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 80)
+    print(f"Figures:   {len(manifest['figures'])}")
+    print(f"Questions: {len(manifest['questions'])}")
+    print(f"Manifest saved to: {MANIFEST}")
+
+    if args.write:
+        changed = attach_to_questions(manifest, args.max_per_question)
+        print(f"Updated images of {changed} questions in {QUIZ_DATA}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Chapter and section lookup from the FCOM bookmark outline and page labels.
+
+Reads only PDF metadata (the outline tree and the /PageLabels table), never
+page text, so it cannot land on a table-of-contents page the way the
+text-scanning chapter finders did. The result maps every chapter and
+section to its first PDF page and can regenerate `_meta.chapters` in
+page_references.json.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from manual_corpus import CACHE_DIR, PAGE_REFERENCES, file_sha1
+
+LABEL_RE = re.compile(r"^\s*(\d{2})\s*[−–-]\s*(\d{2})(?:\s*[−–-]\s*(\d{1,3}))?")
+TITLE_NUMBER_RE = re.compile(r"^\s*(?:CHAPTER\s+)?(\d{2})(?:\s*[−–-]\s*(\d{2}))?\b[\s.:−–-]*(.*)$", re.IGNORECASE)
+CHAPTERS_BLOCK_RE = re.compile(r'(\n(\s*)"chapters": \{\n)(.*?)(\n\s*\})', re.DOTALL)
+
+
+def outline_entries(reader):
+    """Flatten the bookmark tree into (depth, title, 1-based page) tuples."""
+    entries = []
+
+    def walk(items, depth):
+        for item in items:
+            if isinstance(item, list):
+                walk(item, depth + 1)
+                continue
+            try:
+                page = reader.get_destination_page_number(item) + 1
+            except Exception:
+                continue
+            entries.append((depth, str(item.title).strip(), page))
+
+    walk(reader.outline, 0)
+    return entries
+
+
+def page_labels(reader):
+    """Printed label of every page ("04−01−1", "iii", ...); index 0 is PDF page 1."""
+    try:
+        return list(reader.page_labels)
+    except Exception:
+        return [str(i) for i in range(1, len(reader.pages) + 1)]
+
+
+def label_numbers(label):
+    """(chapter, section) numbers from a page label such as 04−01−1."""
+    match = LABEL_RE.match(label or "")
+    return (match.group(1), match.group(2)) if match else (None, None)
+
+
+def title_numbers(title):
+    """(chapter, section, remaining title) from titles like "04 Auxiliary Power Unit"."""
+    match = TITLE_NUMBER_RE.match(title)
+    if not match:
+        return None, None, title
+    return match.group(1), match.group(2), match.group(3).strip() or title
+
+
+def first_pages(labels):
+    """Label -> first PDF page printed with it."""
+    pages = {}
+    for page, label in enumerate(labels, 1):
+        pages.setdefault(label, page)
+    return pages
+
+
+def build_outline_map(reader):
+    """Chapter/section -> first PDF page, from outline entries and page labels."""
+    labels = page_labels(reader)
+    entries = outline_entries(reader)
+
+    chapters = {}
+    sections = {}
+    for depth, title, page in entries:
+        chapter, section, name = title_numbers(title)
+        label_chapter, label_section = label_numbers(labels[page - 1] if page <= len(labels) else "")
+        chapter = chapter or label_chapter
+        section = section or label_section
+        if not chapter:
+            continue
+
+        known = chapters.get(chapter)
+        # The shallowest outline entry for a chapter is the chapter itself
+        if known is None or depth < known["depth"] or (depth == known["depth"] and page < known["startPage"]):
+            chapters[chapter] = {"title": name, "startPage": page, "depth": depth}
+
+        if section and section != "00":
+            key = f"{chapter}-{section}"
+            if key not in sections or page < sections[key]["startPage"]:
+                sections[key] = {"title": name, "startPage": page}
+
+    # Label ranges give a start page even for chapters without a bookmark
+    for page, label in enumerate(labels, 1):
+        chapter, section = label_numbers(label)
+        if not chapter:
+            continue
+        chapters.setdefault(chapter, {"title": None, "startPage": page, "depth": None})
+        if section and section != "00":
+            sections.setdefault(f"{chapter}-{section}", {"title": None, "startPage": page})
+
+    return {
+        "chapters": {number: chapters[number] for number in sorted(chapters)},
+        "sections": {key: sections[key] for key in sorted(sections)},
+        "labels": first_pages(labels),
+    }
+
+
+def load_outline_map(pdf_path=None, doc_id="FCOM1", cache_dir=CACHE_DIR):
+    """Outline map of a manual (FCOM1 by default), cached by PDF content hash."""
+    from pypdf import PdfReader
+
+    if pdf_path is None:
+        from manual_corpus import FCOM1_PDF as pdf_path
+
+    digest = file_sha1(pdf_path)
+    cache_path = os.path.join(cache_dir, f"{doc_id}.outline.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("sha1") == digest:
+            return cached
+
+    outline_map = build_outline_map(PdfReader(pdf_path))
+    outline_map["sha1"] = digest
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(outline_map, f, ensure_ascii=False)
+    return outline_map
+
+
+def chapter_code(number, title, existing):
+    """Keep the existing code for a chapter number (04 -> 04APU), else derive one."""
+    for code in existing:
+        if code.startswith(number):
+            return code
+    letters = re.sub(r"[^A-Z]", "", (title or "").upper())
+    return number + (letters[:3] or "XXX")
+
+
+def regenerate_chapters(outline_map, existing):
+    """New `_meta.chapters` dict: outline start pages, existing codes and names."""
+    chapters = {}
+    for number, chapter in outline_map["chapters"].items():
+        code = chapter_code(number, chapter["title"], existing)
+        title = chapter["title"] or code
+        name = existing.get(code, {}).get("name") or (title.title() if title.isupper() else title)
+        chapters[code] = {"name": name, "startPage": chapter["startPage"]}
+
+    # Chapters the outline does not cover are kept as they were
+    for code, chapter in existing.items():
+        chapters.setdefault(code, chapter)
+    return dict(sorted(chapters.items(), key=lambda item: item[1]["startPage"]))
+
+
+def write_meta_chapters(chapters, path=PAGE_REFERENCES):
+    """Rewrite only the `_meta.chapters` block, keeping the file's one-line-per-entry layout."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    match = CHAPTERS_BLOCK_RE.search(text)
+    if not match:
+        raise ValueError(f"No _meta.chapters block found in {path}")
+
+    indent = match.group(2) + "  "
+    lines = [
+        f'{indent}{json.dumps(code)}: {json.dumps(chapter, ensure_ascii=False)}'
+        for code, chapter in chapters.items()
+    ]
+    text = text[:match.start(3)] + ",\n".join(lines) + text[match.end(3):]
+
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S") + time.strftime("%z")[:3] + ":" + time.strftime("%z")[3:]
+    text = re.sub(r'("lastUpdated": )"[^"]*"', lambda m: f'{m.group(1)}"{timestamp}"', text, count=1)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FCOM chapter/section page map from PDF metadata.")
+    parser.add_argument("--pdf", help="FCOM1 PDF (default: the configured manuals directory)")
+    parser.add_argument("--write", action="store_true", help="regenerate _meta.chapters in page_references.json")
+    args = parser.parse_args()
+
+    outline_map = load_outline_map(args.pdf)
+    with open(PAGE_REFERENCES, encoding="utf-8") as f:
+        existing = json.load(f)["_meta"]["chapters"]
+    chapters = regenerate_chapters(outline_map, existing)
+
+    print("=" * 80)
+    print("CHAPTERS (from outline and page labels)")
+    print("=" * 80)
+    for code, chapter in chapters.items():
+        old = existing.get(code, {}).get("startPage")
+        moved = f"  (was {old})" if old is not None and old != chapter["startPage"] else ""
+        print(f"{code:6s} page {chapter['startPage']:5d}  {chapter['name']}{moved}")
+    print(f"\n{len(outline_map['sections'])} sections, {len(outline_map['labels'])} page labels")
+
+    if args.write:
+        write_meta_chapters(chapters)
+        print(f"\nUpdated _meta.chapters in {PAGE_REFERENCES}")
+
+
+if __name__ == "__main__":
+    main()
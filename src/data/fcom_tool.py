@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+One entry point for the manual and explanation tools.
+
+    python3 fcom_tool.py extract [--pdf FCOM1] [--ocr]   page text -> .fcom_cache/<PDF>.corpus
+    python3 fcom_tool.py index [--pdf FCOM1]             positional, heading, cross-reference
+                                                         and term-statistics indexes
+    python3 fcom_tool.py search "MAN RATE" [--query]     search the cached page text
+    python3 fcom_tool.py map-references [--write]        textual page fields -> page numbers
+    python3 fcom_tool.py validate                        question bank and explanation checks
+    python3 fcom_tool.py merge [--write | --watch]       rebuild src/data/explanations.json
+
+Every backend is imported inside the command that needs it, so pypdf,
+pdfplumber (with pdfminer and Pillow) and NumPy are only loaded when a
+PDF is actually read; searching cached text starts in a few tens of
+milliseconds. Manual and cache locations come from --manuals-dir and
+--cache-dir, else from the FCOM_* environment or fcom_config.json (see
+manual_corpus).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+def _manuals(pdfs=None):
+    """doc_id -> PDF path of the manuals in page_references.json that exist here."""
+    from manual_corpus import ManualCorpus
+
+    manuals = {}
+    for doc_id, path in ManualCorpus.from_page_references().manuals.items():
+        if pdfs and doc_id not in pdfs:
+            continue
+        if not os.path.exists(path):
+            print(f"Skipping {doc_id}: file not found at {path}")
+            continue
+        manuals[doc_id] = path
+    return manuals
+
+
+def _corpus(pdfs=None):
+    """Indexed ManualCorpus restricted to the given manuals."""
+    from manual_corpus import ManualCorpus
+
+    corpus = ManualCorpus.from_page_references()
+    if pdfs:
+        corpus.manuals = {doc_id: path for doc_id, path in corpus.manuals.items() if doc_id in pdfs}
+    return corpus.build()
+
+
+def _extract_one(doc_id, pdf_path):
+    import pipeline_profile
+    from manual_corpus import ensure_page_corpus
+
+    with pipeline_profile.worker_profile(doc_id) as profile:
+        _, _, pages = ensure_page_corpus(doc_id, pdf_path)
+    return doc_id, pages is not None, profile.to_dict()
+
+
+def extract(args):
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pipeline_profile
+
+    manuals = _manuals(args.pdf)
+    with pipeline_profile.profiled_run("extract"):
+        with ProcessPoolExecutor(max_workers=args.workers or len(manuals) or None) as pool:
+            futures = [pool.submit(_extract_one, doc_id, path) for doc_id, path in manuals.items()]
+            for future in futures:
+                doc_id, extracted, profile = future.result()
+                pipeline_profile.merge(profile)
+                print(f"{doc_id}: {'extracted' if extracted else 'up to date'}")
+
+        if args.ocr:
+            from ocr_pages import ocr_manual
+
+            for doc_id, path in manuals.items():
+                ocr_manual(doc_id, path, workers=args.workers)
+
+
+def index(args):
+    import pipeline_profile
+    from page_query import load_positional_index
+    from resolve_section_pages import build_heading_index
+    from search_terms import load_term_stats
+    from xref_graph import load_xref_graph
+
+    with pipeline_profile.profiled_run("index"):
+        corpus = _corpus(args.pdf)
+        for doc_id, doc in corpus.documents.items():
+            load_positional_index(doc_id, doc["pages"])
+            headings = build_heading_index(doc)
+            graph = load_xref_graph(doc)
+            load_term_stats(doc_id, doc["pages"])
+            print(f"{doc_id}: {len(headings['headings'])} headings, {len(headings['markers'])} page markers, "
+                  f"{sum(len(t) for t in graph.edges.values())} cross-references")
+
+
+def search(args):
+    from manual_corpus import open_page_corpus
+
+    t0 = time.perf_counter()
+    hits = 0
+    for doc_id, path in _manuals(args.pdf).items():
+        with open_page_corpus(doc_id, path) as corpus:
+            if args.query:
+                from page_query import load_positional_index
+
+                pages = load_positional_index(doc_id, corpus).search(" ".join(args.terms))
+                terms = []
+            else:
+                from query_cache import cached_find_pages
+
+                terms = args.terms
+                pages = sorted(set().union(*(cached_find_pages(corpus, term) for term in terms)))
+            for page in pages[:args.limit]:
+                lines = [line.strip() for line in corpus.page_text(page).split("\n")
+                         if any(term.lower() in line.lower() for term in terms)]
+                print(f"{doc_id} p.{page}" + (f": {lines[0][:100]}" if lines else ""))
+            hits += len(pages)
+    print(f"{hits} pages in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+def map_references(args):
+    import json
+
+    from explanation_data import MERGED_EXPLANATIONS, explanation_files
+    from manual_corpus import CACHE_DIR
+    from resolve_section_pages import SectionResolver, build_heading_index, chapter_ranges, resolve_files
+
+    corpus = _corpus(args.pdf)
+    chapters = chapter_ranges()
+    resolvers = {
+        doc_id: SectionResolver(build_heading_index(doc), chapters if doc_id == "FCOM1" else None)
+        for doc_id, doc in corpus.documents.items()
+    }
+    report = resolve_files([MERGED_EXPLANATIONS] + explanation_files(), resolvers, args.min_confidence, args.write)
+
+    path = os.path.join(CACHE_DIR, "section_pages_report.json")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resolved: {len(report['resolved'])}, unresolved: {len(report['unresolved'])}, "
+          f"unknown manual: {len(report['unknownManual'])} (report: {path})")
+    if not args.write:
+        print("Dry run - re-run with --write to update the explanation files")
+
+
+def validate(args):
+    from merge_explanations import ExplanationMerger, print_problems
+    from stream_bank import validate_bank
+
+    problems = validate_bank(args.bank)
+    count = 0
+    while True:
+        try:
+            quiz_name, code, problem = next(problems)
+        except StopIteration as stop:
+            total = stop.value
+            break
+        count += 1
+        print(f"  {quiz_name} {code or '-'}: {problem}")
+    print(f"Question bank: {total} questions, {count} problems")
+
+    merger = ExplanationMerger().load()
+    merger.rebuild()
+    explanation_problems = merger.validate(merger.all_codes() | set(merger.questions))
+    print(f"Explanations: {len(merger.all_codes())} codes, {len(explanation_problems)} problems")
+    print_problems(explanation_problems)
+    return 1 if count or explanation_problems else 0
+
+
+def merge(args):
+    from explanation_data import MERGED_EXPLANATIONS
+    from merge_explanations import ExplanationMerger, watch
+
+    merger = ExplanationMerger().load()
+    if args.watch:
+        try:
+            watch(merger, args.interval)
+        except KeyboardInterrupt:
+            print("\nStopped")
+        return
+
+    changed = merger.rebuild()
+    print(f"Changed: {len(changed)} merged entries differ from the file sources")
+    if args.write and changed:
+        merger.write()
+        print(f"Updated {len(changed)} entries in {MERGED_EXPLANATIONS}")
+    elif changed:
+        print("Dry run - re-run with --write to update the merged file")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manual extraction, search and explanation tools.")
+    parser.add_argument("--manuals-dir", help="directory holding the PDFs")
+    parser.add_argument("--cache-dir", help="extracted text and index cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("extract", help="extract (or reuse) the page text of every manual")
+    p.add_argument("--pdf", action="append", help="only this manual (repeatable)")
+    p.add_argument("--ocr", action="store_true", help="also OCR pages without text (needs tesseract)")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(handler=extract)
+
+    p = sub.add_parser("index", help="build every index over the extracted text")
+    p.add_argument("--pdf", action="append")
+    p.set_defaults(handler=index)
+
+    p = sub.add_parser("search", help="find pages in the cached text")
+    p.add_argument("terms", nargs="+", help="substrings (any of them), or one page_query expression")
+    p.add_argument("--query", action="store_true", help="treat the terms as a page_query.py query")
+    p.add_argument("--pdf", action="append")
+    p.add_argument("--limit", type=int, default=20, help="pages shown per manual")
+    p.set_defaults(handler=search)
+
+    p = sub.add_parser("map-references", help="resolve textual page fields to page numbers")
+    p.add_argument("--pdf", action="append")
+    p.add_argument("--min-confidence", type=float, default=0.5)
+    p.add_argument("--write", action="store_true")
+    p.set_defaults(handler=map_references)
+
+    p = sub.add_parser("validate", help="check the question bank and the explanations")
+    p.add_argument("--bank", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "quizData.json"))
+    p.set_defaults(handler=validate)
+
+    p = sub.add_parser("merge", help="merge explanations/*.json into explanations.json")
+    p.add_argument("--write", action="store_true")
+    p.add_argument("--watch", action="store_true")
+    p.add_argument("--interval", type=float, default=0.25)
+    p.set_defaults(handler=merge)
+
+    args = parser.parse_args(argv)
+    # Read by manual_corpus at import, so set before any command imports it
+    if args.manuals_dir:
+        os.environ["FCOM_MANUALS_DIR"] = os.path.abspath(args.manuals_dir)
+    if args.cache_dir:
+        os.environ["FCOM_CACHE_DIR"] = os.path.abspath(args.cache_dir)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,39 @@
 #!/usr/bin/env python3
 """
 Find the actual APU chapter location in the PDF.
-"""
-
-from pypdf import PdfReader
-
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
 
-reader = PdfReader(pdf_path)
-total_pages = len(reader.pages)
-
-print(f"Total pages: {total_pages}")
-print("Searching for APU chapter markers...\n")
-
-apu_mentions = []
+Uses the bookmark outline and page labels (see fcom_outline.py) rather than
+scanning page text, so table-of-contents pages can no longer be mistaken
+for the chapter start.
+"""
 
-for page_num in range(total_pages):
-    if page_num % 200 == 0:
-        print(f"Searching page {page_num + 1}/{total_pages}...")
+from fcom_outline import load_outline_map
+from manual_corpus import FCOM1_PDF
 
-    page = reader.pages[page_num]
-    text = page.extract_text()
+pdf_path = FCOM1_PDF
 
-    if text:
-        text_upper = text.upper()
-        actual_page = page_num + 1
 
-        # Look for chapter markers
-        if ("04APU" in text or "04 APU" in text or
-            ("CHAPTER 04" in text_upper and "APU" in text_upper) or
-            ("04−0" in text and "APU" in text_upper)):
+def main():
+    outline_map = load_outline_map(pdf_path)
+    chapter = outline_map["chapters"].get("04")
 
-            # Extract a snippet
-            lines = text.split('\n')
-            snippet = ' '.join(lines[:5])[:200]
+    if chapter is None:
+        print("Chapter 04 not found in the outline or page labels")
+        return
 
-            apu_mentions.append({
-                "page": actual_page,
-                "snippet": snippet
-            })
+    print(f"{'='*80}")
+    print(f"APU chapter (04) starts at page {chapter['startPage']}: {chapter['title'] or '-'}")
+    print(f"{'='*80}")
 
-            if len(apu_mentions) <= 20:  # Only print first 20
-                print(f"\nPage {actual_page}:")
-                print(f"  {snippet[:150]}")
+    print("\nSections:")
+    for key, section in outline_map["sections"].items():
+        if key.startswith("04-"):
+            print(f"  {key}  page {section['startPage']:5d}  {section['title'] or '-'}")
 
-print(f"\n{'='*80}")
-print(f"Found {len(apu_mentions)} pages mentioning APU chapter markers")
-print(f"{'='*80}")
+    later = [c["startPage"] for number, c in outline_map["chapters"].items() if number > "04"]
+    if later:
+        print(f"\nNext chapter starts at page {min(later)}")
 
-# Find the most likely chapter start (look for page numbers like 04-01-1, etc.)
-likely_starts = []
-for mention in apu_mentions:
-    if "04−01" in mention["snippet"] or "04−00" in mention["snippet"]:
-        likely_starts.append(mention)
 
-print("\nMost likely APU chapter starts:")
-for start in likely_starts[:10]:
-    print(f"  Page {start['page']}: {start['snippet'][:100]}")
+if __name__ == "__main__":
+    main()
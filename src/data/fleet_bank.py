@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Question banks for several fleets, partitioned by fleet and chapter.
+
+    banks/
+      manifest.json              fleets, their manuals and exam settings, partition list
+      A220-300/
+        chapters.json            chapter -> question codes
+        02AIR.jsonl              one question per line
+        02AIR.index.json         code -> [byte offset, length] in 02AIR.jsonl
+        ...
+
+A chapter is one quiz of the source bank and is named after the question
+code prefix most of its questions share (02AIR, 03AFL, PERF). Opening a
+fleet reads the manifest and that fleet's chapters.json; a partition's
+index and records are only read when a question of that chapter is asked
+for, and single questions are read with one seek.
+
+    python3 fleet_bank.py import A220-300 quizData.json --manual FCOM1=A220-300_FCOM1.pdf
+    python3 fleet_bank.py validate A220-300
+    python3 fleet_bank.py export A220-300 quizData.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+from collections import Counter
+
+from explanation_data import DATA_DIR, QUIZ_DATA, load_json, write_json
+from stream_bank import BankWriter, stream_events, validate_question
+
+BANKS_DIR = os.path.join(DATA_DIR, "banks")
+MANIFEST = "manifest.json"
+CHAPTER_PREFIX_RE = re.compile(r"^\d{0,2}[A-Z]+")
+FLEET_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def chapter_prefix(code):
+    """Chapter part of a question code: 02AIR38 -> 02AIR, PERF06 -> PERF."""
+    match = CHAPTER_PREFIX_RE.match(code or "")
+    return match.group(0) if match else "MISC"
+
+
+def load_manifest(root=BANKS_DIR):
+    path = os.path.join(root, MANIFEST)
+    return load_json(path) if os.path.exists(path) else {"version": 1, "fleets": {}}
+
+
+def import_bank(fleet, source=QUIZ_DATA, root=BANKS_DIR, manuals=None):
+    """Partition a quizData-style bank into one fleet's chapter files, streaming it."""
+    if not FLEET_RE.match(fleet):
+        raise ValueError(f"invalid fleet id {fleet!r}")
+    fleet_dir = os.path.join(root, fleet)
+    os.makedirs(fleet_dir, exist_ok=True)
+
+    partitions = {}
+    chapters = {}
+    settings = {}
+    partial = None
+
+    for kind, key, value in stream_events(source):
+        if kind == "meta":
+            settings[key] = value
+        elif kind == "quiz":
+            partial = _PartitionWriter(fleet_dir, key)
+        elif kind == "question":
+            partial.add(value)
+        else:
+            chapter, entry, codes = partial.finish(value, taken=partitions)
+            partitions[chapter] = entry
+            chapters[chapter] = codes
+
+    write_json(os.path.join(fleet_dir, "chapters.json"), chapters)
+
+    # Drop partitions left over from an earlier import of this fleet
+    keep = {f"{chapter}.jsonl" for chapter in partitions} | {f"{chapter}.index.json" for chapter in partitions}
+    for name in os.listdir(fleet_dir):
+        if (name.endswith(".jsonl") or name.endswith(".index.json")) and name not in keep:
+            os.unlink(os.path.join(fleet_dir, name))
+
+    manifest = load_manifest(root)
+    previous = manifest["fleets"].get(fleet, {})
+    manifest["fleets"][fleet] = {
+        "manuals": manuals if manuals is not None else previous.get("manuals", {}),
+        "settings": settings,
+        "partitions": partitions,
+    }
+    write_json(os.path.join(root, MANIFEST), manifest)
+    return manifest["fleets"][fleet]
+
+
+class _PartitionWriter:
+    """Writes one quiz to a temporary JSONL file while recording offsets."""
+
+    def __init__(self, fleet_dir, index):
+        self.fleet_dir = fleet_dir
+        self.tmp_path = os.path.join(fleet_dir, f".partition-{index}.jsonl.tmp")
+        self.f = open(self.tmp_path, "wb")
+        self.digest = hashlib.sha1()
+        self.offsets = {}
+        self.prefixes = Counter()
+
+    def add(self, question):
+        line = (json.dumps(question, ensure_ascii=False) + "\n").encode("utf-8")
+        self.offsets[question["code"]] = [self.f.tell(), len(line)]
+        self.f.write(line)
+        self.digest.update(line)
+        self.prefixes[chapter_prefix(question["code"])] += 1
+
+    def finish(self, header, taken):
+        self.f.close()
+        chapter = self.prefixes.most_common(1)[0][0] if self.prefixes else "MISC"
+        base = chapter
+        suffix = 2
+        while chapter in taken:
+            chapter = f"{base}-{suffix}"
+            suffix += 1
+
+        os.replace(self.tmp_path, os.path.join(self.fleet_dir, f"{chapter}.jsonl"))
+        with open(os.path.join(self.fleet_dir, f"{chapter}.index.json"), "w", encoding="utf-8") as f:
+            json.dump(self.offsets, f, ensure_ascii=False)
+
+        entry = {key: value for key, value in header.items() if key != "questions"}
+        entry.update({"file": f"{chapter}.jsonl", "count": len(self.offsets), "sha1": self.digest.hexdigest()})
+        return chapter, entry, list(self.offsets)
+
+
+class FleetBank:
+    """One fleet's partitions; other fleets' files are never opened."""
+
+    def __init__(self, fleet, root=BANKS_DIR):
+        manifest = load_manifest(root)
+        if fleet not in manifest["fleets"]:
+            raise KeyError(f"unknown fleet {fleet!r}; known: {', '.join(sorted(manifest['fleets'])) or 'none'}")
+        self.fleet = fleet
+        self.dir = os.path.join(root, fleet)
+        info = manifest["fleets"][fleet]
+        self.manuals = info.get("manuals", {})
+        self.settings = info.get("settings", {})
+        self.partitions = info["partitions"]
+        self.chapters = load_json(os.path.join(self.dir, "chapters.json"))
+        self.chapter_of = {code: chapter for chapter, codes in self.chapters.items() for code in codes}
+        self._indexes = {}
+
+    def index(self, chapter):
+        """code -> [offset, length] of one partition, loaded on first use."""
+        if chapter not in self._indexes:
+            self._indexes[chapter] = load_json(os.path.join(self.dir, f"{chapter}.index.json"))
+        return self._indexes[chapter]
+
+    def _path(self, chapter):
+        return os.path.join(self.dir, self.partitions[chapter]["file"])
+
+    def get(self, code):
+        """One question, read with a single seek."""
+        chapter = self.chapter_of[code]
+        return self.read(chapter, [code])[0]
+
+    def read(self, chapter, codes):
+        """Questions of one chapter by code, in the order given."""
+        index = self.index(chapter)
+        questions = []
+        with open(self._path(chapter), "rb") as f:
+            for code in codes:
+                offset, length = index[code]
+                f.seek(offset)
+                questions.append(json.loads(f.read(length)))
+        return questions
+
+    def iter_chapter(self, chapter):
+        with open(self._path(chapter), encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def select(self, selection=None, seed=None):
+        """Random exam draw: `selection` maps quiz name (or chapter) -> count.
+
+        Only the drawn records are read from each partition.
+        """
+        selection = selection if selection is not None else self.settings.get("selection", {})
+        rng = random.Random(seed)
+        drawn = []
+        for chapter, partition in self.partitions.items():
+            count = selection.get(partition.get("name"), selection.get(chapter, 0))
+            codes = self.chapters[chapter]
+            if count > 0 and codes:
+                drawn.extend(self.read(chapter, rng.sample(codes, min(count, len(codes)))))
+        rng.shuffle(drawn)
+        return drawn
+
+    def validate(self, chapters=None):
+        """(chapter, code, problem) for the given partitions (default: all of this fleet)."""
+        problems = []
+        for chapter in chapters or self.partitions:
+            partition = self.partitions[chapter]
+            digest = hashlib.sha1()
+            index = self.index(chapter)
+            count = 0
+            with open(self._path(chapter), "rb") as f:
+                offset = 0
+                for line in f:
+                    digest.update(line)
+                    question = json.loads(line)
+                    code = question.get("code")
+                    if index.get(code) != [offset, len(line)]:
+                        problems.append((chapter, code, "index offset does not match the record"))
+                    problems.extend((chapter, code, problem) for problem in validate_question(question))
+                    offset += len(line)
+                    count += 1
+            if digest.hexdigest() != partition["sha1"]:
+                problems.append((chapter, None, "partition changed since it was indexed"))
+            if count != partition["count"] or count != len(self.chapters.get(chapter, [])):
+                problems.append((chapter, None, f"{count} records, manifest says {partition['count']}"))
+        return problems
+
+    def export(self, path):
+        """Write the fleet back out as a quizData.json-compatible file."""
+        with BankWriter(path) as writer:
+            for chapter, partition in self.partitions.items():
+                header = {k: v for k, v in partition.items() if k not in ("file", "count", "sha1")}
+                writer.begin_quiz(header)
+                for question in self.iter_chapter(chapter):
+                    writer.question(question)
+                writer.end_quiz()
+            for key, value in self.settings.items():
+                writer.meta(key, value)
+        return writer.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned multi-fleet question banks.")
+    parser.add_argument("--root", default=BANKS_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="partition a quizData-style bank for one fleet")
+    imp.add_argument("fleet")
+    imp.add_argument("source", nargs="?", default=QUIZ_DATA)
+    imp.add_argument("--manual", action="append", default=None, metavar="ID=FILE",
+                     help="manual of this fleet, e.g. FCOM1=A220-300_FCOM1.pdf (repeatable)")
+
+    val = sub.add_parser("validate", help="check one fleet's partitions")
+    val.add_argument("fleet")
+    val.add_argument("--chapter", action="append")
+
+    exp = sub.add_parser("export", help="write one fleet as quizData.json")
+    exp.add_argument("fleet")
+    exp.add_argument("path")
+
+    sel = sub.add_parser("select", help="draw an exam using the fleet's selection quotas")
+    sel.add_argument("fleet")
+    sel.add_argument("--seed", type=int)
+
+    sub.add_parser("list", help="list fleets and partitions")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        manuals = dict(item.split("=", 1) for item in args.manual) if args.manual else None
+        info = import_bank(args.fleet, args.source, args.root, manuals)
+        total = sum(p["count"] for p in info["partitions"].values())
+        print(f"{args.fleet}: {total} questions in {len(info['partitions'])} partitions")
+    elif args.command == "validate":
+        problems = FleetBank(args.fleet, args.root).validate(args.chapter)
+        for chapter, code, problem in problems:
+            print(f"  {chapter} {code or '-'}: {problem}")
+        print(f"\n{len(problems)} problems")
+    elif args.command == "export":
+        count = FleetBank(args.fleet, args.root).export(args.path)
+        print(f"Wrote {count} questions to {args.path}")
+    elif args.command == "select":
+        questions = FleetBank(args.fleet, args.root).select(seed=args.seed)
+        print(f"{len(questions)} questions: {', '.join(q['code'] for q in questions)}")
+    else:
+        for fleet, info in load_manifest(args.root)["fleets"].items():
+            total = sum(p["count"] for p in info["partitions"].values())
+            print(f"{fleet}: {total} questions, chapters {', '.join(info['partitions'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Header/footer-only text extraction for fast page-marker scans.
+
+FCOM pages carry their marker (04−01−1), chapter title and page label in
+the top and bottom bands. Instead of extracting the full page text, each
+page is cropped to those bands and only they are extracted:
+
+    pdfplumber   page.crop(bbox).extract_text() on the two bands (default)
+    pypdf        extract_text() with a visitor that keeps only text drawn
+                 inside the bands
+
+Page ranges are split across worker processes, and the result is cached
+per PDF content hash in .fcom_cache/<PDF ID>.edges.json.
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_profile
+from manual_corpus import CACHE_DIR, file_sha1
+
+MARKER_RE = re.compile(r"\b(\d{2})\s*[−–-]\s*(\d{2})\s*[−–-]\s*(\d{1,3})\b")
+
+# Fraction of the page height treated as header and footer
+HEADER_FRACTION = 0.12
+FOOTER_FRACTION = 0.08
+
+
+def page_markers(text):
+    """All chapter-section-page markers in a piece of text, as 04-01-1 strings."""
+    return [
+        f"{int(chapter):02d}-{int(section):02d}-{int(page)}"
+        for chapter, section, page in MARKER_RE.findall(text)
+    ]
+
+
+def _scan_range_pdfplumber(pdf_path, start, end, header_fraction, footer_fraction):
+    import pdfplumber
+
+    edges = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_index in range(start, end):
+            page = pdf.pages[page_index]
+            width, height = page.width, page.height
+            with pipeline_profile.stage("crop_extract", pages=1):
+                header = page.crop((0, 0, width, height * header_fraction)).extract_text() or ""
+                footer = page.crop((0, height * (1 - footer_fraction), width, height)).extract_text() or ""
+            page.flush_cache()
+            edges.append({"page": page_index + 1, "header": header, "footer": footer})
+    return edges
+
+
+def _scan_range_pypdf(pdf_path, start, end, header_fraction, footer_fraction):
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    edges = []
+    for page_index in range(start, end):
+        page = reader.pages[page_index]
+        bottom = float(page.mediabox.bottom)
+        height = float(page.mediabox.height)
+        header_y = bottom + height * (1 - header_fraction)
+        footer_y = bottom + height * footer_fraction
+        header_parts, footer_parts = [], []
+
+        def visitor(text, cm, tm, font_dict, font_size):
+            # Device-space y of the text origin (text matrix times CTM)
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            if y >= header_y:
+                header_parts.append(text)
+            elif y <= footer_y:
+                footer_parts.append(text)
+
+        with pipeline_profile.stage("crop_extract", pages=1):
+            page.extract_text(visitor_text=visitor)
+        edges.append({
+            "page": page_index + 1,
+            "header": "".join(header_parts),
+            "footer": "".join(footer_parts),
+        })
+    return edges
+
+
+BACKENDS = {"pdfplumber": _scan_range_pdfplumber, "pypdf": _scan_range_pypdf}
+
+
+def _scan_range(backend, pdf_path, start, end, header_fraction, footer_fraction):
+    with pipeline_profile.worker_profile(f"edges {start + 1}-{end}") as profile:
+        edges = BACKENDS[backend](pdf_path, start, end, header_fraction, footer_fraction)
+    return edges, profile.to_dict()
+
+
+def page_count(pdf_path):
+    from pypdf import PdfReader
+
+    return len(PdfReader(pdf_path).pages)
+
+
+def scan_edges(pdf_path, backend="pdfplumber", workers=None, chunk_size=100,
+               header_fraction=HEADER_FRACTION, footer_fraction=FOOTER_FRACTION):
+    """Extract header/footer text of every page across a process pool."""
+    total = page_count(pdf_path)
+    ranges = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+    edges = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_scan_range, backend, pdf_path, start, end, header_fraction, footer_fraction)
+            for start, end in ranges
+        ]
+        for future in futures:
+            chunk, profile = future.result()
+            pipeline_profile.merge(profile)
+            edges.extend(chunk)
+
+    for edge in edges:
+        edge["markers"] = page_markers(edge["header"] + "\n" + edge["footer"])
+    return edges
+
+
+def load_edges(doc_id, pdf_path, cache_dir=CACHE_DIR, **kwargs):
+    """Cached header/footer scan of a manual, redone only when the PDF changes."""
+    digest = file_sha1(pdf_path)
+    cache_path = os.path.join(cache_dir, f"{doc_id}.edges.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("sha1") == digest:
+            return cached["pages"]
+
+    edges = scan_edges(pdf_path, **kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"sha1": digest, "pages": edges}, f, ensure_ascii=False)
+    return edges
+
+
+def marker_pages(edges, prefix=None):
+    """First PDF page carrying each marker, optionally only markers starting with prefix."""
+    markers = {}
+    for edge in edges:
+        for marker in edge["markers"]:
+            if prefix and not marker.startswith(prefix):
+                continue
+            markers.setdefault(marker, edge["page"])
+    return markers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan page headers/footers for FCOM page markers.")
+    parser.add_argument("pdf_path")
+    parser.add_argument("--pdf-id", default="FCOM1")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pdfplumber")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--prefix", help="only report markers starting with this, e.g. 04-")
+    args = parser.parse_args()
+
+    with pipeline_profile.profiled_run("header_scan"):
+        edges = load_edges(args.pdf_id, args.pdf_path, backend=args.backend, workers=args.workers)
+        markers = marker_pages(edges, args.prefix)
+
+    for marker, page in sorted(markers.items(), key=lambda item: item[1]):
+        print(f"Page {page}: {marker}")
+    print(f"\n{len(markers)} markers on {len(edges)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Classical item analysis over exported trainee answer logs.
+
+Answer logs are JSONL, one record per answered question
+
+    {"trainee": "T042", "attempt": "T042-2025-12-20T10:31", "code": "02AIR38", "selected": ["a", "c"]}
+
+or one record per attempt with answers keyed by code (results_service.py
+export):
+
+    {"trainee": "T042", "attempt": "...", "answers": {"02AIR38": ["a"], "04APU03": ["b", "d"]}}
+
+or one record per attempt holding the app's a220_quiz_progress object as
+saved in localStorage. Its `selectedAnswers` are keyed by position in the
+attempt's own shuffled `questions` list, which is used to map them back
+to codes:
+
+    {"trainee": "T042", "attempt": "...", "questions": [{"code": "02AIR38", ...}, ...],
+     "selectedAnswers": {"0": ["a"], "1": ["b", "d"]}}
+
+Each export is turned into columns (question index, selected-option
+bitmask, attempt index) and scored against quizData.json the way App.jsx
+marks answers during a quiz: a response is correct when the selected set
+equals the correct set. This differs from calculateScore (and
+batch_grader.py) only for `single` questions keyed with several letters
+(03AFL02, 08ELD11, 22FMS01), which those never count as correct. Only
+per-question sums are kept between runs, so a new
+export is folded in without re-reading the old ones, and an export that
+was already ingested (same content hash) is skipped.
+
+Per question this reports
+    difficulty       share of correct responses (p-value)
+    discrimination   point-biserial correlation of the item with the
+                     attempt's score on its other items
+    option rates     share of responses selecting each option, and of
+                     wrong responses selecting each distractor
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from explanation_data import QUIZ_DATA, load_json
+from manual_corpus import CACHE_DIR, file_sha1
+
+STATE_PATH = os.path.join(CACHE_DIR, "item_analysis.npz")
+LETTERS = "abcdefgh"
+
+# Flags for the report
+EASY = 0.95
+HARD = 0.30
+LOW_DISCRIMINATION = 0.20
+DEAD_DISTRACTOR = 0.05
+
+
+def letters_mask(letters):
+    """["a", "c"] -> 0b101."""
+    mask = 0
+    for letter in letters or ():
+        index = LETTERS.find(str(letter).strip().lower()[:1])
+        if index >= 0:
+            mask |= 1 << index
+    return mask
+
+
+def bank_masks(quiz_data=QUIZ_DATA):
+    """Codes in bank order, their correct-answer masks and option counts."""
+    codes, correct, options = [], [], []
+    for quiz in load_json(quiz_data)["quizzes"]:
+        for question in quiz["questions"]:
+            codes.append(question["code"])
+            correct.append(letters_mask(question.get("correct")))
+            options.append(len(question.get("options") or []))
+    return codes, np.array(correct, dtype=np.uint8), np.array(options, dtype=np.uint8)
+
+
+def progress_answers(record):
+    """({code: selected}, unmapped count) of an a220_quiz_progress record."""
+    questions = record.get("questions") or []
+    answers = {}
+    unmapped = 0
+    for key, selected in (record.get("selectedAnswers") or {}).items():
+        index = int(key) if str(key).isdigit() else -1
+        if 0 <= index < len(questions) and questions[index].get("code"):
+            answers[questions[index]["code"]] = selected
+        else:
+            unmapped += 1
+    return answers, unmapped
+
+
+def read_columns(path, code_index):
+    """Columns of one JSONL export: question index, option mask and attempt index per response."""
+    questions, masks, attempts = [], [], []
+    attempt_ids = {}
+    skipped = 0
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            attempt_key = (record.get("trainee"), record.get("attempt"))
+            attempt = attempt_ids.setdefault(attempt_key, len(attempt_ids))
+
+            answers = record.get("answers")
+            if answers is None and "selectedAnswers" in record:
+                answers, unmapped = progress_answers(record)
+                skipped += unmapped
+            elif answers is None:
+                answers = {record.get("code"): record.get("selected")}
+            for code, selected in answers.items():
+                index = code_index.get(code)
+                if index is None:
+                    skipped += 1
+                    continue
+                questions.append(index)
+                masks.append(letters_mask(selected))
+                attempts.append(attempt)
+
+    return (
+        np.array(questions, dtype=np.int32),
+        np.array(masks, dtype=np.uint8),
+        np.array(attempts, dtype=np.int32),
+        skipped,
+    )
+
+
+class ItemStats:
+    """Per-question sufficient statistics; everything reported is derived from them."""
+
+    # count/correct cover every response; n, x, y, xy, yy only responses whose
+    # attempt has other items to form a rest score (for the correlation)
+    SUMS = ("count", "correct", "n", "x", "y", "xy", "yy")
+
+    def __init__(self, codes):
+        self.codes = list(codes)
+        size = len(self.codes)
+        self.sums = {name: np.zeros(size) for name in self.SUMS}
+        self.option_counts = np.zeros((size, len(LETTERS)))
+        self.wrong_option_counts = np.zeros((size, len(LETTERS)))
+        self.ingested = []
+
+    # Persistence
+
+    @classmethod
+    def load(cls, codes, path=STATE_PATH):
+        stats = cls(codes)
+        if not os.path.exists(path):
+            return stats
+        with np.load(path, allow_pickle=False) as data:
+            old_codes = [str(code) for code in data["codes"]]
+            stats.ingested = [str(digest) for digest in data["ingested"]]
+            position = {code: i for i, code in enumerate(stats.codes)}
+            # Questions added to the bank since start at zero; removed ones are dropped
+            rows = [(i, position[code]) for i, code in enumerate(old_codes) if code in position]
+            if rows:
+                old, new = np.array(rows).T
+                for name in cls.SUMS:
+                    stats.sums[name][new] = data[name][old]
+                stats.option_counts[new] = data["option_counts"][old]
+                stats.wrong_option_counts[new] = data["wrong_option_counts"][old]
+        return stats
+
+    def save(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            codes=np.array(self.codes),
+            ingested=np.array(self.ingested, dtype=str),
+            option_counts=self.option_counts,
+            wrong_option_counts=self.wrong_option_counts,
+            **self.sums,
+        )
+        os.replace(tmp_path, path)
+
+    # Ingestion
+
+    def add(self, questions, masks, attempts, correct_masks):
+        """Fold one batch of responses into the sums, vectorized over all responses."""
+        if len(questions) == 0:
+            return
+        size = len(self.codes)
+        x = (masks == correct_masks[questions]).astype(np.float64)
+
+        # Attempt score on its other items, as a proportion (rest score)
+        attempt_count = np.bincount(attempts)
+        attempt_correct = np.bincount(attempts, weights=x)
+        others = attempt_count[attempts] - 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            y = np.where(others > 0, (attempt_correct[attempts] - x) / others, np.nan)
+        usable = ~np.isnan(y)
+
+        self.sums["count"] += np.bincount(questions, minlength=size)
+        self.sums["correct"] += np.bincount(questions, weights=x, minlength=size)
+
+        q, xu, yu = questions[usable], x[usable], y[usable]
+        self.sums["n"] += np.bincount(q, minlength=size)
+        self.sums["x"] += np.bincount(q, weights=xu, minlength=size)
+        self.sums["y"] += np.bincount(q, weights=yu, minlength=size)
+        self.sums["xy"] += np.bincount(q, weights=xu * yu, minlength=size)
+        self.sums["yy"] += np.bincount(q, weights=yu * yu, minlength=size)
+
+        # Option choice rates: one bincount per option bit
+        wrong = x == 0
+        for bit in range(len(LETTERS)):
+            chosen = ((masks >> bit) & 1).astype(np.float64)
+            self.option_counts[:, bit] += np.bincount(questions, weights=chosen, minlength=size)
+            self.wrong_option_counts[:, bit] += np.bincount(
+                questions[wrong], weights=chosen[wrong], minlength=size
+            )
+
+    # Statistics
+
+    def report(self, correct_masks, option_counts):
+        count, correct, n, sx, sy, sxy, syy = (self.sums[name] for name in self.SUMS)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            difficulty = correct / count
+            numerator = n * sxy - sx * sy
+            denominator = np.sqrt((n * sx - sx * sx) * (n * syy - sy * sy))
+            discrimination = np.where(denominator > 0, numerator / denominator, np.nan)
+            option_rate = self.option_counts / count[:, None]
+            wrong_n = count - correct
+            distractor_rate = self.wrong_option_counts / wrong_n[:, None]
+
+        items = []
+        for i, code in enumerate(self.codes):
+            if not count[i]:
+                continue
+            letters = LETTERS[:option_counts[i]]
+            distractors = [j for j in range(len(letters)) if not correct_masks[i] >> j & 1]
+            flags = []
+            if difficulty[i] >= EASY:
+                flags.append("too easy")
+            if difficulty[i] <= HARD:
+                flags.append("too hard")
+            if not np.isnan(discrimination[i]) and discrimination[i] < LOW_DISCRIMINATION:
+                flags.append("low discrimination")
+            dead = [letters[j] for j in distractors if wrong_n[i] and distractor_rate[i, j] < DEAD_DISTRACTOR]
+            if dead:
+                flags.append(f"non-functioning distractors {', '.join(dead)}")
+
+            items.append({
+                "code": code,
+                "responses": int(count[i]),
+                "difficulty": round(float(difficulty[i]), 3),
+                "discrimination": None if np.isnan(discrimination[i]) else round(float(discrimination[i]), 3),
+                "optionRates": {letters[j]: round(float(option_rate[i, j]), 3) for j in range(len(letters))},
+                "distractorRates": {
+                    letters[j]: round(float(distractor_rate[i, j]), 3) if wrong_n[i] else None
+                    for j in distractors
+                },
+                "flags": flags,
+            })
+        return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Item difficulty, discrimination and distractor analysis.")
+    parser.add_argument("exports", nargs="*", help="JSONL answer logs to fold in")
+    parser.add_argument("--state", default=STATE_PATH)
+    parser.add_argument("--report", default=os.path.join(CACHE_DIR, "item_analysis_report.json"))
+    parser.add_argument("--reset", action="store_true", help="start from empty statistics")
+    args = parser.parse_args()
+
+    codes, correct_masks, option_counts = bank_masks()
+    code_index = {code: i for i, code in enumerate(codes)}
+    stats = ItemStats(codes) if args.reset else ItemStats.load(codes, args.state)
+
+    for path in args.exports:
+        digest = file_sha1(path)
+        if digest in stats.ingested:
+            print(f"{os.path.basename(path)}: already ingested, skipping")
+            continue
+        questions, masks, attempts, skipped = read_columns(path, code_index)
+        stats.add(questions, masks, attempts, correct_masks)
+        stats.ingested.append(digest)
+        print(f"{os.path.basename(path)}: {len(questions)} responses"
+              + (f", {skipped} for unknown codes or question indexes" if skipped else ""))
+
+    stats.save(args.state)
+    items = stats.report(correct_masks, option_counts)
+
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump({"exports": len(stats.ingested), "items": items}, f, indent=2)
+
+    print("\n" + "=" * 80)
+    print(f"Questions with responses: {len(items)} of {len(codes)}")
+    print("=" * 80)
+    for item in sorted(items, key=lambda item: item["discrimination"] if item["discrimination"] is not None else 1):
+        if item["flags"]:
+            print(f"  {item['code']:10s} p={item['difficulty']:.2f} "
+                  f"r={item['discrimination'] if item['discrimination'] is not None else '-'}  "
+                  f"{'; '.join(item['flags'])}")
+    print(f"\nReport saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Multi-manual corpus for the A220 PDFs (FCOM1, OM, QRH, FCTM).
+
+Each registered manual is extracted and indexed in its own worker process,
+so building the whole corpus takes about as long as the largest manual.
+Queries run against every manual at once and results are tagged by `pdf`.
+
+Where the PDFs and the cache live comes from FCOM_MANUALS_DIR and
+FCOM_CACHE_DIR, else from the "manualsDir"/"cacheDir" keys of
+src/data/fcom_config.json (or the file FCOM_CONFIG names). The cache
+defaults to src/data/.fcom_cache; there is no default for the manuals, so
+MANUALS_DIR and FCOM1_PDF exit with a pointer to the config when neither
+is set.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import pipeline_profile
+from page_corpus import PageCorpus, read_header, write_corpus
+from query_cache import QueryCache, cached_find_pages, default_cache, query_key
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.environ.get("FCOM_CONFIG") or os.path.join(DATA_DIR, "fcom_config.json")
+
+
+def load_config(path=CONFIG_PATH):
+    """Local settings (manualsDir, cacheDir); empty when there is no config file."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_config = load_config()
+_MANUALS_DIR = os.environ.get("FCOM_MANUALS_DIR") or _config.get("manualsDir")
+PAGE_REFERENCES = os.path.join(DATA_DIR, "page_references.json")
+CACHE_DIR = os.environ.get("FCOM_CACHE_DIR") or _config.get("cacheDir") or os.path.join(DATA_DIR, ".fcom_cache")
+
+TOKEN_RE = re.compile(r"[A-Z0-9]+")
+
+
+def configured_manuals_dir(required=True):
+    """Configured directory holding the PDFs; exits with a hint when there is none (None if not required)."""
+    if not _MANUALS_DIR and required:
+        raise SystemExit(
+            "No manuals directory configured: set FCOM_MANUALS_DIR, pass --manuals-dir to fcom_tool.py, "
+            f'or add {{"manualsDir": "/path/to/manuals"}} to {CONFIG_PATH}'
+        )
+    return _MANUALS_DIR
+
+
+def __getattr__(name):
+    # Resolved on use, so modules that only need the cache import without a config
+    if name == "MANUALS_DIR":
+        return configured_manuals_dir()
+    if name == "FCOM1_PDF":
+        return os.path.join(configured_manuals_dir(), "A220-300_FCOM1.pdf")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def file_sha1(path, cache_dir=CACHE_DIR):
+    """Content hash of a file, used to invalidate cached page text.
+
+    Hashes are remembered by (size, mtime) in .fcom_cache/file_hashes.json,
+    so checking a cached corpus against its PDF does not re-read the PDF.
+    """
+    stat = os.stat(path)
+    memo_path = os.path.join(cache_dir, "file_hashes.json")
+    memo = {}
+    if os.path.exists(memo_path):
+        try:
+            with open(memo_path, encoding="utf-8") as f:
+                memo = json.load(f)
+        except ValueError:
+            memo = {}
+    key = os.path.abspath(path)
+    if memo.get(key, [None, None])[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return memo[key][2]
+
+    digest = hashlib.sha1()
+    with pipeline_profile.stage("hash", nbytes=stat.st_size):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    memo[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{memo_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(memo, f)
+    os.replace(tmp_path, memo_path)
+    return memo[key][2]
+
+
+def tokenize(text):
+    """Split text into uppercase alphanumeric tokens."""
+    return TOKEN_RE.findall(text.upper())
+
+
+def extract_pages(pdf_path):
+    """Extract the text of every page (index 0 is PDF page 1)."""
+    from pypdf import PdfReader
+
+    with pipeline_profile.stage("pdf_open"):
+        reader = PdfReader(pdf_path)
+
+    pages = []
+    for page in reader.pages:
+        with pipeline_profile.stage("extract_text", pages=1):
+            text = page.extract_text() or ""
+        pipeline_profile.add("extract_text", nbytes=len(text.encode("utf-8")))
+        pages.append(text)
+    return pages
+
+
+def build_page_index(pages):
+    """Map each token to the sorted list of 1-based pages containing it."""
+    index = {}
+    with pipeline_profile.stage("index", pages=len(pages)):
+        for page_num, text in enumerate(pages, 1):
+            for term in set(tokenize(text)):
+                index.setdefault(term, []).append(page_num)
+    return index
+
+
+def corpus_path(doc_id, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{doc_id}.corpus")
+
+
+def sources_path(doc_id, cache_dir=CACHE_DIR):
+    """Sidecar listing pages whose corpus text came from OCR (see ocr_pages)."""
+    return os.path.join(cache_dir, f"{doc_id}.sources.json")
+
+
+def ensure_page_corpus(doc_id, pdf_path, cache_dir=CACHE_DIR):
+    """Make sure an up-to-date page corpus file exists; return (path, sha1, pages or None).
+
+    The sha1 identifies the corpus text: the PDF's hash, or a digest over
+    it and the merged OCR pages when ocr_pages.py has been run.
+    """
+    digest = file_sha1(pdf_path, cache_dir)
+    path = corpus_path(doc_id, cache_dir)
+
+    sources = None
+    if os.path.exists(sources_path(doc_id, cache_dir)):
+        with open(sources_path(doc_id, cache_dir), encoding="utf-8") as f:
+            sources = json.load(f)
+    expected = sources["digest"] if sources and sources.get("pdf") == digest else digest
+
+    if os.path.exists(path):
+        try:
+            if read_header(path)[1] == expected:
+                return path, expected, None
+        except ValueError:
+            pass
+
+    pages = extract_pages(pdf_path)
+    if sources:
+        # OCR was run on this manual before: merge its cached results back in
+        from ocr_pages import apply_cached_ocr
+        with pipeline_profile.stage("ocr_merge"):
+            pages, digest = apply_cached_ocr(doc_id, pdf_path, pages, digest, cache_dir)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with pipeline_profile.stage("write_corpus", pages=len(pages)):
+        write_corpus(path, pages, digest)
+    return path, digest, pages
+
+
+def open_page_corpus(doc_id, pdf_path, cache_dir=CACHE_DIR):
+    """Memory-map the cached page text of a manual, extracting it first if stale."""
+    path, _, _ = ensure_page_corpus(doc_id, pdf_path, cache_dir)
+    return PageCorpus(path)
+
+
+def load_document(doc_id, pdf_path, cache_dir=CACHE_DIR):
+    """Extract (or reuse cached) page text for one manual and index it."""
+    with pipeline_profile.worker_profile(doc_id) as profile:
+        path, digest, pages = ensure_page_corpus(doc_id, pdf_path, cache_dir)
+        if pages is None:
+            with PageCorpus(path) as corpus:
+                index = build_page_index(corpus)
+        else:
+            index = build_page_index(pages)
+
+    # Page text stays on disk; the parent process maps it instead of unpickling it
+    return {
+        "pdf": doc_id,
+        "path": pdf_path,
+        "sha1": digest,
+        "corpus": path,
+        "index": index,
+        "profile": profile.to_dict(),
+    }
+
+
+class ManualCorpus:
+    """A set of manuals keyed by document ID, searchable as one corpus."""
+
+    def __init__(self, cache_dir=CACHE_DIR, query_cache=None):
+        self.cache_dir = cache_dir
+        self.manuals = {}
+        self.documents = {}
+        if query_cache is None:
+            query_cache = default_cache() if cache_dir == CACHE_DIR else QueryCache(os.path.join(cache_dir, "queries"))
+        self.query_cache = query_cache
+
+    @classmethod
+    def from_page_references(cls, path=PAGE_REFERENCES, manuals_dir=None, **kwargs):
+        """Register every manual listed in `_meta.pdfs` of page_references.json."""
+        with open(path, encoding="utf-8") as f:
+            pdfs = json.load(f)["_meta"]["pdfs"]
+
+        corpus = cls(**kwargs)
+        for doc_id, filename in pdfs.items():
+            corpus.register(doc_id, os.path.join(manuals_dir or configured_manuals_dir(), filename))
+        return corpus
+
+    def register(self, doc_id, pdf_path):
+        """Add a manual to the corpus under the given document ID."""
+        self.manuals[doc_id] = pdf_path
+        self.documents.pop(doc_id, None)
+
+    def build(self, max_workers=None):
+        """Extract and index all registered manuals concurrently."""
+        # Imported here: the process pool machinery costs ~20 ms at startup
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        pending = {}
+        for doc_id, path in self.manuals.items():
+            if doc_id in self.documents:
+                continue
+            if not os.path.exists(path):
+                print(f"Skipping {doc_id}: file not found at {path}")
+                continue
+            pending[doc_id] = path
+
+        if not pending:
+            return self
+
+        # Largest manuals first so they never wait behind small ones
+        order = sorted(pending.items(), key=lambda item: os.path.getsize(item[1]), reverse=True)
+
+        with ProcessPoolExecutor(max_workers=max_workers or len(order)) as pool:
+            futures = {
+                pool.submit(load_document, doc_id, path, self.cache_dir): doc_id
+                for doc_id, path in order
+            }
+            for future in as_completed(futures):
+                doc = future.result()
+                pipeline_profile.merge(doc.pop("profile"))
+                doc["pages"] = PageCorpus(doc["corpus"])
+                self.documents[doc["pdf"]] = doc
+                print(f"Indexed {doc['pdf']}: {len(doc['pages'])} pages")
+
+        return self
+
+    def candidate_pages(self, doc_id, term, whole_words=False):
+        """Pages of a manual that can contain the term.
+
+        By default the term is a substring ("AP" also finds "APU"), looked up
+        with `PageCorpus.find_pages` through the query cache. With
+        whole_words the token index is used instead: pages holding every
+        word of the term as a whole token.
+        """
+        if not whole_words:
+            pages = self.documents[doc_id]["pages"]
+            if not term.isascii():
+                # find_pages folds ASCII case only; str.lower may match more
+                return list(range(1, len(pages) + 1))
+            return cached_find_pages(pages, term, cache=self.query_cache)
+
+        index = self.documents[doc_id]["index"]
+        tokens = set(tokenize(term))
+        if not tokens:
+            return []
+
+        postings = sorted((index.get(token, []) for token in tokens), key=len)
+        pages = set(postings[0])
+        for posting in postings[1:]:
+            pages.intersection_update(posting)
+            if not pages:
+                break
+        return sorted(pages)
+
+    def search(self, keyword, context_lines=3, pdfs=None, whole_words=False):
+        """Find a keyword in every manual and return matches with line context.
+
+        The keyword matches as a case-insensitive substring of a line, or
+        only as whole words with whole_words ("AP" then skips "APU").
+        """
+        results = []
+        # Not "lines:N": entries cached under that mode came from token candidates and miss substring hits
+        mode = f"{'line-words' if whole_words else 'line-substring'}:{context_lines}"
+
+        with pipeline_profile.stage("match"):
+            for doc_id in pdfs or self.documents:
+                key = query_key(self.documents[doc_id]["sha1"], keyword, mode=mode)
+                matches = self.query_cache.get_or_compute(
+                    key, lambda: self._search_document(doc_id, keyword, context_lines, whole_words)
+                )
+                results.extend(
+                    {"pdf": doc_id, "page": page, "keyword": keyword, "context": context}
+                    for page, context in matches
+                )
+
+        pipeline_profile.record_match(keyword, len(results))
+        return results
+
+    def _search_document(self, doc_id, keyword, context_lines, whole_words=False):
+        """(page, context) for every line of one manual containing the keyword."""
+        keyword_lower = keyword.lower()
+        word_re = re.compile(rf"(?<![A-Za-z0-9]){re.escape(keyword)}(?![A-Za-z0-9])", re.IGNORECASE)
+
+        def contains(line):
+            return word_re.search(line) if whole_words else keyword_lower in line.lower()
+
+        pages = self.documents[doc_id]["pages"]
+        matches = []
+        for page_num in self.candidate_pages(doc_id, keyword, whole_words):
+            lines = pages[page_num - 1].split('\n')
+            for i, line in enumerate(lines):
+                if contains(line):
+                    start = max(0, i - context_lines)
+                    end = min(len(lines), i + context_lines + 1)
+                    matches.append([page_num, '\n'.join(lines[start:end])])
+        return matches
+
+    def positional_index(self, doc_id):
+        """Positional index of a manual for `query`, built on first use."""
+        from page_query import load_positional_index
+
+        doc = self.documents[doc_id]
+        if "positions" not in doc:
+            doc["positions"] = load_positional_index(doc_id, doc["pages"], self.cache_dir)
+        return doc["positions"]
+
+    def query(self, query, pdfs=None, start_page=1, end_page=None):
+        """Pages matching a boolean/proximity query (see page_query) in every manual."""
+        results = []
+        with pipeline_profile.stage("query"):
+            for doc_id in pdfs or self.documents:
+                # "query:spans": NEAR results cached before phrases kept their end positions differ
+                key = query_key(self.documents[doc_id]["sha1"], query, start_page, end_page, "query:spans")
+                pages = self.query_cache.get_or_compute(
+                    key, lambda: self.positional_index(doc_id).search(query, start_page, end_page)
+                )
+                results.extend({"pdf": doc_id, "page": page} for page in pages)
+        pipeline_profile.record_match(query, len(results))
+        return results
+
+    def search_topics(self, topics, context_lines=3, pdfs=None):
+        """Run `search` for each keyword of each topic."""
+        return {
+            topic: [
+                match
+                for keyword in keywords
+                for match in self.search(keyword, context_lines=context_lines, pdfs=pdfs)
+            ]
+            for topic, keywords in topics.items()
+        }
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Merge explanations/*.json into src/data/explanations.json and validate it.
+
+The merged file is the record of which source each code was taken from:
+on load, every merged entry is matched to the file holding an identical
+entry, and entries no file matches were curated in the merged file itself
+and are kept as they are. So rebuilding on untouched inputs changes
+nothing. A code only moves to another source when that source is edited
+(the most recent edit wins), when its recorded file stops defining it, or
+when it is new; in the last two cases the most recently modified file
+defining it is used.
+
+    python3 merge_explanations.py            report differences and problems
+    python3 merge_explanations.py --write    rebuild the merged file
+    python3 merge_explanations.py --watch    keep it up to date while editing
+
+Watch mode polls explanations/*.json, page_references.json and
+quizData.json. When a file changes only the codes whose entries changed
+in it are re-resolved and re-validated, and the merged file is replaced
+atomically, so the Vite dev server picks up the edit right away.
+"""
+
+import argparse
+import os
+import re
+import time
+
+from explanation_data import (
+    MERGED_EXPLANATIONS, QUIZ_DATA, explanation_files, iter_entries, load_json, write_json,
+)
+from manual_corpus import PAGE_REFERENCES
+
+POLL_INTERVAL = 0.25
+ANSWER_RE = re.compile(r"^\s*([a-fA-F])\b")
+
+
+CURATED = "<merged>"   # source of entries edited in the merged file itself
+
+
+def file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def flatten_entry(entry):
+    """Entry with a structured {why_correct, reference, ...} explanation turned into the
+    single string the app renders."""
+    explanation = entry.get("explanation")
+    if not isinstance(explanation, dict):
+        return entry
+    text = explanation.get("why_correct") or "\n\n".join(
+        value for key, value in explanation.items() if isinstance(value, str) and key != "reference"
+    )
+    if explanation.get("reference"):
+        text += f" Reference: {explanation['reference']}"
+    return {**entry, "explanation": text}
+
+
+def file_entries(path):
+    """Code -> entry of one explanation file (a later duplicate in the file wins)."""
+    return {code: flatten_entry(entry) for code, entry in iter_entries(load_json(path))}
+
+
+def answer_letters(value):
+    """Answer letters from "a", "a, c", "c (Electrical...)" or ["a", "b"]."""
+    parts = value if isinstance(value, list) else str(value).split(",")
+    letters = set()
+    for part in parts:
+        match = ANSWER_RE.match(str(part))
+        if match:
+            letters.add(match.group(1).lower())
+    return letters
+
+
+class ExplanationMerger:
+    """Per-file entries, the merged document, and what validation needs."""
+
+    def __init__(self, merged_path=MERGED_EXPLANATIONS, quiz_data=QUIZ_DATA, page_references=PAGE_REFERENCES):
+        self.merged_path = merged_path
+        self.quiz_data = quiz_data
+        self.page_references = page_references
+        self.files = {}
+        self.mtimes = {}
+        self.sources = {}
+        self.merged = load_json(merged_path) if os.path.exists(merged_path) else {"explanations": {}}
+        self.questions = {}
+        self.references = {}
+        self.pdfs = set()
+
+    # Loading
+
+    def load(self, paths=None):
+        for path in paths or explanation_files():
+            self.files[path] = file_entries(path)
+            self.mtimes[path] = file_mtime(path)
+        self.record_sources()
+        self.load_questions()
+        self.load_references()
+        return self
+
+    def record_sources(self):
+        """Code -> file its merged entry came from (CURATED when no file holds it)."""
+        self.sources = {}
+        for code, entry in self.merged.get("explanations", {}).items():
+            matches = [path for path in sorted(self.files) if self.files[path].get(code) == entry]
+            self.sources[code] = matches[0] if matches else CURATED
+
+    def load_questions(self):
+        """Code -> question; returns codes whose question changed."""
+        questions = {
+            question["code"]: question
+            for quiz in load_json(self.quiz_data)["quizzes"]
+            for question in quiz["questions"]
+        }
+        changed = changed_keys(self.questions, questions)
+        self.questions = questions
+        return changed
+
+    def load_references(self):
+        """Code -> page reference; returns codes whose reference changed."""
+        data = load_json(self.page_references)
+        references = data.get("references", {})
+        changed = changed_keys(self.references, references)
+        self.references = references
+        self.pdfs = set(data.get("_meta", {}).get("pdfs", {}))
+        return changed
+
+    def update_file(self, path):
+        """Re-read one explanation file; returns codes whose entry in it changed."""
+        old = self.files.get(path, {})
+        new = file_entries(path) if os.path.exists(path) else {}
+        if new:
+            self.files[path] = new
+            self.mtimes[path] = file_mtime(path)
+        else:
+            self.files.pop(path, None)
+            self.mtimes.pop(path, None)
+        changed = changed_keys(old, new)
+        for code in changed:
+            if code in new:
+                self.sources[code] = path  # the trainer's latest edit wins
+            elif self.sources.get(code) == path:
+                del self.sources[code]
+        return changed
+
+    # Merging
+
+    def source(self, code):
+        """File (or CURATED) the code's entry is taken from, or None."""
+        source = self.sources.get(code)
+        if source == CURATED or (source in self.files and code in self.files[source]):
+            return source
+        defining = [path for path in self.files if code in self.files[path]]
+        if not defining:
+            return None
+        return max(defining, key=lambda path: (self.mtimes.get(path, 0), path))
+
+    def resolve(self, code):
+        """Entry of the code's source, or None."""
+        source = self.source(code)
+        if source == CURATED:
+            return self.merged["explanations"].get(code)
+        return self.files[source][code] if source else None
+
+    def apply(self, codes):
+        """Re-resolve codes in the merged document; returns codes whose merged entry changed."""
+        explanations = self.merged.setdefault("explanations", {})
+        changed = set()
+        for code in codes:
+            source = self.source(code)
+            entry = self.resolve(code)
+            if entry is None:
+                self.sources.pop(code, None)
+                if explanations.pop(code, None) is not None:
+                    changed.add(code)
+                continue
+            self.sources[code] = source
+            if explanations.get(code) != entry:
+                explanations[code] = entry
+                changed.add(code)
+        return changed
+
+    def all_codes(self):
+        codes = set()
+        for entries in self.files.values():
+            codes.update(entries)
+        return codes
+
+    def rebuild(self):
+        """Re-resolve every code, including ones no file defines any more."""
+        stale = {code for code, entry in iter_entries(self.merged["explanations"])}
+        return self.apply(self.all_codes() | stale)
+
+    def write(self):
+        write_json(self.merged_path, self.merged)
+
+    # Validation
+
+    def validate(self, codes):
+        """Problems with the merged entries of the given codes."""
+        explanations = self.merged.get("explanations", {})
+        problems = []
+        for code in sorted(codes):
+            entry = explanations.get(code)
+            question = self.questions.get(code)
+            if entry is None:
+                if question is not None:
+                    problems.append((code, "no explanation"))
+                continue
+            if question is None:
+                problems.append((code, "code not in quizData.json"))
+                continue
+
+            text = entry.get("explanation")
+            if not isinstance(text, str) or not text.strip():
+                problems.append((code, "empty explanation"))
+
+            given = entry.get("correctAnswer", entry.get("correct_answers"))
+            if given is not None:
+                letters = answer_letters(given)
+                expected = {letter.lower() for letter in question.get("correct", [])}
+                if letters and letters != expected:
+                    problems.append((code, f"answer {', '.join(sorted(letters))} != quizData {', '.join(sorted(expected))}"))
+
+            for ref in self.references.get(code, {}).get("pages", []):
+                if ref.get("pdf") not in self.pdfs:
+                    problems.append((code, f"page reference to unknown PDF {ref.get('pdf')!r}"))
+                elif not isinstance(ref.get("page"), int) or ref["page"] < 1:
+                    problems.append((code, f"page reference {ref.get('page')!r} is not a PDF page number"))
+        return problems
+
+
+def changed_keys(old, new):
+    """Keys added, removed or changed between two dicts."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def print_problems(problems):
+    for code, problem in problems:
+        print(f"  {code:10s} {problem}")
+
+
+def snapshot(paths):
+    """Path -> (mtime_ns, size) for change polling."""
+    stats = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stats[path] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def watch(merger, interval=POLL_INTERVAL):
+    """Poll the inputs and apply each change incrementally until interrupted."""
+    def watched():
+        return explanation_files() + [merger.quiz_data, merger.page_references]
+
+    state = snapshot(watched())
+    print(f"Watching {len(state)} files (Ctrl+C to stop)")
+
+    while True:
+        time.sleep(interval)
+        current = snapshot(watched())
+        changed_paths = [path for path in current.keys() | state.keys() if current.get(path) != state.get(path)]
+        if not changed_paths:
+            continue
+
+        t0 = time.perf_counter()
+        merge_codes, check_codes = set(), set()
+        for path in sorted(changed_paths):
+            name = os.path.basename(path)
+            try:
+                if path == merger.quiz_data:
+                    check_codes |= merger.load_questions()
+                elif path == merger.page_references:
+                    check_codes |= merger.load_references()
+                else:
+                    merge_codes |= merger.update_file(path)
+            except ValueError as e:
+                # Half-saved or invalid JSON: keep the last good state and wait for the next save
+                print(f"{name}: {e}")
+                continue
+            print(f"{name} changed")
+        state = current
+
+        changed = merger.apply(merge_codes)
+        if changed:
+            merger.write()
+
+        problems = merger.validate(changed | check_codes)
+        elapsed = (time.perf_counter() - t0) * 1000
+        print(f"  {len(changed)} merged entries updated, {len(changed | check_codes)} codes checked in {elapsed:.0f} ms")
+        print_problems(problems)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge and validate the explanation files.")
+    parser.add_argument("--write", action="store_true", help="rebuild src/data/explanations.json")
+    parser.add_argument("--watch", action="store_true", help="incrementally rebuild on every change")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    merger = ExplanationMerger().load()
+
+    if args.watch:
+        try:
+            watch(merger, args.interval)
+        except KeyboardInterrupt:
+            print("\nStopped")
+        return
+
+    changed = merger.rebuild()
+    problems = merger.validate(merger.all_codes() | set(merger.questions))
+
+    print("=" * 80)
+    print(f"Files:    {len(merger.files)}")
+    print(f"Codes:    {len(merger.all_codes())}")
+    print(f"Changed:  {len(changed)} merged entries differ from the file sources")
+    print(f"Problems: {len(problems)}")
+    print("=" * 80)
+    print_problems(problems)
+
+    if args.write and changed:
+        merger.write()
+        print(f"\nUpdated {len(changed)} entries in {MERGED_EXPLANATIONS}")
+    elif changed:
+        print("\nDry run - re-run with --write to update the merged file")
+
+
+if __name__ == "__main__":
+    main()
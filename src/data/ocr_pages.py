@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+OCR fallback for manual pages that have little or no extractable text.
+
+Scanned pages, panel diagrams and performance charts come out of pypdf
+empty (or with just the running header), so every search skips them.
+This stage finds those pages in a manual's page corpus, renders them and
+runs the locally installed `tesseract` on them across a process pool.
+
+OCR output is cached per page content hash in .fcom_cache/ocr/<hash>.txt,
+so a page is only OCR'd once, even across manual revisions. The results
+are merged into the manual's .corpus file and the pages they replaced are
+tagged in {doc}.sources.json:
+
+    {"pdf": "<PDF sha1>", "digest": "<corpus text sha1>",
+     "pages": {"812": {"source": "ocr", "hash": "..."}}}
+
+Pages not listed there have their text from the PDF. When a manual is
+re-extracted (manual_corpus.ensure_page_corpus) cached OCR text is merged
+back without running tesseract again.
+
+    python3 ocr_pages.py                 # every manual in page_references.json
+    python3 ocr_pages.py --pdf FCOM1 --list
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_profile
+from manual_corpus import CACHE_DIR, ManualCorpus, ensure_page_corpus, file_sha1, sources_path
+from page_corpus import PageCorpus, write_corpus
+
+OCR_DIR = os.path.join(CACHE_DIR, "ocr")
+MIN_TEXT_CHARS = 80
+OCR_DPI = 300
+OCR_LANG = "eng"
+
+
+def low_text_pages(pages, min_chars=MIN_TEXT_CHARS):
+    """1-based pages with fewer than min_chars non-space characters."""
+    return [i for i, text in enumerate(pages, 1) if len("".join(text.split())) < min_chars]
+
+
+def ocr_path(page_hash, ocr_dir=OCR_DIR):
+    return os.path.join(ocr_dir, f"{page_hash}.txt")
+
+
+def load_sources(doc_id, cache_dir=CACHE_DIR):
+    path = sources_path(doc_id, cache_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def page_sources(doc_id, cache_dir=CACHE_DIR):
+    """page -> text source ("ocr") for pages whose text does not come from the PDF."""
+    sources = load_sources(doc_id, cache_dir) or {}
+    return {int(page): info["source"] for page, info in sources.get("pages", {}).items()}
+
+
+def hash_pages(pdf_path, pages):
+    """page -> content hash (see render_source_pages.page_content_hash)."""
+    from pypdf import PdfReader
+
+    from render_source_pages import page_content_hash
+
+    reader = PdfReader(pdf_path)
+    hashes = {}
+    for page_num in pages:
+        with pipeline_profile.stage("hash", pages=1):
+            hashes[page_num] = page_content_hash(reader.pages[page_num - 1])
+    return hashes
+
+
+def _hash_chunk(pdf_path, pages):
+    with pipeline_profile.worker_profile(f"hash {pages[0]}-{pages[-1]}") as profile:
+        hashes = hash_pages(pdf_path, pages)
+    return hashes, profile.to_dict()
+
+
+def run_tesseract(image, lang=OCR_LANG):
+    """Text of a PIL image from the tesseract CLI (one thread; the pool gives the parallelism)."""
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    result = subprocess.run(
+        ["tesseract", "stdin", "stdout", "-l", lang, "--psm", "3"],
+        input=buffer.getvalue(), capture_output=True, check=True,
+        env={**os.environ, "OMP_THREAD_LIMIT": "1"},
+    )
+    return result.stdout.decode("utf-8", "replace")
+
+
+def _ocr_chunk(pdf_path, jobs, dpi, lang, ocr_dir):
+    """Render and OCR (page, hash) jobs, writing each result to the OCR cache."""
+    import pdfplumber
+
+    done = {}
+    with pipeline_profile.worker_profile(f"ocr {jobs[0][0]}-{jobs[-1][0]}") as profile:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_num, page_hash in jobs:
+                page = pdf.pages[page_num - 1]
+                with pipeline_profile.stage("render", pages=1):
+                    image = page.to_image(resolution=dpi).original.convert("L")
+                page.flush_cache()
+                with pipeline_profile.stage("tesseract", pages=1):
+                    text = run_tesseract(image, lang)
+
+                path = ocr_path(page_hash, ocr_dir)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, path)
+                pipeline_profile.count("pages_ocr")
+                done[page_num] = len(text)
+    return done, profile.to_dict()
+
+
+def merge_ocr(pages, hashes, ocr_dir=OCR_DIR):
+    """Pages with cached OCR text swapped in where it has more text; returns (pages, tagged)."""
+    pages = list(pages)
+    tagged = {}
+    for page_num, page_hash in sorted(hashes.items()):
+        path = ocr_path(page_hash, ocr_dir)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            text = f.read().strip()
+        current = pages[page_num - 1].strip()
+        # Equal text: the corpus already holds this OCR result from an earlier run
+        if text and (len(text) > len(current) or text == current):
+            pages[page_num - 1] = text
+            tagged[str(page_num)] = {"source": "ocr", "hash": page_hash}
+    return pages, tagged
+
+
+def write_sources(doc_id, pdf_sha1, tagged, cache_dir=CACHE_DIR):
+    """Record OCR'd pages; returns the digest the corpus is stamped with."""
+    path = sources_path(doc_id, cache_dir)
+    if not tagged:
+        if os.path.exists(path):
+            os.unlink(path)
+        return pdf_sha1
+    digest = hashlib.sha1((pdf_sha1 + json.dumps(tagged, sort_keys=True)).encode()).hexdigest()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"pdf": pdf_sha1, "digest": digest, "pages": tagged}, f, indent=2)
+    os.replace(tmp_path, path)
+    return digest
+
+
+def apply_cached_ocr(doc_id, pdf_path, pages, pdf_sha1, cache_dir=CACHE_DIR, min_chars=MIN_TEXT_CHARS):
+    """Merge already-cached OCR text into freshly extracted pages (no tesseract run)."""
+    low = low_text_pages(pages, min_chars)
+    hashes = hash_pages(pdf_path, low) if low else {}
+    pages, tagged = merge_ocr(pages, hashes, os.path.join(cache_dir, "ocr"))
+    return pages, write_sources(doc_id, pdf_sha1, tagged, cache_dir)
+
+
+def ocr_manual(doc_id, pdf_path, cache_dir=CACHE_DIR, workers=None, dpi=OCR_DPI, lang=OCR_LANG,
+               min_chars=MIN_TEXT_CHARS, chunk_size=8):
+    """OCR every low-text page of one manual that is not cached yet and update its corpus."""
+    ocr_dir = os.path.join(cache_dir, "ocr")
+    os.makedirs(ocr_dir, exist_ok=True)
+    path, _, _ = ensure_page_corpus(doc_id, pdf_path, cache_dir)
+    with PageCorpus(path) as corpus:
+        pages = list(corpus)
+
+    pdf_sha1 = file_sha1(pdf_path)
+    sources = load_sources(doc_id, cache_dir) or {}
+    # Pages already replaced by OCR text no longer look empty; keep them in the set
+    previous = [int(page) for page in sources.get("pages", {})] if sources.get("pdf") == pdf_sha1 else []
+    wanted = sorted(set(low_text_pages(pages, min_chars)) | set(previous))
+    print(f"{doc_id}: {len(wanted)} of {len(pages)} pages have little or no text")
+    if not wanted:
+        return 0
+
+    hashes = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_hash_chunk, pdf_path, wanted[i:i + 50]) for i in range(0, len(wanted), 50)]
+        for future in futures:
+            chunk, profile = future.result()
+            pipeline_profile.merge(profile)
+            hashes.update(chunk)
+
+        jobs = [(page, page_hash) for page, page_hash in sorted(hashes.items())
+                if not os.path.exists(ocr_path(page_hash, ocr_dir))]
+        pipeline_profile.count("pages_cached", len(hashes) - len(jobs))
+        futures = [pool.submit(_ocr_chunk, pdf_path, jobs[i:i + chunk_size], dpi, lang, ocr_dir)
+                   for i in range(0, len(jobs), chunk_size)]
+        for future in futures:
+            _, profile = future.result()
+            pipeline_profile.merge(profile)
+
+    pages, tagged = merge_ocr(pages, hashes, ocr_dir)
+    digest = write_sources(doc_id, pdf_sha1, tagged, cache_dir)
+    write_corpus(path, pages, digest)
+    return len(tagged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR manual pages that have no extractable text.")
+    parser.add_argument("--pdf", action="append", help="only this manual (repeatable)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--dpi", type=int, default=OCR_DPI)
+    parser.add_argument("--lang", default=OCR_LANG)
+    parser.add_argument("--min-chars", type=int, default=MIN_TEXT_CHARS)
+    parser.add_argument("--list", action="store_true", help="list pages whose text comes from OCR")
+    args = parser.parse_args()
+
+    manuals = ManualCorpus.from_page_references().manuals
+    if args.pdf:
+        manuals = {doc_id: path for doc_id, path in manuals.items() if doc_id in args.pdf}
+
+    if args.list:
+        for doc_id in manuals:
+            pages = sorted(page_sources(doc_id))
+            print(f"{doc_id}: {len(pages)} OCR pages" + (f" ({', '.join(map(str, pages))})" if pages else ""))
+        return
+
+    if shutil.which("tesseract") is None:
+        raise SystemExit("tesseract not found on PATH; install it (e.g. brew install tesseract)")
+
+    with pipeline_profile.profiled_run("ocr_pages") as profile:
+        replaced = {}
+        for doc_id, pdf_path in manuals.items():
+            if not os.path.exists(pdf_path):
+                print(f"{doc_id}: PDF not found, skipping")
+                continue
+            replaced[doc_id] = ocr_manual(doc_id, pdf_path, workers=args.workers, dpi=args.dpi,
+                                          lang=args.lang, min_chars=args.min_chars)
+
+    print("\n" + "=" * 80)
+    for doc_id, count in replaced.items():
+        print(f"{doc_id}: {count} pages now searchable from OCR text")
+    print(f"OCR'd this run: {profile.counters.get('pages_ocr', 0)}, "
+          f"from cache: {profile.counters.get('pages_cached', 0)}")
+
+
+if __name__ == "__main__":
+    main()
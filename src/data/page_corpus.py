@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped page-text corpus file.
+
+Layout (little-endian):
+    header   magic, format version, page count, source PDF sha1
+    offsets  (page count + 1) uint64 byte offsets into the text blob
+    blob     every page's UTF-8 text, concatenated
+
+Opening a corpus only maps the file, so it takes the same few milliseconds
+for a 20-page QRH or a 2000-page FCOM. Pages are sliced out of the map as
+memoryviews and regex/substring scans run over the blob without copying.
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+
+MAGIC = b"FCORPUS\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIQ40s4x")
+
+
+def write_corpus(path, pages, sha1=""):
+    """Write page texts (index 0 is PDF page 1) to a corpus file atomically."""
+    encoded = [text.encode("utf-8") for text in pages]
+
+    offsets = array("Q", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".corpus")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(encoded), sha1.encode("ascii")))
+            offsets.tofile(f)
+            for data in encoded:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_header(path):
+    """Return (page count, source sha1) without mapping the file."""
+    with open(path, "rb") as f:
+        magic, version, page_count, sha1 = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} page corpus")
+    return page_count, sha1.decode("ascii").rstrip("\0")
+
+
+class PageCorpus:
+    """Read-only view of a corpus file.
+
+    Behaves like a list of page strings (`corpus[0]` is PDF page 1), and
+    offers byte-level access for scans that should not decode the text.
+    Memoryviews handed out by `page_bytes` must be released before `close`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, page_count, sha1 = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} page corpus")
+
+        self.page_count = page_count
+        self.sha1 = sha1.decode("ascii").rstrip("\0")
+
+        table_end = HEADER.size + 8 * (page_count + 1)
+        self._view = memoryview(self._mm)
+        if sys.byteorder == "little":
+            self.offsets = self._view[HEADER.size:table_end].cast("Q")
+        else:
+            self.offsets = array("Q", self._view[HEADER.size:table_end])
+            self.offsets.byteswap()
+        self.blob = self._view[table_end:]
+
+    def close(self):
+        for name in ("blob", "offsets", "_view"):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.page_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.page_count))]
+        if index < 0:
+            index += self.page_count
+        return self.page_text(index + 1)
+
+    def __iter__(self):
+        for page_num in range(1, self.page_count + 1):
+            yield self.page_text(page_num)
+
+    def page_bytes(self, page_num):
+        """Zero-copy UTF-8 bytes of a 1-based PDF page."""
+        if not 1 <= page_num <= self.page_count:
+            raise IndexError(f"page {page_num} out of range 1..{self.page_count}")
+        return self.blob[self.offsets[page_num - 1]:self.offsets[page_num]]
+
+    def page_text(self, page_num):
+        return str(self.page_bytes(page_num), "utf-8")
+
+    def page_of(self, byte_offset):
+        """1-based page containing a byte offset into the blob."""
+        return bisect_right(self.offsets, byte_offset, 0, self.page_count)
+
+    def finditer(self, pattern, flags=0, start_page=1, end_page=None):
+        """Yield (page, match) for a bytes regex over the whole blob or a page range.
+
+        Each page is scanned on its own (pos/endpos over the shared map), so a
+        match never runs across a page boundary and never hides one that
+        doesn't.
+        """
+        regex = re.compile(pattern, flags) if not isinstance(pattern, re.Pattern) else pattern
+        end_page = min(end_page or self.page_count, self.page_count)
+        offsets = self.offsets
+        for page in range(start_page, end_page + 1):
+            for match in regex.finditer(self.blob, offsets[page - 1], offsets[page]):
+                yield page, match
+
+    def find_pages(self, needle, ignore_case=True, start_page=1, end_page=None):
+        """Sorted pages containing a substring (ASCII case folding when ignore_case)."""
+        regex = re.compile(re.escape(needle.encode("utf-8")), re.IGNORECASE if ignore_case else 0)
+        end_page = min(end_page or self.page_count, self.page_count)
+        offsets = self.offsets
+        return [page for page in range(start_page, end_page + 1)
+                if regex.search(self.blob, offsets[page - 1], offsets[page])]
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Boolean and proximity queries over a positional page index.
+
+Query syntax (operators are uppercase):
+    APU LIMIT*                      both terms on the page (implicit AND)
+    APU AND LIMIT*                  same, explicit
+    "AUXILIARY POWER UNIT"          phrase
+    BLEED OR PNEUMATIC              either term
+    APU NOT "TABLE OF CONTENTS"     exclude pages
+    "APU GEN" NEAR/5 SWITCH         at most 5 words apart, counted from the
+                                    phrase edge nearest to SWITCH
+    (A OR B) C                      grouping
+A trailing `*` matches any term with that prefix. Matching is on
+uppercase alphanumeric tokens, the same tokens manual_corpus indexes.
+
+Example:
+    python3 page_query.py FCOM1 'APU LIMIT* ("ALTITUDE LIMIT*" OR "MAXIMUM ALTITUDE")'
+"""
+
+import os
+import pickle
+import re
+import sys
+from bisect import bisect_left
+
+from manual_corpus import CACHE_DIR, tokenize
+
+QUERY_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|(NEAR/\d+)|([^\s()"]+))')
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def lex(query):
+    """Split a query string into (kind, value) tokens."""
+    tokens = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        match = QUERY_TOKEN_RE.match(query, pos)
+        if not match or match.end() == pos:
+            raise QuerySyntaxError(f"Unexpected input at {pos}: {query[pos:]!r}")
+        lparen, rparen, phrase, near, word = match.groups()
+        if lparen:
+            tokens.append(("(", None))
+        elif rparen:
+            tokens.append((")", None))
+        elif phrase is not None:
+            tokens.append(("phrase", phrase))
+        elif near:
+            tokens.append(("near", int(near.split("/")[1])))
+        elif word in OPERATORS:
+            tokens.append((word, None))
+        else:
+            tokens.append(("word", word))
+        pos = match.end()
+    return tokens
+
+
+def words_node(text):
+    """Term or phrase node for a bare word or quoted phrase."""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        parts = tokenize(word.rstrip("*"))
+        if not parts:
+            continue
+        if prefix:
+            parts[-1] += "*"
+        terms.extend(parts)
+    if not terms:
+        raise QuerySyntaxError(f"No searchable terms in {text!r}")
+    return ("term", terms[0]) if len(terms) == 1 else ("phrase", terms)
+
+
+class Parser:
+    """Recursive-descent parser: OR < AND (explicit or implicit) < NOT < NEAR."""
+
+    def __init__(self, query):
+        self.tokens = lex(query)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise QuerySyntaxError("Empty query")
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected {self.tokens[self.pos][0]!r}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() in ("AND", "NOT", "(", "phrase", "word"):
+            if self.peek() == "AND":
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_not(self):
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_near()
+
+    def parse_near(self):
+        node = self.parse_primary()
+        while self.peek() == "near":
+            _, distance = self.take()
+            node = ("near", distance, node, self.parse_primary())
+        return node
+
+    def parse_primary(self):
+        kind = self.peek()
+        if kind == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise QuerySyntaxError("Missing closing parenthesis")
+            self.take()
+            return node
+        if kind in ("phrase", "word"):
+            return words_node(self.take()[1])
+        raise QuerySyntaxError(f"Expected a term, got {kind!r}")
+
+
+def parse_query(query):
+    return Parser(query).parse()
+
+
+def intersect(a, b):
+    """Merge-intersect two sorted page lists."""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def within(left, right, distance):
+    """Spans covering a `left` span and a `right` span at most `distance` words apart.
+
+    Spans are inclusive (start, end) word positions sorted by start; the gap
+    is measured between their facing edges, so a phrase is as near to the
+    word after its last word as to the word before its first.
+    """
+    if not right:
+        return []
+    starts = [start for start, _ in right]
+    width = max(end - start for start, end in right)
+    hits = set()
+    for start, end in left:
+        for i in range(bisect_left(starts, start - distance - width), len(right)):
+            right_start, right_end = right[i]
+            if right_start > end + distance:
+                break
+            if right_end >= start - distance:
+                hits.add((min(start, right_start), max(end, right_end)))
+    return sorted(hits)
+
+
+class PositionalIndex:
+    """term -> (sorted pages, per-page sorted word positions)."""
+
+    def __init__(self, postings, page_count):
+        self.postings = postings
+        self.page_count = page_count
+        self.vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, pages):
+        postings = {}
+        page_count = 0
+        for page_num, text in enumerate(pages, 1):
+            page_count = page_num
+            for pos, term in enumerate(tokenize(text)):
+                postings.setdefault(term, {}).setdefault(page_num, []).append(pos)
+
+        frozen = {
+            term: (list(by_page), list(by_page.values()))
+            for term, by_page in postings.items()
+        }
+        return cls(frozen, page_count)
+
+    def expand(self, term):
+        """Vocabulary terms matching `term` (prefix match when it ends with `*`)."""
+        if not term.endswith("*"):
+            return [term] if term in self.postings else []
+        prefix = term[:-1]
+        start = bisect_left(self.vocabulary, prefix)
+        matches = []
+        for candidate in self.vocabulary[start:]:
+            if not candidate.startswith(prefix):
+                break
+            matches.append(candidate)
+        return matches
+
+    def term_positions(self, term):
+        """page -> sorted positions for a (possibly prefixed) term."""
+        expanded = self.expand(term)
+        if len(expanded) == 1:
+            pages, positions = self.postings[expanded[0]]
+            return dict(zip(pages, positions))
+
+        merged = {}
+        for candidate in expanded:
+            pages, positions = self.postings[candidate]
+            for page, page_positions in zip(pages, positions):
+                merged.setdefault(page, []).extend(page_positions)
+        return {page: sorted(merged[page]) for page in sorted(merged)}
+
+    def positions(self, node):
+        """page -> sorted (start, end) word spans for positional nodes (term, phrase, near)."""
+        kind = node[0]
+        if kind == "term":
+            return {page: [(pos, pos) for pos in positions] for page, positions in self.term_positions(node[1]).items()}
+
+        if kind == "phrase":
+            per_term = [self.term_positions(term) for term in node[1]]
+            pages = sorted(per_term[0])
+            for other in per_term[1:]:
+                pages = intersect(pages, sorted(other))
+            result = {}
+            for page in pages:
+                followers = [set(term_positions[page]) for term_positions in per_term[1:]]
+                starts = [
+                    pos for pos in per_term[0][page]
+                    if all(pos + offset in follower for offset, follower in enumerate(followers, 1))
+                ]
+                if starts:
+                    result[page] = [(pos, pos + len(followers)) for pos in starts]
+            return result
+
+        if kind == "near":
+            _, distance, left_node, right_node = node
+            left = self.positions(left_node)
+            right = self.positions(right_node)
+            result = {}
+            for page in intersect(sorted(left), sorted(right)):
+                hits = within(left[page], right[page], distance)
+                if hits:
+                    result[page] = hits
+            return result
+
+        raise QuerySyntaxError(f"NEAR needs terms or phrases, not {kind!r}")
+
+    def pages(self, node):
+        """Sorted pages matching any query node."""
+        kind = node[0]
+        if kind in ("term", "phrase", "near"):
+            return sorted(self.positions(node))
+
+        if kind == "or":
+            result = set()
+            for child in node[1]:
+                result.update(self.pages(child))
+            return sorted(result)
+
+        if kind == "and":
+            include = [self.pages(c) for c in node[1] if c[0] != "not"]
+            exclude = [self.pages(c[1]) for c in node[1] if c[0] == "not"]
+            if include:
+                include.sort(key=len)
+                result = include[0]
+                for other in include[1:]:
+                    if not result:
+                        break
+                    result = intersect(result, other)
+            else:
+                result = list(range(1, self.page_count + 1))
+            for other in exclude:
+                excluded = set(other)
+                result = [page for page in result if page not in excluded]
+            return result
+
+        if kind == "not":
+            excluded = set(self.pages(node[1]))
+            return [page for page in range(1, self.page_count + 1) if page not in excluded]
+
+        raise QuerySyntaxError(f"Unknown node {kind!r}")
+
+    def search(self, query, start_page=1, end_page=None):
+        """Pages matching a query string, optionally limited to a page range."""
+        pages = self.pages(parse_query(query))
+        end_page = end_page or self.page_count
+        return [page for page in pages if start_page <= page <= end_page]
+
+
+def load_positional_index(doc_id, corpus, cache_dir=CACHE_DIR):
+    """Positional index for a mapped page corpus, cached next to it by content hash."""
+    path = os.path.join(cache_dir, f"{doc_id}.positions.pickle")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            sha1, postings, page_count = pickle.load(f)
+        if sha1 == corpus.sha1:
+            return PositionalIndex(postings, page_count)
+
+    index = PositionalIndex.build(corpus)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump((corpus.sha1, index.postings, index.page_count), f, protocol=pickle.HIGHEST_PROTOCOL)
+    return index
+
+
+def main():
+    from manual_corpus import ManualCorpus
+
+    if len(sys.argv) != 3:
+        print("Usage: python3 page_query.py <PDF ID> '<query>'")
+        sys.exit(1)
+
+    doc_id, query = sys.argv[1], sys.argv[2]
+    corpus = ManualCorpus.from_page_references()
+    corpus.manuals = {doc_id: corpus.manuals[doc_id]}
+    corpus.build()
+
+    pages = corpus.query(query)
+    print(f"{len(pages)} pages match {query!r}")
+    for match in pages:
+        print(f"  {match['pdf']} page {match['page']}")
+
+
+if __name__ == "__main__":
+    main()
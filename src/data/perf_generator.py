@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Generate PERF-style question variants with computed answers.
+
+Templates, each vectorized over all variants at once:
+
+    old    several unrelated failures, each with its OLD factor, applied to
+           an unfactored OLD (PERF06/PERF07). Failure factors come from
+           perf_failure_factors.json plus any PERF question written the
+           way PERF06 is, mirrored left/right and 1/2.
+    vref   VREF for a landing weight and flap setting, interpolated in the
+           VREF table from perf_tables.py (PERF12)
+    rwycc  OLD for a runway condition code and an unfactored OLD, with the
+           factor from the runway factor table of perf_tables.py
+
+Every template draws its parameter combinations without replacement, so
+no two variants share a text and --count is capped at the number of
+combinations a template has.
+
+Distractors model the mistakes candidates make: for OLD, adding the factor
+increments (1490 x 1.5 = 2235 for 1,2 and 1,3), adding the factors
+(x 2.5 = 3725) or applying only one factor (x 1.3 = 1937); for VREF, the
+value for another flap setting or a weight 5 t off; for RWYCC, the factor
+of a neighbouring code or none at all. Distances are rounded up to the metre, as the
+bank's answers are (1490 x 1.2 x 1.3 = 2324.4 -> 2325).
+
+Every variant's answer is re-checked with the scalar lookups and the
+record with stream_bank.validate_question before it is written as a
+quizData.json-compatible bank.
+
+    python3 perf_generator.py --count 2000 --seed 1
+"""
+
+import argparse
+import itertools
+import math
+import os
+import re
+
+import numpy as np
+
+from explanation_data import DATA_DIR, QUIZ_DATA, load_json
+from perf_tables import TABLES_PATH, PerfTables, factored_old
+from stream_bank import BankWriter, validate_question
+
+OUT_PATH = os.path.join(DATA_DIR, "perf_generated.json")
+FAILURES_PATH = os.path.join(DATA_DIR, "perf_failure_factors.json")
+LETTERS = "abcd"
+
+# Unfactored OLDs of the OLD and RWYCC templates, in metres
+OLD_VALUES = np.arange(120, 201) * 10
+
+FAILURE_RE = re.compile(r"-\s*([A-Z0-9][A-Z0-9 ]+?)\s*\((Caution|Warning)\)\s*-\s*OLD factor[^0-9]*(\d+[.,]\d+)")
+MIRRORS = (("L ENG", "R ENG"), ("HYD 1", "HYD 2"))
+
+CODE_PREFIX = {"old": "PGOLD", "vref": "PGVRF", "rwycc": "PGRCC"}
+
+
+def variant_code(template, i):
+    """Code matching CODE_RE: 2-digit block, template prefix, 3 digits (07PGOLD123)."""
+    return f"{i // 1000:02d}{CODE_PREFIX[template]}{i % 1000:03d}"
+
+
+def _system(name):
+    """Failure name with the side/number of a mirrored pair taken out."""
+    for left, right in MIRRORS:
+        name = name.replace(right, left)
+    return name
+
+
+def failure_factors(quiz_data=QUIZ_DATA, table=FAILURES_PATH):
+    """(name, level, factor, system) for each failure with a known OLD factor.
+
+    The checked-in table comes first; PERF questions in PERF06's
+    "- NAME (Caution) - OLD factor ... 1,2" form add failures it lacks.
+    """
+    catalog = {}
+    for entry in load_json(table)["failures"]:
+        catalog[entry["name"]] = (entry["level"], float(entry["factor"]), entry["system"])
+    for quiz in load_json(quiz_data)["quizzes"]:
+        for question in quiz["questions"]:
+            for name, level, factor in FAILURE_RE.findall(question.get("text", "")):
+                catalog.setdefault(name.strip(), (level, float(factor.replace(",", ".")), _system(name.strip())))
+    for name, entry in list(catalog.items()):
+        for left, right in MIRRORS:
+            if left in name:
+                catalog.setdefault(name.replace(left, right), entry)
+    return [(name, level, factor, system) for name, (level, factor, system) in sorted(catalog.items())]
+
+
+def _comma(value):
+    """1.2 -> "1,2" as the manuals print factors."""
+    return f"{value:g}".replace(".", ",")
+
+
+def _pick_options(correct, candidates, fallback_step):
+    """Correct value plus three distinct distractors from the candidate models."""
+    options = [correct]
+    for value in candidates:
+        if not math.isnan(value) and value > 0 and value not in options:
+            options.append(value)
+        if len(options) == 4:
+            return options
+    step = 1
+    while len(options) < 4:
+        for value in (correct + step * fallback_step, correct - step * fallback_step):
+            if value > 0 and value not in options and len(options) < 4:
+                options.append(value)
+        step += 1
+    return options
+
+
+def _distinct_draws(rng, count, *sizes):
+    """Up to count distinct index combinations over axes of the given sizes, one array per axis."""
+    total = math.prod(sizes)
+    drawn = rng.choice(total, size=min(count, total), replace=False)
+    return np.unravel_index(drawn, sizes)
+
+
+def _record(code, text, values, fmt, rng):
+    order = rng.permutation(len(values))
+    options = [{"letter": LETTERS[i], "text": fmt(values[j])} for i, j in enumerate(order)]
+    correct = LETTERS[int(np.flatnonzero(order == 0)[0])]
+    return {"code": code, "text": text, "type": "single", "options": options, "images": [], "correct": [correct]}
+
+
+def generate_old(count, rng, catalog, failures=2):
+    """OLD with several failure factors (PERF06 style), at most one variant per combination."""
+    # Failures of one system (L/R ENG FAIL, ENG FIRE) are not unrelated ones
+    combos = np.array([
+        combo for combo in itertools.permutations(range(len(catalog)), failures)
+        if len({catalog[j][3] for j in combo}) == failures
+    ], dtype=np.int64).reshape(-1, failures)
+    if not len(combos):
+        raise ValueError(f"need failures of at least {failures} different systems")
+    combo, old = _distinct_draws(rng, count, len(combos), len(OLD_VALUES))
+    picks = combos[combo]
+    unfactored = OLD_VALUES[old]
+    count = len(picks)
+    factors = np.array([factor for _, _, factor, _ in catalog])
+    chosen = factors[picks]
+
+    correct = np.ceil(np.round(unfactored * chosen.prod(axis=1), 6))
+    models = np.ceil(np.round(np.stack([
+        unfactored * (1 + (chosen - 1).sum(axis=1)),   # increments added
+        unfactored * chosen.sum(axis=1),               # factors added
+        unfactored * chosen.max(axis=1),               # only the largest factor
+        unfactored * chosen.min(axis=1),               # only the smallest factor
+    ], axis=1), 6))
+
+    questions = []
+    for i in range(count):
+        parts = " and ".join(
+            f"- {catalog[j][0]}{f' ({catalog[j][1]})' if catalog[j][1] else ''} - "
+            f"OLD factor for planned runway conditions {_comma(catalog[j][2])}"
+            for j in picks[i]
+        )
+        text = (f"A/C has multiple unrelated failures: {parts} Please calculate OLD for landing with "
+                f"mentioned malfunctions if unfactorised OLD is {unfactored[i]} meters:")
+        # Scalar re-check of the vectorized answer
+        expected = math.ceil(round(factored_old(int(unfactored[i]), *(catalog[j][2] for j in picks[i])), 6))
+        if expected != correct[i]:
+            raise AssertionError(f"OLD variant {i}: {correct[i]} != {expected}")
+        values = _pick_options(float(correct[i]), models[i].tolist(), 50.0)
+        questions.append(_record(variant_code("old", i), text, values, lambda v: f"{v:.0f} meters", rng))
+    return questions
+
+
+def generate_vref(count, rng, tables):
+    """VREF for a landing weight and flap setting (PERF12 style)."""
+    weights_range = tables.vref_weights
+    flaps = tables.vref_flaps
+    weight_values = np.arange(int(weights_range[0]) // 10, int(weights_range[-1]) // 10 + 1) * 10
+    weight, flap_index = _distinct_draws(rng, count, len(weight_values), len(flaps))
+    weights = weight_values[weight]
+    flap = flaps[flap_index]
+    count = len(weights)
+
+    raw = tables.vref_many(weights, flap)
+    correct = np.round(raw)
+    by_flap = np.stack([np.round(tables.vref_many(weights, np.full(count, f))) for f in flaps], axis=1)
+    lighter = np.round(tables.vref_many(weights - 5000, flap))
+    heavier = np.round(tables.vref_many(weights + 5000, flap))
+
+    questions = []
+    for i in range(count):
+        if math.isnan(correct[i]):
+            continue  # a flap column with a gap at this weight
+        expected = tables.vref(float(weights[i]), int(flap[i]))
+        if abs(expected - raw[i]) > 1e-3:
+            raise AssertionError(f"VREF variant {i}: {raw[i]} != {expected}")
+        text = (f"A/c expected landing weight is {weights[i]} kg. Landing is planned with flap {flap[i]}. "
+                f"What is the VREF?")
+        candidates = [v for j, v in enumerate(by_flap[i].tolist()) if flaps[j] != flap[i]]
+        values = _pick_options(float(correct[i]), candidates + [lighter[i], heavier[i]], 4.0)
+        questions.append(_record(variant_code("vref", i), text, values, lambda v: f"{v:.0f}", rng))
+    return questions
+
+
+def generate_rwycc(count, rng, tables):
+    """OLD for a runway condition code and an unfactored OLD."""
+    codes = tables.rwycc
+    factors = tables.rwycc_factors.astype(np.float64)
+    pick, old = _distinct_draws(rng, count, len(codes), len(OLD_VALUES))
+    questions = []
+    for i, (code_index, unfactored) in enumerate(zip(pick.tolist(), OLD_VALUES[old].tolist())):
+        factor = float(factors[code_index])
+        correct = math.ceil(round(factored_old(unfactored, factor), 6))
+        expected = math.ceil(round(unfactored * tables.runway_factor(codes[code_index]), 6))
+        if expected != correct:
+            raise AssertionError(f"RWYCC variant {i}: {correct} != {expected}")
+        # Neighbouring codes' factors first, then the unfactored distance
+        others = sorted(set(factors.tolist()) - {factor}, key=lambda f: abs(f - factor))
+        candidates = [math.ceil(round(unfactored * f, 6)) for f in others] + [unfactored]
+        values = _pick_options(float(correct), [float(v) for v in candidates], 50.0)
+        text = (f"Runway condition code {int(codes[code_index])} is reported for the landing runway. "
+                f"Please calculate OLD for landing if unfactorised OLD is {unfactored} meters:")
+        questions.append(_record(variant_code("rwycc", i), text, values, lambda v: f"{v:.0f} meters", rng))
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate PERF question variants.")
+    parser.add_argument("--count", type=int, default=1000, help="variants per template")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--template", action="append", choices=sorted(CODE_PREFIX))
+    parser.add_argument("--out", default=OUT_PATH)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    templates = args.template or sorted(CODE_PREFIX)
+    tables = PerfTables.load() if os.path.exists(TABLES_PATH) else None
+
+    generated = {}
+    for template in templates:
+        if template == "old":
+            generated[template] = generate_old(args.count, rng, failure_factors())
+        elif tables is None or (template == "vref" and tables.vref_weights is None) \
+                or (template == "rwycc" and tables.rwycc is None):
+            print(f"{template}: no table extracted (run perf_tables.py), skipping")
+        elif template == "vref":
+            generated[template] = generate_vref(args.count, rng, tables)
+        else:
+            generated[template] = generate_rwycc(args.count, rng, tables)
+
+    for template, questions in generated.items():
+        if len(questions) < args.count:
+            print(f"{template}: only {len(questions)} distinct variants")
+
+    problems = [(q["code"], p) for questions in generated.values() for q in questions for p in validate_question(q)]
+    if problems:
+        for code, problem in problems[:20]:
+            print(f"  {code}: {problem}")
+        raise SystemExit(f"{len(problems)} problems; nothing written")
+
+    total = sum(len(questions) for questions in generated.values())
+    with BankWriter(args.out) as writer:
+        writer.begin_quiz({"name": "Performance (generated)", "totalQuestions": total,
+                           "questionsToSelect": min(2, total)})
+        for questions in generated.values():
+            for question in questions:
+                writer.question(question)
+        writer.end_quiz()
+
+    print("=" * 80)
+    for template, questions in generated.items():
+        print(f"{template}: {len(questions)} variants")
+    print(f"Saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Performance tables from the manuals as typed arrays, with fast lookups.
+
+The PERF questions depend on a few tables: VREF by landing weight and flap
+setting, and the factors applied to the operational landing distance (OLD)
+per runway condition code (RWYCC). Instead of keeping ±5 lines of text
+around "VREF", this extracts them once:
+
+    vref             pdfplumber tables on pages mentioning VREF and FLAP whose
+                     first column is a weight and whose header row names flaps
+    runway_factors   tables with an RWYCC/RCC column and a factor column
+
+Tables are stored as NumPy arrays in .fcom_cache/perf_tables.npz together
+with the sha1 and page of every manual they came from, and rebuilt only
+when one of those manuals changes.
+
+    tables = PerfTables.load()
+    tables.vref(50000, 5)            # interpolated along weight, in kt
+    tables.runway_factor(3)
+    factored_old(1490, 1.2, 1.3)     # 2324.4
+
+Scalar lookups use bisect over tuples copied from the arrays (a few
+microseconds); vref_many() interpolates whole arrays of weights at once.
+
+    python3 perf_tables.py              # extract (if stale) and check PERF answer keys
+    python3 perf_tables.py --vref 50000 5
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from bisect import bisect_right
+
+import numpy as np
+
+from explanation_data import QUIZ_DATA, load_json
+from manual_corpus import CACHE_DIR, ManualCorpus
+
+TABLES_PATH = os.path.join(CACHE_DIR, "perf_tables.npz")
+FORMAT = 1
+
+NUMBER_RE = re.compile(r"^\s*(\d{1,3}(?:[ .,]\d{3})+|\d+(?:[.,]\d+)?)\s*$")
+FLAP_RE = re.compile(r"(?:FLAPS?|FLP)?\s*(\d{1,2})\b", re.IGNORECASE)
+RWYCC_RE = re.compile(r"\b(?:RWY\s*CC|RWYCC|RCC)\b", re.IGNORECASE)
+
+
+def parse_number(cell):
+    """"50 000" / "50,000" -> 50000.0, "1,15" -> 1.15, anything else -> None."""
+    if cell is None:
+        return None
+    match = NUMBER_RE.match(str(cell))
+    if not match:
+        return None
+    text = match.group(1)
+    if re.fullmatch(r"\d{1,3}(?:[ .,]\d{3})+", text):
+        return float(re.sub(r"[ .,]", "", text))
+    return float(text.replace(",", "."))
+
+
+def parse_vref_table(rows):
+    """(weights kg, flaps, values) from a table whose first column is weight, or None."""
+    def is_header(row):
+        labelled = any("FLAP" in str(c).upper() for c in row) or "WEIGHT" in str(row[0]).upper()
+        return labelled and sum(1 for c in row[1:] if c and FLAP_RE.search(str(c))) >= 2
+
+    header = next((row for row in rows if row and is_header(row)), None)
+    if header is None:
+        return None
+    columns = []
+    for i, cell in enumerate(header[1:], 1):
+        match = FLAP_RE.search(str(cell or ""))
+        if match:
+            columns.append((i, int(match.group(1))))
+
+    weights, values = [], []
+    for row in rows[rows.index(header) + 1:]:
+        weight = parse_number(row[0]) if row else None
+        if weight is None:
+            continue
+        if weight < 1000:
+            weight *= 1000  # tonnes
+        speeds = [parse_number(row[i]) if i < len(row) else None for i, _ in columns]
+        if all(speed is None for speed in speeds):
+            continue
+        weights.append(weight)
+        values.append([math.nan if speed is None else speed for speed in speeds])
+    if len(weights) < 2:
+        return None
+
+    order = np.argsort(weights)
+    return (np.array(weights, dtype=np.float32)[order],
+            np.array([flap for _, flap in columns], dtype=np.int16),
+            np.array(values, dtype=np.float32)[order])
+
+
+def parse_factor_table(rows):
+    """(codes, factors) from a table with an RWYCC column and a factor column, or None."""
+    header = next((row for row in rows if row and any(c and RWYCC_RE.search(str(c)) for c in row)), None)
+    if header is None:
+        return None
+    code_col = next(i for i, c in enumerate(header) if c and RWYCC_RE.search(str(c)))
+    factor_col = next((i for i, c in enumerate(header) if c and "FACTOR" in str(c).upper()), None)
+
+    codes, factors = [], []
+    for row in rows[rows.index(header) + 1:]:
+        if len(row) <= code_col:
+            continue
+        code = parse_number(row[code_col])
+        candidates = [row[factor_col]] if factor_col is not None and factor_col < len(row) else row[code_col + 1:]
+        factor = next((parse_number(c) for c in candidates if parse_number(c) is not None), None)
+        if code is None or factor is None or not 0 <= code <= 6 or not 0.5 <= factor <= 5:
+            continue
+        codes.append(int(code))
+        factors.append(factor)
+    if not codes:
+        return None
+    return np.array(codes, dtype=np.int8), np.array(factors, dtype=np.float32)
+
+
+def _extract(pdf_path, pages):
+    """Every pdfplumber table on the given pages, as (page, rows)."""
+    import pdfplumber
+
+    tables = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in pages:
+            page = pdf.pages[page_num - 1]
+            for rows in page.extract_tables():
+                tables.append((page_num, rows))
+            page.flush_cache()
+    return tables
+
+
+def extract_tables(corpus):
+    """Arrays and their sources from every manual of a built ManualCorpus."""
+    found = {}
+    sources = {}
+    for doc_id, doc in corpus.documents.items():
+        pages = sorted(set(corpus.candidate_pages(doc_id, "VREF FLAP", whole_words=True))
+                       | set(corpus.candidate_pages(doc_id, "RWYCC FACTOR", whole_words=True))
+                       | set(corpus.candidate_pages(doc_id, "RCC FACTOR", whole_words=True)))
+        if not pages:
+            continue
+        for page, rows in _extract(doc["path"], pages):
+            rows = [[(cell or "").strip() for cell in row] for row in rows if row]
+            if "vref" not in found:
+                grid = parse_vref_table(rows)
+                if grid is not None:
+                    found["vref"] = grid
+                    sources["vref"] = {"pdf": doc_id, "page": page, "sha1": doc["sha1"]}
+                    continue
+            if "runway_factors" not in found:
+                factors = parse_factor_table(rows)
+                if factors is not None:
+                    found["runway_factors"] = factors
+                    sources["runway_factors"] = {"pdf": doc_id, "page": page, "sha1": doc["sha1"]}
+    return found, sources
+
+
+def factored_old(unfactored, *factors):
+    """OLD with every applicable factor applied (factors multiply)."""
+    return unfactored * math.prod(factors)
+
+
+class PerfTables:
+    """Typed performance tables plus scalar and vectorized lookups."""
+
+    def __init__(self, arrays, sources):
+        self.sources = sources
+        self.vref_weights, self.vref_flaps, self.vref_values = arrays.get("vref", (None, None, None))
+        self.rwycc, self.rwycc_factors = arrays.get("runway_factors", (None, None))
+        # Plain tuples for the scalar path: bisect on them beats a NumPy call per lookup
+        if self.vref_weights is not None:
+            self._weights = tuple(self.vref_weights.tolist())
+            self._flap_column = {flap: i for i, flap in enumerate(self.vref_flaps.tolist())}
+            self._columns = [tuple(column) for column in self.vref_values.T.tolist()]
+        if self.rwycc is not None:
+            self._factors = dict(zip(self.rwycc.tolist(), self.rwycc_factors.tolist()))
+
+    # Persistence
+
+    @classmethod
+    def load(cls, path=TABLES_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != FORMAT:
+                raise ValueError(f"{path} has table format {meta.get('format')}, expected {FORMAT}")
+            arrays = {}
+            if "vref_weights" in data:
+                arrays["vref"] = (data["vref_weights"], data["vref_flaps"], data["vref_values"])
+            if "rwycc" in data:
+                arrays["runway_factors"] = (data["rwycc"], data["rwycc_factors"])
+        return cls(arrays, meta["sources"])
+
+    def save(self, path=TABLES_PATH):
+        arrays = {"meta": np.array(json.dumps({"format": FORMAT, "sources": self.sources}))}
+        if self.vref_weights is not None:
+            arrays.update(vref_weights=self.vref_weights, vref_flaps=self.vref_flaps, vref_values=self.vref_values)
+        if self.rwycc is not None:
+            arrays.update(rwycc=self.rwycc, rwycc_factors=self.rwycc_factors)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def build(cls, corpus=None, path=TABLES_PATH):
+        """Tables from the cache, re-extracted when a source manual changed."""
+        corpus = corpus or ManualCorpus.from_page_references().build()
+        if os.path.exists(path):
+            tables = cls.load(path)
+            current = {doc_id: doc["sha1"] for doc_id, doc in corpus.documents.items()}
+            if tables.sources and all(current.get(s["pdf"]) == s["sha1"] for s in tables.sources.values()):
+                return tables
+        tables = cls(*extract_tables(corpus))
+        tables.save(path)
+        return tables
+
+    # Lookups
+
+    def vref(self, weight, flap):
+        """VREF (kt) for a landing weight (kg) and flap setting, linear in weight."""
+        if self.vref_weights is None:
+            raise LookupError("no VREF table extracted")
+        column = self._columns[self._flap_column[flap]]
+        weights = self._weights
+        if not weights[0] <= weight <= weights[-1]:
+            raise ValueError(f"weight {weight} outside table range {weights[0]:.0f}-{weights[-1]:.0f} kg")
+        i = min(bisect_right(weights, weight), len(weights) - 1)
+        w0, w1 = weights[i - 1], weights[i]
+        v0, v1 = column[i - 1], column[i]
+        return v0 + (v1 - v0) * (weight - w0) / (w1 - w0)
+
+    def vref_many(self, weights, flaps):
+        """VREF for arrays of weights and flap settings (NaN outside the table)."""
+        weights = np.asarray(weights, dtype=np.float64)
+        flaps = np.asarray(flaps)
+        result = np.full(weights.shape, np.nan)
+        for i, flap in enumerate(self.vref_flaps):
+            rows = flaps == flap
+            if rows.any():
+                result[rows] = np.interp(weights[rows], self.vref_weights, self.vref_values[:, i],
+                                         left=np.nan, right=np.nan)
+        return result
+
+    def runway_factor(self, rwycc):
+        if self.rwycc is None:
+            raise LookupError("no runway condition factor table extracted")
+        return self._factors[int(rwycc)]
+
+
+# Numeric answer-key checks: code -> function(tables, question) giving the expected value
+
+OLD_FACTOR_RE = re.compile(r"OLD factor[^0-9]*(\d+[.,]\d+)", re.IGNORECASE)
+UNFACTORED_RE = re.compile(r"unfactori[sz]ed OLD is (\d+)", re.IGNORECASE)
+WEIGHT_RE = re.compile(r"landing weight is (\d+)\s*kg", re.IGNORECASE)
+
+
+def _perf06(tables, question):
+    """Unfactored OLD times each malfunction's OLD factor, all given in the question."""
+    factors = [float(f.replace(",", ".")) for f in OLD_FACTOR_RE.findall(question["text"])]
+    return factored_old(float(UNFACTORED_RE.search(question["text"]).group(1)), *factors)
+
+
+def _perf12(tables, question):
+    """VREF for flap 5 at the stated landing weight."""
+    return tables.vref(float(WEIGHT_RE.search(question["text"]).group(1)), 5)
+
+
+CHECKS = {"PERF06": _perf06, "PERF12": _perf12}
+
+
+def option_value(text):
+    """Number in an option such as "2325 meters" or "127"."""
+    return parse_number(re.sub(r"[^\d.,\s]", "", text).strip())
+
+
+def check_answer_keys(tables, quiz_data=QUIZ_DATA):
+    """(code, expected value, closest option, keyed option) per checked question."""
+    questions = {q["code"]: q for quiz in load_json(quiz_data)["quizzes"] for q in quiz["questions"]}
+    results = []
+    for code, check in CHECKS.items():
+        question = questions.get(code)
+        if question is None:
+            continue
+        try:
+            expected = check(tables, question)
+        except (LookupError, ValueError, AttributeError) as exc:
+            results.append((code, None, None, None, str(exc)))
+            continue
+        values = [(option_value(o["text"]), o["letter"]) for o in question["options"]]
+        numeric = [(abs(value - expected), letter) for value, letter in values if value is not None]
+        closest = min(numeric)[1] if numeric else None
+        results.append((code, expected, closest, ",".join(question.get("correct", [])), None))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract performance tables and check PERF answer keys.")
+    parser.add_argument("--rebuild", action="store_true", help="re-extract even if the cache is current")
+    parser.add_argument("--vref", nargs=2, type=float, metavar=("WEIGHT", "FLAP"))
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(TABLES_PATH):
+        os.unlink(TABLES_PATH)
+    tables = PerfTables.build()
+
+    print("=" * 80)
+    for name, source in tables.sources.items():
+        print(f"{name}: {source['pdf']} page {source['page']}")
+    if tables.vref_weights is not None:
+        print(f"VREF: {len(tables.vref_weights)} weights x flaps {tables.vref_flaps.tolist()}")
+    if tables.rwycc is not None:
+        print(f"Runway factors: {dict(zip(tables.rwycc.tolist(), tables.rwycc_factors.tolist()))}")
+
+    if args.vref:
+        print(f"\nVREF at {args.vref[0]:.0f} kg, flap {args.vref[1]:.0f}: "
+              f"{tables.vref(args.vref[0], int(args.vref[1])):.1f} kt")
+        return
+
+    print("\nAnswer key checks:")
+    for code, expected, closest, keyed, error in check_answer_keys(tables):
+        if error:
+            print(f"  {code}: cannot check ({error})")
+        else:
+            status = "ok" if closest == keyed else f"MISMATCH, key says {keyed}"
+            print(f"  {code}: expected {expected:.1f} -> option {closest} ({status})")
+
+
+if __name__ == "__main__":
+    main()
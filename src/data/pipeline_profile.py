@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and counters for the PDF extraction/search scripts.
+
+Library code records into whichever profile is active:
+
+    with pipeline_profile.stage("extract_text", pages=1, nbytes=len(text)):
+        ...
+    pipeline_profile.record_match(term)
+
+and scripts wrap their whole run:
+
+    with pipeline_profile.profiled_run("search_specific_nav"):
+        main()
+
+Every run writes a JSON profile (wall time, pages/sec and bytes per stage,
+matches per term, peak memory) to profiles/ under the cache directory
+(manual_corpus.CACHE_DIR) or to the path in FCOM_PROFILE. Set FCOM_CPROFILE=1 to also dump cProfile stats next to it,
+and FCOM_TRACEMALLOC=1 to measure peak Python heap with tracemalloc.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process (0 where unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RunProfile:
+    """Accumulates stage timings and counters for one run (or one worker)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.stages = {}
+        self.matches = {}
+        self.counters = {}
+        self.peak_traced_bytes = None
+        self.wall_seconds = None
+        self._t0 = time.perf_counter()
+        self._nested = []
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, {"seconds": 0.0, "calls": 0, "pages": 0, "bytes": 0})
+
+    @contextmanager
+    def stage(self, name, pages=0, nbytes=0):
+        """Time a block. Stage seconds are self time: nested stages are not counted twice."""
+        entry = self._stage(name)
+        self._nested.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            elapsed = time.perf_counter() - t0
+            nested = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            entry["seconds"] += elapsed - nested
+            entry["calls"] += 1
+            entry["pages"] += pages
+            entry["bytes"] += nbytes
+
+    def add(self, name, pages=0, nbytes=0):
+        """Attribute pages/bytes to a stage after the fact (e.g. once text size is known)."""
+        entry = self._stage(name)
+        entry["pages"] += pages
+        entry["bytes"] += nbytes
+
+    def record_match(self, term, count=1):
+        self.matches[term] = self.matches.get(term, 0) + count
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, data):
+        """Fold in a profile dict produced by a worker process."""
+        for name, theirs in data.get("stages", {}).items():
+            ours = self._stage(name)
+            for key in ("seconds", "calls", "pages", "bytes"):
+                ours[key] += theirs.get(key, 0)
+        for term, count in data.get("matches", {}).items():
+            self.record_match(term, count)
+        for name, value in data.get("counters", {}).items():
+            self.count(name, value)
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._t0
+
+    def to_dict(self):
+        stages = {}
+        for name, entry in self.stages.items():
+            seconds = entry["seconds"]
+            stages[name] = {
+                **entry,
+                "seconds": round(seconds, 6),
+                "pages_per_sec": round(entry["pages"] / seconds, 1) if seconds and entry["pages"] else None,
+                "mb_per_sec": round(entry["bytes"] / seconds / 1e6, 2) if seconds and entry["bytes"] else None,
+            }
+
+        wall = self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._t0
+        return {
+            "name": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": round(wall, 6),
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["seconds"])),
+            "matches": dict(sorted(self.matches.items(), key=lambda item: -item[1])),
+            "counters": self.counters,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "peak_traced_bytes": self.peak_traced_bytes,
+        }
+
+
+_active = None
+
+
+def active():
+    return _active
+
+
+@contextmanager
+def stage(name, pages=0, nbytes=0):
+    """Time a block against the active profile; a no-op when none is active."""
+    if _active is None:
+        yield None
+        return
+    with _active.stage(name, pages, nbytes) as entry:
+        yield entry
+
+
+def add(name, pages=0, nbytes=0):
+    if _active is not None:
+        _active.add(name, pages, nbytes)
+
+
+def record_match(term, count=1):
+    if _active is not None:
+        _active.record_match(term, count)
+
+
+def count(name, value=1):
+    if _active is not None:
+        _active.count(name, value)
+
+
+def merge(data):
+    if _active is not None and data:
+        _active.merge(data)
+
+
+@contextmanager
+def worker_profile(name):
+    """Collect a profile inside a worker process; the caller returns `to_dict()`."""
+    global _active
+    previous = _active
+    _active = RunProfile(name)
+    try:
+        yield _active
+    finally:
+        _active.finish()
+        _active = previous
+
+
+def profile_dir():
+    """profiles/ under manual_corpus.CACHE_DIR, imported late since manual_corpus imports this module."""
+    from manual_corpus import CACHE_DIR
+
+    return os.path.join(CACHE_DIR, "profiles")
+
+
+def profile_output_path(name):
+    path = os.environ.get("FCOM_PROFILE")
+    if path and not os.path.isdir(path):
+        return path
+    directory = path or profile_dir()
+    return os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+
+@contextmanager
+def profiled_run(name, cprofile=None, trace_memory=None):
+    """Profile a whole script run and write its JSON profile on exit."""
+    global _active
+    cprofile = os.environ.get("FCOM_CPROFILE") == "1" if cprofile is None else cprofile
+    trace_memory = os.environ.get("FCOM_TRACEMALLOC") == "1" if trace_memory is None else trace_memory
+
+    previous = _active
+    _active = profile = RunProfile(name)
+
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    profiler = None
+    if cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if trace_memory:
+            profile.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        profile.finish()
+        _active = previous
+
+        path = profile_output_path(name)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile.to_dict(), f, indent=2)
+        if profiler is not None:
+            profiler.dump_stats(os.path.splitext(path)[0] + ".prof")
+        print(f"\nProfile written to {path}", file=sys.stderr)
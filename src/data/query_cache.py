@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Memoized search results keyed by manual content hash and query spec.
+
+    cache = default_cache()
+    pages = cache.get_or_compute(
+        query_key(corpus.sha1, term, start_page, end_page, "substring"),
+        lambda: corpus.find_pages(term, start_page=start_page, end_page=end_page),
+    )
+
+A key is (manual sha1, normalized query, first page, last page, match mode).
+Results live in two layers: an in-process LRU, and one JSON file per key
+under <cache dir>/queries/ (manual_corpus.CACHE_DIR) that is evicted least-recently-used first once
+the directory grows past its size budget. A re-extracted PDF has a new
+sha1, so stale results are never returned; they simply age out.
+
+Callers cache one entry per term, so editing one term of a topic list only
+recomputes that term. Set FCOM_QUERY_CACHE=0 to bypass the disk layer.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import pipeline_profile
+
+MAX_ENTRIES = 1024             # in-process LRU size
+MAX_BYTES = 64 * 1024 * 1024   # on-disk budget
+
+
+def query_cache_dir():
+    """queries/ under manual_corpus.CACHE_DIR, which imports this module at load time."""
+    from manual_corpus import CACHE_DIR
+
+    return os.path.join(CACHE_DIR, "queries")
+
+
+def normalize_query(query, mode):
+    """Canonical form of a query for its match mode.
+
+    Whitespace inside a substring is significant, so substring modes only fold
+    case the way their matcher does: ASCII-only for the byte-level
+    `PageCorpus.find_pages`, `str.lower` for line matches. The query language
+    tokenizes its input, so there whitespace runs are collapsed but case is
+    kept (AND/OR/NOT).
+    """
+    if mode.startswith("query"):
+        return " ".join(query.split())
+    if mode == "substring":
+        return query.encode("utf-8").lower().decode("utf-8")
+    return query.lower()
+
+
+def query_key(sha1, query, start_page=1, end_page=None, mode="substring"):
+    return (sha1, normalize_query(query, mode), start_page, end_page, mode)
+
+
+def key_digest(key):
+    return hashlib.sha1(json.dumps(list(key), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """In-process LRU in front of a size-bounded directory of JSON results."""
+
+    def __init__(self, directory=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, disk=None):
+        self.directory = directory or query_cache_dir()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk = os.environ.get("FCOM_QUERY_CACHE") != "0" if disk is None else disk
+        self.memory = OrderedDict()
+        self._disk_bytes = None
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key, default=None):
+        digest = key_digest(key)
+        if digest in self.memory:
+            self.memory.move_to_end(digest)
+            pipeline_profile.count("query_cache_memory_hits")
+            return self.memory[digest]
+
+        if self.disk:
+            path = self._path(digest)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None and entry.get("key") == list(key):
+                os.utime(path)  # mtime is the disk layer's recency
+                self._remember(digest, entry["value"])
+                pipeline_profile.count("query_cache_disk_hits")
+                return entry["value"]
+
+        pipeline_profile.count("query_cache_misses")
+        return default
+
+    def put(self, key, value):
+        digest = key_digest(key)
+        self._remember(digest, value)
+        if not self.disk:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(digest)
+        data = json.dumps({"key": list(key), "value": value}, ensure_ascii=False).encode("utf-8")
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._disk_bytes = self.disk_bytes() + len(data) - previous
+        if self._disk_bytes > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _remember(self, digest, value):
+        self.memory[digest] = value
+        self.memory.move_to_end(digest)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _disk_entries(self):
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def disk_bytes(self):
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(entry.stat().st_size for entry in self._disk_entries())
+        return self._disk_bytes
+
+    def evict(self, target=None):
+        """Delete least recently used files until the directory is under target bytes."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        entries = sorted(self._disk_entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        removed = 0
+        for entry in entries:
+            if total <= target:
+                break
+            total -= entry.stat().st_size
+            os.unlink(entry.path)
+            removed += 1
+        self._disk_bytes = total
+        pipeline_profile.count("query_cache_evictions", removed)
+        return removed
+
+    def clear(self):
+        self.memory.clear()
+        for entry in self._disk_entries():
+            os.unlink(entry.path)
+        self._disk_bytes = 0
+
+
+_default = None
+
+
+def default_cache():
+    """Process-wide cache shared by ManualCorpus and the search scripts."""
+    global _default
+    if _default is None:
+        _default = QueryCache()
+    return _default
+
+
+def cached_find_pages(corpus, term, start_page=1, end_page=None, cache=None):
+    """`PageCorpus.find_pages` (case-insensitive) through the query cache."""
+    cache = cache or default_cache()
+    return cache.get_or_compute(
+        query_key(corpus.sha1, term, start_page, end_page, "substring"),
+        lambda: corpus.find_pages(term, start_page=start_page, end_page=end_page),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the on-disk query result cache.")
+    parser.add_argument("--clear", action="store_true")
+    parser.add_argument("--max-mb", type=float, help="evict down to this size")
+    args = parser.parse_args()
+
+    cache = QueryCache()
+    if args.clear:
+        cache.clear()
+    elif args.max_mb is not None:
+        print(f"Evicted {cache.evict(int(args.max_mb * 1024 * 1024))} entries")
+
+    print(f"{len(cache._disk_entries())} entries, {cache.disk_bytes() / 1024:.1f} KB in {cache.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,10 @@ except ImportError:
     exit(1)
 
 import json
+import os
+from manual_corpus import DATA_DIR, FCOM1_PDF
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+pdf_path = FCOM1_PDF
 
 # Simple search for key topics
 topics = {
@@ -88,7 +90,7 @@ try:
     print(json.dumps(json_output, indent=2, sort_keys=True))
 
     # Save to file
-    output_file = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/quiz-app/src/data/quick_nav_results.json"
+    output_file = os.path.join(DATA_DIR, "quick_nav_results.json")
     with open(output_file, 'w') as f:
         json.dump({
             "topic_pages": results,
@@ -1,7 +1,8 @@
 import pdfplumber
 import json
+from manual_corpus import FCOM1_PDF
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+pdf_path = FCOM1_PDF
 
 # Search terms for each question group
 searches = {
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Pre-render the manual pages cited in page_references.json.
+
+Only referenced pages (plus --neighbours pages either side) are rendered,
+to compressed WebP images in public/pages/, together with a short text
+snippet from the cached page corpus. ReviewScreen shows these instead of
+sending the trainee to the full PDF.
+
+Each page is keyed by a hash of its own content stream and images, so a
+new revision of a manual only re-renders the pages that actually changed.
+Rendering is spread over a process pool.
+
+public/pages/manifest.json:
+    {"pages": {"FCOM1": {"455": {"image": "/pages/FCOM1-455-1a2b3c4d.webp",
+                                 "width": ..., "height": ..., "hash": ..., "snippet": ...}}}}
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_profile
+from explanation_data import REPO_DIR, load_json
+from extract_figures import WEBP_QUALITY, referenced_pages, thumbnail_format
+from manual_corpus import ManualCorpus, open_page_corpus
+
+PAGES_DIR = os.path.join(REPO_DIR, "public", "pages")
+PAGES_URL = "/pages"
+MANIFEST = os.path.join(PAGES_DIR, "manifest.json")
+
+RENDER_DPI = 110
+MAX_WIDTH = 1100
+SNIPPET_CHARS = 600
+
+
+def page_content_hash(page):
+    """Hash of what is drawn on a pypdf page: content stream, size and image data."""
+    digest = hashlib.sha1()
+    digest.update(repr([float(v) for v in page.mediabox]).encode())
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    try:
+        for image_file in page.images:
+            digest.update(image_file.data)
+    except Exception:
+        pass
+    return digest.hexdigest()[:16]
+
+
+def _render_chunk(doc_id, pdf_path, pages, previous, out_dir, dpi, max_width, fmt, settings_key):
+    """Render pages whose content hash changed; returns page -> manifest record."""
+    from pypdf import PdfReader
+
+    records = {}
+    with pipeline_profile.worker_profile(f"render {doc_id} {pages[0]}-{pages[-1]}") as profile:
+        reader = PdfReader(pdf_path)
+        plumber = None
+        try:
+            for page_num in pages:
+                with pipeline_profile.stage("hash", pages=1):
+                    content_hash = hashlib.sha1(
+                        (page_content_hash(reader.pages[page_num - 1]) + settings_key).encode()
+                    ).hexdigest()[:16]
+
+                old = previous.get(str(page_num))
+                if old and old["hash"] == content_hash and os.path.exists(os.path.join(out_dir, old["file"])):
+                    pipeline_profile.count("pages_unchanged")
+                    records[page_num] = old
+                    continue
+
+                if plumber is None:
+                    import pdfplumber
+                    plumber = pdfplumber.open(pdf_path)
+
+                page = plumber.pages[page_num - 1]
+                with pipeline_profile.stage("render", pages=1):
+                    image = page.to_image(resolution=dpi).original
+                page.flush_cache()
+
+                with pipeline_profile.stage("encode", pages=1):
+                    if image.width > max_width:
+                        image = image.resize((max_width, round(image.height * max_width / image.width)))
+                    image = image.convert("RGB")
+                    buffer = io.BytesIO()
+                    if fmt == "webp":
+                        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+                    else:
+                        image.save(buffer, "PNG", optimize=True)
+
+                name = f"{doc_id}-{page_num}-{content_hash[:8]}.{fmt}"
+                tmp_path = os.path.join(out_dir, f".{name}.{os.getpid()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(buffer.getvalue())
+                os.replace(tmp_path, os.path.join(out_dir, name))
+                pipeline_profile.count("pages_rendered")
+
+                if old and old["file"] != name and os.path.exists(os.path.join(out_dir, old["file"])):
+                    os.unlink(os.path.join(out_dir, old["file"]))
+
+                records[page_num] = {
+                    "file": name, "hash": content_hash, "width": image.width, "height": image.height,
+                }
+        finally:
+            if plumber is not None:
+                plumber.close()
+    return doc_id, records, profile.to_dict()
+
+
+def with_neighbours(pages, neighbours, page_count):
+    wanted = set()
+    for page in pages:
+        wanted.update(range(max(1, page - neighbours), min(page_count, page + neighbours) + 1))
+    return sorted(wanted)
+
+
+def snippet(text, limit=SNIPPET_CHARS):
+    """First lines of a page's text, whitespace-collapsed and cut at a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + " …"
+
+
+def render_pages(neighbours=0, dpi=RENDER_DPI, max_width=MAX_WIDTH, fmt="webp",
+                 out_dir=PAGES_DIR, workers=None, chunk_size=15, pdfs=None):
+    """Render every referenced page that changed since the last run; return the manifest."""
+    fmt = thumbnail_format(fmt)
+    settings_key = f"{dpi}/{max_width}/{fmt}"
+    previous = load_json(MANIFEST)["pages"] if os.path.exists(MANIFEST) else {}
+    manuals = ManualCorpus.from_page_references().manuals
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = []
+    corpora = {}
+    for doc_id, pages in referenced_pages().items():
+        if pdfs and doc_id not in pdfs:
+            continue
+        pdf_path = manuals.get(doc_id)
+        if not pdf_path or not os.path.exists(pdf_path):
+            print(f"{doc_id}: PDF not found, skipping")
+            continue
+
+        corpora[doc_id] = open_page_corpus(doc_id, pdf_path)
+        wanted = with_neighbours(pages, neighbours, len(corpora[doc_id]))
+        print(f"{doc_id}: {len(pages)} referenced pages, {len(wanted)} with neighbours")
+        for start in range(0, len(wanted), chunk_size):
+            jobs.append((doc_id, pdf_path, wanted[start:start + chunk_size]))
+
+    # Manuals not rendered in this run keep their previous entries
+    manifest = {
+        "settings": {"dpi": dpi, "maxWidth": max_width, "format": fmt},
+        "pages": {doc_id: pages for doc_id, pages in previous.items() if doc_id not in corpora},
+    }
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_render_chunk, doc_id, pdf_path, pages, previous.get(doc_id, {}),
+                        out_dir, dpi, max_width, fmt, settings_key)
+            for doc_id, pdf_path, pages in jobs
+        ]
+        for future in futures:
+            doc_id, records, profile = future.result()
+            pipeline_profile.merge(profile)
+            doc_pages = manifest["pages"].setdefault(doc_id, {})
+            for page_num, record in records.items():
+                doc_pages[str(page_num)] = {
+                    **record,
+                    "image": f"{PAGES_URL}/{record['file']}",
+                    "snippet": snippet(corpora[doc_id].page_text(page_num)),
+                }
+
+    for doc_id, doc_pages in manifest["pages"].items():
+        manifest["pages"][doc_id] = dict(sorted(doc_pages.items(), key=lambda item: int(item[0])))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render the manual pages cited by the quiz.")
+    parser.add_argument("--neighbours", type=int, default=0, help="also render this many pages either side")
+    parser.add_argument("--dpi", type=int, default=RENDER_DPI)
+    parser.add_argument("--max-width", type=int, default=MAX_WIDTH)
+    parser.add_argument("--format", choices=["webp", "png"], default="webp")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--pdf", action="append", help="only this manual (repeatable)")
+    args = parser.parse_args()
+
+    with pipeline_profile.profiled_run("render_source_pages") as profile:
+        manifest = render_pages(args.neighbours, args.dpi, args.max_width, args.format,
+                                workers=args.workers, pdfs=args.pdf)
+
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    total = sum(len(pages) for pages in manifest["pages"].values())
+    print("\n" + "=" * 80)
+    print(f"Pages:     {total}")
+    print(f"Rendered:  {profile.counters.get('pages_rendered', 0)}")
+    print(f"Unchanged: {profile.counters.get('pages_unchanged', 0)}")
+    print(f"Manifest saved to: {MANIFEST}")
+
+
+if __name__ == "__main__":
+    main()
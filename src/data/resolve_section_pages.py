@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Resolve textual `page` fields in the explanations to real PDF page numbers.
+
+Entries such as {"page": "Bleed Air System"} or
+{"pdf": "FCOM1", "page": "Air Conditioning, Bleed Air and Pressurization - APU Bleed Control"}
+are matched against a precomputed index of FCOM outline entries, page
+headings and page markers (04−01−1 style), then replaced with an integer
+page and a confidence score. The manual a field belongs to (its `source`
+or `sources[].pdf`, e.g. "Operations Manual Part B") is mapped to a
+`_meta.pdfs` ID of page_references.json by ID, PDF file name or
+`_meta.aliases`; fields naming no known manual are reported apart.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+
+from explanation_data import (
+    MERGED_EXPLANATIONS, explanation_files, iter_entries, load_json, write_json,
+)
+from fcom_outline import outline_entries
+from manual_corpus import CACHE_DIR, PAGE_REFERENCES, ManualCorpus
+
+MARKER_RE = re.compile(r"\b(\d{2})\s*[−–-]\s*(\d{2})\s*[−–-]\s*(\d{1,3})\b")
+WORD_RE = re.compile(r"[A-Z0-9]+")
+STOPWORDS = {
+    "A", "AN", "AND", "THE", "OF", "TO", "FOR", "IN", "ON", "WITH",
+    "SECTION", "CHAPTER", "SYSTEM", "SYSTEMS",
+}
+
+HEADER_LINES = 12
+FOOTER_LINES = 6
+
+# How much a match from each kind of index entry is trusted
+SOURCE_WEIGHT = {"outline": 1.0, "heading": 0.9}
+
+
+def normalize_marker(chapter, section, page):
+    return f"{int(chapter):02d}-{int(section):02d}-{int(page)}"
+
+
+def title_tokens(text):
+    """Significant uppercase tokens of a heading or section title."""
+    text = text.upper().replace("−", "-").replace("–", "-")
+    return [t for t in WORD_RE.findall(text) if t not in STOPWORDS]
+
+
+def looks_like_heading(line):
+    """Short, mostly uppercase lines or `SYSTEM – TOPIC` style titles."""
+    line = line.strip()
+    if not 3 <= len(line) <= 90:
+        return False
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) < 3:
+        return False
+    upper_ratio = sum(c.isupper() for c in letters) / len(letters)
+    return upper_ratio >= 0.8 or " – " in line
+
+
+def build_heading_index(doc, cache_dir=CACHE_DIR):
+    """Collect outline titles, page headings and page markers for one manual."""
+    cache_path = os.path.join(cache_dir, f"{doc['pdf']}.headings.json")
+    if os.path.exists(cache_path):
+        cached = load_json(cache_path)
+        if cached.get("sha1") == doc["sha1"]:
+            return cached
+
+    headings = []
+    seen = set()
+
+    try:
+        from pypdf import PdfReader
+        outline = outline_entries(PdfReader(doc["path"]))
+    except Exception as e:
+        print(f"Could not read outline of {doc['pdf']}: {e}")
+        outline = []
+
+    for _, title, page in outline:
+        key = " ".join(title_tokens(title))
+        if key and key not in seen:
+            seen.add(key)
+            headings.append([title, page, "outline"])
+
+    markers = {}
+    for page_num, text in enumerate(doc["pages"], 1):
+        lines = [line for line in text.split('\n') if line.strip()]
+        edge_lines = lines[:HEADER_LINES] + lines[-FOOTER_LINES:]
+
+        for line in edge_lines:
+            for match in MARKER_RE.finditer(line):
+                markers.setdefault(normalize_marker(*match.groups()), page_num)
+
+        # First occurrence of a heading is where that section starts
+        for line in lines[:HEADER_LINES]:
+            if not looks_like_heading(line):
+                continue
+            key = " ".join(title_tokens(line))
+            if key and key not in seen:
+                seen.add(key)
+                headings.append([line.strip(), page_num, "heading"])
+
+    index = {"sha1": doc["sha1"], "headings": headings, "markers": markers}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return index
+
+
+def chapter_ranges(page_references=PAGE_REFERENCES):
+    """Chapter code -> (name tokens, first page, last page) from `_meta.chapters`."""
+    chapters = load_json(page_references)["_meta"]["chapters"]
+    ordered = sorted(chapters.items(), key=lambda item: item[1]["startPage"])
+    ranges = {}
+    for i, (code, chapter) in enumerate(ordered):
+        end = ordered[i + 1][1]["startPage"] - 1 if i + 1 < len(ordered) else math.inf
+        ranges[code] = (set(title_tokens(chapter["name"])), chapter["startPage"], end)
+    return ranges
+
+
+class SectionResolver:
+    """Matches section titles against a heading index with idf-weighted overlap."""
+
+    def __init__(self, heading_index, chapters=None):
+        self.headings = heading_index["headings"]
+        self.markers = heading_index["markers"]
+        self.chapters = chapters or {}
+        self.memo = {}
+
+        self.tokens = [set(title_tokens(title)) for title, _, _ in self.headings]
+        self.postings = {}
+        for i, tokens in enumerate(self.tokens):
+            for token in tokens:
+                self.postings.setdefault(token, []).append(i)
+
+        total = len(self.headings) + 1
+        self.idf = {token: math.log(total / len(ids)) + 1.0 for token, ids in self.postings.items()}
+        self.unknown_idf = math.log(total) + 1.0
+        self.norms = [sum(self.idf[t] for t in tokens) for tokens in self.tokens]
+
+    def match_chapter(self, text):
+        """Chapter code whose name best covers the given text, if any."""
+        tokens = set(title_tokens(text))
+        best, best_score = None, 0.0
+        for code, (name_tokens, _, _) in self.chapters.items():
+            if not name_tokens or not tokens:
+                continue
+            score = len(tokens & name_tokens) / len(tokens | name_tokens)
+            if score > best_score:
+                best, best_score = code, score
+        return best if best_score >= 0.5 else None
+
+    def resolve(self, text, code=None):
+        """Resolve one page field; returns None when nothing plausible is found."""
+        key = (text, code[:5] if code else None)
+        if key not in self.memo:
+            self.memo[key] = self._resolve(text, key[1])
+        return self.memo[key]
+
+    def _resolve(self, text, chapter_code):
+        text = text.strip()
+        if text.isdigit():
+            return {"page": int(text), "confidence": 1.0, "method": "numeric"}
+
+        marker = MARKER_RE.fullmatch(text)
+        if marker:
+            page = self.markers.get(normalize_marker(*marker.groups()))
+            if page:
+                return {"page": page, "confidence": 0.95, "method": "marker", "matched": text}
+            return None
+
+        parts = [part.strip() for part in re.split(r"\s+[-–−]\s+", text) if part.strip()]
+        named_chapter = self.match_chapter(parts[0]) if len(parts) > 1 else self.match_chapter(text)
+        chapter = named_chapter or (chapter_code if chapter_code in self.chapters else None)
+
+        query = " ".join(parts[1:]) if named_chapter and len(parts) > 1 else text
+        tokens = set(title_tokens(query))
+        result = self._best_heading(tokens, chapter) if tokens else None
+
+        # "Hydraulics Chapter" / "Air Conditioning Section" only name a chapter
+        names_chapter_only = named_chapter and tokens <= self.chapters[named_chapter][0]
+        if names_chapter_only and (result is None or result["confidence"] < 0.5):
+            return {"page": self.chapters[named_chapter][1], "confidence": 0.5,
+                    "method": "chapter", "matched": named_chapter}
+        return result
+
+    def _best_heading(self, tokens, chapter):
+        shared = {}
+        for token in tokens:
+            for i in self.postings.get(token, ()):
+                shared[i] = shared.get(i, 0.0) + self.idf[token]
+        if not shared:
+            return None
+
+        query_norm = sum(self.idf.get(t, self.unknown_idf) for t in tokens)
+        _, first, last = self.chapters.get(chapter, (None, None, None))
+
+        best, best_score = None, 0.0
+        for i, weight in shared.items():
+            title, page, source = self.headings[i]
+            score = weight / math.sqrt(query_norm * self.norms[i]) * SOURCE_WEIGHT[source]
+            if chapter and not first <= page <= last:
+                score *= 0.5
+            if score > best_score:
+                best, best_score = i, score
+
+        title, page, source = self.headings[best]
+        return {"page": page, "confidence": round(best_score, 2), "method": source, "matched": title}
+
+
+def normalize_manual(name):
+    """"Operations_Manual_Part_B_A220_TR027.6.pdf" -> "OPERATIONS MANUAL PART B A220 TR027.6"."""
+    name = re.sub(r"\.pdf$", "", name.strip(), flags=re.IGNORECASE)
+    return " ".join(name.replace("_", " ").upper().split())
+
+
+def manual_aliases(page_references=PAGE_REFERENCES):
+    """Normalized manual name -> document ID: the IDs, PDF file names and `_meta.aliases`."""
+    meta = load_json(page_references)["_meta"]
+    aliases = {}
+    for doc_id, filename in meta["pdfs"].items():
+        for name in [doc_id, filename, *meta.get("aliases", {}).get(doc_id, [])]:
+            aliases[normalize_manual(name)] = doc_id
+    return aliases
+
+
+def manual_id(name, aliases):
+    """Document ID named by a `source`/`pdf` string, by its longest known prefix; None if unknown.
+
+    "FCOM1 - APU System" -> FCOM1, "A220-300 FCOM Vol 1" -> FCOM1,
+    "Operations Manual Part B / Aircraft Characteristics" -> OM.
+    """
+    if not isinstance(name, str):
+        return None
+    text = normalize_manual(name)
+    best = None
+    for alias, doc_id in aliases.items():
+        if text.startswith(alias) and not text[len(alias):len(alias) + 1].isalnum():
+            if best is None or len(alias) > len(best[0]):
+                best = (alias, doc_id)
+    return best[1] if best else None
+
+
+def page_fields(entry):
+    """Yield (holder dict, manual name) for every textual page field in an explanation entry."""
+    if isinstance(entry.get("page"), str):
+        yield entry, entry.get("source")
+    for source in entry.get("sources") or []:
+        if isinstance(source, dict) and isinstance(source.get("page"), str):
+            yield source, source.get("pdf")
+
+
+def resolve_files(paths, resolvers, min_confidence=0.5, write=False, aliases=None):
+    """Resolve every textual page field across the given files in one pass.
+
+    Fields naming no known manual go to `unknownManual`, apart from the
+    `unresolved` ones whose manual was searched without a good match.
+    """
+    aliases = manual_aliases() if aliases is None else aliases
+    report = {"resolved": [], "unresolved": [], "unknownManual": []}
+
+    for path in paths:
+        data = load_json(path)
+        changed = False
+
+        for code, entry in iter_entries(data):
+            for holder, name in page_fields(entry):
+                pdf = manual_id(name, aliases)
+                text = holder["page"]
+                record = {"file": os.path.basename(path), "code": code, "pdf": pdf, "text": text}
+                if pdf is None:
+                    report["unknownManual"].append({**record, "source": name})
+                    continue
+                resolver = resolvers.get(pdf)
+                if resolver is None:
+                    report["unresolved"].append({**record, "reason": "manual not indexed", "best": None})
+                    continue
+
+                result = resolver.resolve(text, code)
+                if result is None or result["confidence"] < min_confidence:
+                    reason = "no matching heading" if result is None else "low confidence"
+                    report["unresolved"].append({**record, "reason": reason, "best": result})
+                    continue
+
+                report["resolved"].append({**record, **result})
+                if write:
+                    holder["section"] = text
+                    holder["page"] = result["page"]
+                    holder["pageConfidence"] = result["confidence"]
+                    changed = True
+
+        if changed:
+            write_json(path, data)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--write", action="store_true", help="replace resolved page fields in place")
+    parser.add_argument("--min-confidence", type=float, default=0.5)
+    parser.add_argument("--report", default=os.path.join(CACHE_DIR, "section_pages_report.json"))
+    args = parser.parse_args()
+
+    corpus = ManualCorpus.from_page_references().build()
+    chapters = chapter_ranges()
+
+    resolvers = {}
+    for doc_id, doc in corpus.documents.items():
+        index = build_heading_index(doc)
+        print(f"{doc_id}: {len(index['headings'])} headings, {len(index['markers'])} page markers")
+        resolvers[doc_id] = SectionResolver(index, chapters if doc_id == "FCOM1" else None)
+
+    paths = [MERGED_EXPLANATIONS] + explanation_files()
+    report = resolve_files(paths, resolvers, args.min_confidence, args.write)
+
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 80)
+    print(f"Resolved:   {len(report['resolved'])}")
+    print(f"Unresolved: {len(report['unresolved'])}")
+    print(f"Unknown manual: {len(report['unknownManual'])}")
+    print(f"Report saved to: {args.report}")
+    if not args.write:
+        print("Dry run - re-run with --write to update the explanation files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service that collects finished attempts into one SQLite store.
+
+The app keeps results only in each browser's localStorage, so nothing can
+be aggregated across trainees. This service accepts submitted attempts
+
+    POST /attempts
+    {"trainee": "T042", "quiz": "Quiz 3", "answers": {"02AIR38": ["a"], ...},
+     "totalQuestions": 50, "timeUsed": 5400, "score": 82}
+
+(or a JSON list of them) and answers once they are committed. The
+question count (`totalQuestions`, or the length of a `questions` list) is
+required: unanswered questions are scored as wrong, so the answers alone
+do not give the score's denominator. Requests
+are coalesced in memory and written by a single writer thread in batched
+transactions to a WAL-mode database, so thousands of submissions share a
+handful of commits ("group commit"): a batch is written when it reaches
+--batch-size attempts or has waited --flush-ms, whichever comes first.
+
+    GET /stats      counts of stored attempts and of batches written
+    GET /health
+
+    python3 results_service.py serve --port 8765
+    python3 results_service.py export attempts.jsonl   # for item_analysis.py
+
+The HTTP handling is deliberately small (HTTP/1.1, Content-Length bodies,
+keep-alive) and stdlib-only; results_loadgen.py measures throughput.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from manual_corpus import CACHE_DIR
+
+DB_PATH = os.path.join(CACHE_DIR, "results.sqlite3")
+DEFAULT_PORT = 8765
+BATCH_SIZE = 500
+FLUSH_MS = 20
+MAX_BODY = 4 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    trainee TEXT NOT NULL,
+    quiz TEXT,
+    submitted_at REAL NOT NULL,
+    received_at REAL NOT NULL,
+    time_used REAL,
+    score REAL,
+    total_questions INTEGER,        -- NULL only in rows stored before it was recorded
+    answers TEXT NOT NULL           -- {"02AIR38": "a", "04APU03": "bd"}
+);
+CREATE INDEX IF NOT EXISTS attempts_trainee ON attempts(trainee);
+"""
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def body_length(value):
+    """Byte count from a Content-Length header (0 when absent); ValueError unless a plain decimal."""
+    if value is None or value == "":
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(f"bad Content-Length {value!r}")
+    return int(value)
+
+
+def open_db(path=DB_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    columns = {row[1] for row in db.execute("PRAGMA table_info(attempts)")}
+    if "total_questions" not in columns:
+        db.execute("ALTER TABLE attempts ADD COLUMN total_questions INTEGER")
+    return db
+
+
+def parse_attempt(record, received_at):
+    """Validated attempts row for one submission; raises ValueError on bad input.
+
+    Answers are stored as one compact JSON object per attempt rather than a
+    row per question, which keeps a batch to one insert per attempt.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("attempt must be an object")
+    trainee = record.get("trainee")
+    if not isinstance(trainee, str) or not trainee:
+        raise ValueError("attempt needs a trainee")
+    answers = record.get("answers")
+    if not isinstance(answers, dict):
+        raise ValueError("answers must map question code -> selected letters")
+
+    selected = {}
+    for code, letters in answers.items():
+        if isinstance(letters, str):
+            letters = [letters]
+        if not isinstance(letters, list) or not all(isinstance(l, str) for l in letters):
+            raise ValueError(f"answer for {code} must be a list of letters")
+        selected[code] = "".join(sorted(l.strip().lower() for l in letters))
+
+    def number(key):
+        value = record.get(key)
+        if value is not None and not isinstance(value, (int, float)):
+            raise ValueError(f"{key} must be a number")
+        return value
+
+    total = len(record["questions"]) if isinstance(record.get("questions"), list) else record.get("totalQuestions")
+    if not isinstance(total, int) or isinstance(total, bool) or total < 1:
+        raise ValueError("attempt needs totalQuestions (or a questions list)")
+    if total < len(selected):
+        raise ValueError(f"totalQuestions {total} is less than the {len(selected)} answers")
+
+    submitted_at = number("submittedAt")
+    return (trainee, record.get("quiz"), submitted_at or received_at, received_at,
+            number("timeUsed"), number("score"), total, json.dumps(selected, separators=(",", ":")))
+
+
+class BatchWriter:
+    """Coalesces attempts and commits them in batches from one writer thread."""
+
+    def __init__(self, db, batch_size=BATCH_SIZE, flush_ms=FLUSH_MS):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_delay = flush_ms / 1000
+        self.pending = []                 # (rows, future) per request
+        self.pending_rows = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self.wakeup = asyncio.Event()
+        self.full = asyncio.Event()
+        self.batches = 0
+        self.written = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def submit(self, rows):
+        """Queue parsed attempts; resolves with their ids once committed."""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((rows, future))
+        self.pending_rows += len(rows)
+        if self.pending_rows >= self.batch_size:
+            self.full.set()
+        self.wakeup.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            if self.pending_rows < self.batch_size:
+                # Give other submissions until the flush delay to join this batch
+                self.full.clear()
+                try:
+                    await asyncio.wait_for(self.full.wait(), self.flush_delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    def _take_batch(self):
+        """Whole requests from the front of the queue, about batch_size rows."""
+        taken = 0
+        count = 0
+        for rows, _ in self.pending:
+            if count and taken + len(rows) > self.batch_size:
+                break
+            taken += len(rows)
+            count += 1
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        self.pending_rows -= taken
+        return batch
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            batch = self._take_batch()
+            try:
+                ids = await loop.run_in_executor(self.executor, self._write, batch)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            start = 0
+            for rows, future in batch:
+                if not future.done():
+                    future.set_result(ids[start:start + len(rows)])
+                start += len(rows)
+
+    def _write(self, batch):
+        """One transaction for the whole batch (runs on the writer thread)."""
+        ids = []
+        with self.db:
+            cursor = self.db.cursor()
+            for rows, _ in batch:
+                for attempt in rows:
+                    cursor.execute(
+                        "INSERT INTO attempts (trainee, quiz, submitted_at, received_at, time_used, score,"
+                        " total_questions, answers) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", attempt)
+                    ids.append(cursor.lastrowid)
+        self.batches += 1
+        self.written += len(ids)
+        return ids
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        await self.flush()
+        self.executor.shutdown()
+
+
+class ResultsService:
+    def __init__(self, db_path=DB_PATH, batch_size=BATCH_SIZE, flush_ms=FLUSH_MS):
+        self.db = open_db(db_path)
+        self.writer = BatchWriter(self.db, batch_size, flush_ms)
+        self.started = time.time()
+
+    async def handle(self, method, path, body):
+        """(status, payload) for one request."""
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"ok": True}
+        if path == "/stats":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            # Through the writer thread, which owns the connection
+            stored = await asyncio.get_running_loop().run_in_executor(
+                self.writer.executor, lambda: self.db.execute("SELECT COUNT(*) FROM attempts").fetchone()[0])
+            return 200, {
+                "attempts": stored,
+                "batches": self.writer.batches,
+                "writtenSinceStart": self.writer.written,
+                "pending": self.writer.pending_rows,
+                "uptime": round(time.time() - self.started, 1),
+            }
+        if path != "/attempts":
+            return 404, {"error": f"no route {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        try:
+            data = json.loads(body)
+            received_at = time.time()
+            records = data if isinstance(data, list) else [data]
+            rows = [parse_attempt(record, received_at) for record in records]
+        except ValueError as exc:  # includes JSONDecodeError
+            return 400, {"error": str(exc)}
+        if not rows:
+            return 400, {"error": "no attempts"}
+        ids = await self.writer.submit(rows)
+        return 202, {"stored": len(ids), "ids": ids}
+
+    async def connection(self, reader, writer):
+        """Serve one keep-alive connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "bad request line"}, close=True)
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                # Checked before reading: a negative or malformed length must not reach readexactly
+                try:
+                    length = body_length(headers.get("content-length"))
+                except ValueError as exc:
+                    await self.respond(writer, 400, {"error": str(exc)}, close=True)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": "body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                try:
+                    status, payload = await self.handle(method, path, body)
+                except Exception as exc:
+                    status, payload = 500, {"error": str(exc)}
+                await self.respond(writer, status, payload, close)
+                if close:
+                    break
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, payload, close=False):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Access-Control-Allow-Origin: *\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def serve(self, host, port):
+        self.writer.start()
+        server = await asyncio.start_server(self.connection, host, port, backlog=1024)
+        print(f"Listening on http://{host}:{port} (batch {self.writer.batch_size}, "
+              f"flush {self.writer.flush_delay * 1000:.0f} ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.writer.close()
+            self.db.close()
+
+
+def export_attempts(db_path, out_path):
+    """Write stored attempts as JSONL in the per-attempt shape item_analysis.py reads."""
+    db = open_db(db_path)
+    count = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        rows = db.execute(
+            "SELECT id, trainee, quiz, submitted_at, time_used, score, total_questions, answers"
+            " FROM attempts ORDER BY id")
+        for attempt_id, trainee, quiz, submitted_at, time_used, score, total, answers in rows:
+            f.write(json.dumps({
+                "trainee": trainee, "attempt": str(attempt_id), "quiz": quiz,
+                "submittedAt": submitted_at, "timeUsed": time_used, "score": score, "totalQuestions": total,
+                "answers": {code: list(letters) for code, letters in json.loads(answers).items()},
+            }, ensure_ascii=False) + "\n")
+            count += 1
+    db.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect quiz attempts into a SQLite store.")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the ingest service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    serve.add_argument("--flush-ms", type=float, default=FLUSH_MS)
+
+    export = sub.add_parser("export", help="dump attempts as JSONL")
+    export.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        service = ResultsService(args.db, args.batch_size, args.flush_ms)
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        count = export_attempts(args.db, args.path)
+        print(f"Exported {count} attempts to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
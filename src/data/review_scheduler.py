@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Spaced-repetition review queues over the quizData.json question codes.
+
+Each trainee's item state lives in a handful of typed arrays indexed by
+question position in the bank (due time, interval, ease, repetitions,
+lapses) plus one heap of (due, tiebreak, item, version) per chapter. Answers are
+scheduled with an SM-2 style rule: a correct answer stretches the
+interval by the item's ease, a wrong one brings it back within minutes
+and lowers the ease.
+
+`next_due(trainee, n)` honours the chapter `selection` quotas of
+quizData.json (scaled to n): each chapter first contributes up to its
+quota of due items, then remaining slots go to the most overdue items
+of any chapter. Only the k items looked at are popped and pushed back,
+so a draw costs O(k log n); superseded heap entries are dropped lazily.
+Never-seen items are due immediately, in a per-trainee random order.
+
+State is one small binary file per trainee, loaded on first use, so a
+single process can serve thousands of trainees. The file carries the
+question codes its columns belong to and is remapped by code on load:
+questions added to the bank since start fresh, removed ones are dropped.
+"""
+
+import argparse
+import heapq
+import os
+import random
+import struct
+import time
+from array import array
+
+from explanation_data import QUIZ_DATA, load_json
+from manual_corpus import CACHE_DIR
+
+STATE_DIR = os.path.join(CACHE_DIR, "review_state")
+
+MINUTE = 60.0
+DAY = 86400.0
+RELEARN_INTERVAL = 10 * MINUTE
+FIRST_INTERVALS = (1 * DAY, 6 * DAY)
+START_EASE = 2.5
+MIN_EASE = 1.3
+MAX_EASE = 3.0
+
+STATE_MAGIC = b"SRQ2"
+
+
+def scaled_quotas(weights, total):
+    """Integer quotas proportional to weights that sum to total (largest remainder)."""
+    weight_sum = sum(weights)
+    if not weight_sum or total <= 0:
+        return [0] * len(weights)
+    exact = [w * total / weight_sum for w in weights]
+    quotas = [int(q) for q in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - quotas[i], reverse=True)
+    for i in by_remainder[:total - sum(quotas)]:
+        quotas[i] += 1
+    return quotas
+
+
+class Bank:
+    """Question codes, their chapter and the selection weight of each chapter."""
+
+    def __init__(self, quiz_data=QUIZ_DATA):
+        data = load_json(quiz_data)
+        selection = data.get("selection", {})
+        self.codes = []
+        self.chapter = array("H")
+        self.chapter_names = []
+        self.weights = []
+        for chapter, quiz in enumerate(data["quizzes"]):
+            self.chapter_names.append(quiz["name"])
+            self.weights.append(selection.get(quiz["name"], quiz.get("questionsToSelect", 0)))
+            for question in quiz["questions"]:
+                self.codes.append(question["code"])
+                self.chapter.append(chapter)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+
+
+class TraineeState:
+    """Compact per-item arrays plus per-chapter heaps for one trainee."""
+
+    def __init__(self, bank, seed=None):
+        size = len(bank.codes)
+        self.bank = bank
+        self.due = array("d", [0.0]) * size           # epoch seconds; 0 = never seen
+        self.interval = array("f", [0.0]) * size      # seconds
+        self.ease = array("f", [START_EASE]) * size
+        self.reps = array("H", [0]) * size
+        self.lapses = array("H", [0]) * size
+        rng = random.Random(seed)
+        self.tiebreak = array("H", (rng.randrange(1 << 16) for _ in range(size)))
+        # Bumped on every answer; heap entries of older versions are stale
+        self.version = array("I", [0]) * size
+        self._heaps = None
+
+    # Heaps are built on first draw; stale entries are skipped when popped
+
+    def heaps(self):
+        if self._heaps is None:
+            heaps = [[] for _ in self.bank.chapter_names]
+            for item in range(len(self.due)):
+                heaps[self.bank.chapter[item]].append((self.due[item], self.tiebreak[item], item, self.version[item]))
+            for heap in heaps:
+                heapq.heapify(heap)
+            self._heaps = heaps
+        return self._heaps
+
+    def _push(self, item):
+        if self._heaps is not None:
+            entry = (self.due[item], self.tiebreak[item], item, self.version[item])
+            heapq.heappush(self._heaps[self.bank.chapter[item]], entry)
+
+    def _pop_due(self, heap, now):
+        """Pop the earliest valid entry that is due, or None."""
+        while heap:
+            due, _, item, version = heap[0]
+            if version != self.version[item]:
+                heapq.heappop(heap)  # superseded by a later answer, even one at the same time
+                continue
+            if due > now:
+                return None
+            return heapq.heappop(heap)
+        return None
+
+    # Scheduling
+
+    def record(self, item, correct, now=None):
+        """Schedule an item after an answer."""
+        now = time.time() if now is None else now
+        if correct:
+            reps = self.reps[item] + 1
+            if reps <= len(FIRST_INTERVALS):
+                interval = FIRST_INTERVALS[reps - 1]
+            else:
+                interval = self.interval[item] * self.ease[item]
+            self.reps[item] = min(reps, 0xFFFF)
+            self.ease[item] = min(MAX_EASE, self.ease[item] + 0.1)
+        else:
+            interval = RELEARN_INTERVAL
+            self.reps[item] = 0
+            self.lapses[item] = min(self.lapses[item] + 1, 0xFFFF)
+            self.ease[item] = max(MIN_EASE, self.ease[item] - 0.2)
+        self.interval[item] = interval
+        self.due[item] = now + interval
+        self.version[item] = (self.version[item] + 1) & 0xFFFFFFFF
+        self._push(item)
+
+    def next_due(self, n, now=None):
+        """Up to n due items: chapter quotas first, then the most overdue of any chapter."""
+        now = time.time() if now is None else now
+        heaps = self.heaps()
+        popped = []
+        chosen = []
+
+        for chapter, quota in enumerate(scaled_quotas(self.bank.weights, n)):
+            for _ in range(quota):
+                entry = self._pop_due(heaps[chapter], now)
+                if entry is None:
+                    break
+                popped.append(entry)
+                chosen.append(entry[2])
+
+        # Chapters short of due items leave slots; fill them across chapters
+        heads = []
+        for chapter, heap in enumerate(heaps):
+            entry = self._pop_due(heap, now)
+            if entry is not None:
+                popped.append(entry)
+                heads.append((entry, chapter))
+        heapq.heapify(heads)
+        while heads and len(chosen) < n:
+            entry, chapter = heapq.heappop(heads)
+            chosen.append(entry[2])
+            following = self._pop_due(heaps[chapter], now)
+            if following is not None:
+                popped.append(following)
+                heapq.heappush(heads, (following, chapter))
+
+        # Drawing does not change state: put back everything looked at
+        for entry in popped:
+            heapq.heappush(heaps[self.bank.chapter[entry[2]]], entry)
+        return chosen
+
+    # Persistence
+
+    COLUMNS = ("due", "interval", "ease", "reps", "lapses", "tiebreak")
+
+    def to_bytes(self):
+        codes = "\n".join(self.bank.codes).encode("utf-8")
+        header = STATE_MAGIC + struct.pack("<II", len(self.due), len(codes)) + codes
+        return header + b"".join(getattr(self, name).tobytes() for name in self.COLUMNS)
+
+    @classmethod
+    def from_bytes(cls, bank, data, seed=None):
+        state = cls(bank, seed)
+        if data[:4] != STATE_MAGIC:
+            raise ValueError("not a review state file")
+        size, codes_length = struct.unpack_from("<II", data, 4)
+        offset = 12 + codes_length
+        old_codes = data[12:offset].decode("utf-8").split("\n") if size else []
+        if len(old_codes) != size:
+            raise ValueError(f"state has {size} items but {len(old_codes)} codes")
+
+        # Questions added to the bank since start fresh; removed ones are dropped
+        rows = [(old, bank.index[code]) for old, code in enumerate(old_codes) if code in bank.index]
+        for name in cls.COLUMNS:
+            column = array(getattr(state, name).typecode)
+            end = offset + size * column.itemsize
+            column.frombytes(data[offset:end])
+            offset = end
+            if old_codes == bank.codes:
+                setattr(state, name, column)
+                continue
+            target = getattr(state, name)
+            for old, new in rows:
+                target[new] = column[old]
+        return state
+
+
+class ReviewScheduler:
+    """Review queues for many trainees over one bank."""
+
+    def __init__(self, quiz_data=QUIZ_DATA, state_dir=STATE_DIR):
+        self.bank = Bank(quiz_data)
+        self.state_dir = state_dir
+        self.trainees = {}
+
+    def _path(self, trainee):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in trainee)
+        return os.path.join(self.state_dir, f"{safe}.srq")
+
+    def state(self, trainee):
+        """State of a trainee, loaded from disk on first use."""
+        if trainee not in self.trainees:
+            path = self._path(trainee) if self.state_dir else None
+            if path and os.path.exists(path):
+                with open(path, "rb") as f:
+                    self.trainees[trainee] = TraineeState.from_bytes(self.bank, f.read(), seed=trainee)
+            else:
+                self.trainees[trainee] = TraineeState(self.bank, seed=trainee)
+        return self.trainees[trainee]
+
+    def record(self, trainee, code, correct, now=None):
+        self.state(trainee).record(self.bank.index[code], correct, now)
+
+    def record_attempt(self, trainee, results, now=None):
+        """Schedule every answered question of an attempt: {code: is_correct}."""
+        state = self.state(trainee)
+        for code, correct in results.items():
+            item = self.bank.index.get(code)
+            if item is not None:
+                state.record(item, correct, now)
+
+    def next_due(self, trainee, n=100, now=None):
+        return [self.bank.codes[item] for item in self.state(trainee).next_due(n, now)]
+
+    def save(self, trainee=None):
+        """Write one trainee's state (or every loaded one) atomically."""
+        os.makedirs(self.state_dir, exist_ok=True)
+        for name in [trainee] if trainee else list(self.trainees):
+            path = self._path(name)
+            with open(path + ".tmp", "wb") as f:
+                f.write(self.trainees[name].to_bytes())
+            os.replace(path + ".tmp", path)
+
+    def evict(self, trainee):
+        """Save and drop a trainee from memory."""
+        self.save(trainee)
+        del self.trainees[trainee]
+
+
+def simulate(trainees, sessions, n, seed=0):
+    """Synthetic load: each trainee answers n due questions per session."""
+    rng = random.Random(seed)
+    scheduler = ReviewScheduler(state_dir=None)
+    ability = {f"T{i:05d}": rng.uniform(0.4, 0.95) for i in range(trainees)}
+    now = time.time()
+
+    draw_seconds = 0.0
+    draws = 0
+    for session in range(sessions):
+        now += DAY
+        for trainee, p in ability.items():
+            t0 = time.perf_counter()
+            codes = scheduler.next_due(trainee, n, now)
+            draw_seconds += time.perf_counter() - t0
+            draws += 1
+            scheduler.record_attempt(trainee, {code: rng.random() < p for code in codes}, now)
+
+    print(f"{trainees} trainees x {sessions} sessions, {n} questions per draw")
+    print(f"Average draw: {draw_seconds / draws * 1000:.2f} ms")
+    sample = next(iter(ability))
+    state = scheduler.state(sample)
+    print(f"{sample}: {sum(1 for r in state.reps if r)} items in review, {sum(state.lapses)} lapses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spaced-repetition review queues.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    nxt = sub.add_parser("next", help="print the next due questions of a trainee")
+    nxt.add_argument("trainee")
+    nxt.add_argument("-n", type=int, default=100)
+
+    rec = sub.add_parser("record", help="record answers: CODE=1 (correct) or CODE=0")
+    rec.add_argument("trainee")
+    rec.add_argument("answers", nargs="+")
+
+    sim = sub.add_parser("simulate", help="measure draw time over synthetic trainees")
+    sim.add_argument("--trainees", type=int, default=1000)
+    sim.add_argument("--sessions", type=int, default=5)
+    sim.add_argument("-n", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == "simulate":
+        simulate(args.trainees, args.sessions, args.n)
+        return
+
+    scheduler = ReviewScheduler()
+    if args.command == "next":
+        print(" ".join(scheduler.next_due(args.trainee, args.n)))
+    else:
+        results = {}
+        for answer in args.answers:
+            code, _, value = answer.partition("=")
+            results[code] = value not in ("0", "false", "no")
+        scheduler.record_attempt(args.trainee, results)
+        scheduler.save(args.trainee)
+        print(f"Recorded {len(results)} answers for {args.trainee}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,9 @@ Search APU chapter (starting around page 455) for specific topics.
 
 from pypdf import PdfReader
 import json
+from manual_corpus import FCOM1_PDF
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+pdf_path = FCOM1_PDF
 
 # Search terms for APU topics
 search_queries = {
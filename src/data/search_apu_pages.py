@@ -6,6 +6,7 @@ Search A220 FCOM1 PDF for APU question topics and find actual page numbers.
 import pdfplumber
 import json
 import sys
+from manual_corpus import FCOM1_PDF
 
 def search_pdf(pdf_path):
     """Search PDF for APU related terms."""
@@ -220,5 +221,5 @@ def search_pdf(pdf_path):
     return final_results
 
 if __name__ == "__main__":
-    pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+    pdf_path = FCOM1_PDF
     search_pdf(pdf_path)
@@ -3,10 +3,31 @@
 Search A220 FCOM1 PDF for APU question topics and find actual page numbers using pypdf.
 """
 
-from pypdf import PdfReader
 import json
 import sys
 
+import pipeline_profile
+from fcom_outline import load_outline_map
+from manual_corpus import FCOM1_PDF, open_page_corpus
+from page_query import load_positional_index
+from query_cache import cached_find_pages
+
+# Chapter 04 content pages, not TOC or effectivity listings
+APU_CHAPTER_QUERY = '(04APU "AUXILIARY POWER UNIT" OR "CHAPTER 04" APU) NOT "TABLE OF CONTENTS" NOT EFFECTIVITY'
+
+def chapter_bounds(pdf_path, number):
+    """(first, last) PDF page of a chapter from the outline map, or (None, None)."""
+    try:
+        chapters = load_outline_map(pdf_path)["chapters"]
+    except Exception as e:
+        print(f"Could not read outline: {e}")
+        return None, None
+    if number not in chapters:
+        return None, None
+    later = [c["startPage"] for n, c in chapters.items() if n > number]
+    return chapters[number]["startPage"], (min(later) - 1 if later else None)
+
+
 def search_pdf(pdf_path):
     """Search PDF for APU related terms."""
 
@@ -87,52 +108,57 @@ def search_pdf(pdf_path):
     print("=" * 80)
 
     try:
-        reader = PdfReader(pdf_path)
-        total_pages = len(reader.pages)
+        corpus = open_page_corpus("FCOM1", pdf_path)
+        total_pages = len(corpus)
         print(f"Total pages: {total_pages}\n")
 
-        # First find APU chapter (04APU)
-        apu_chapter_start = None
-        apu_chapter_end = None
+        # Chapter bounds from the outline/page labels, else one index lookup
+        apu_chapter_start, apu_chapter_end = chapter_bounds(pdf_path, "04")
+        if apu_chapter_start is None:
+            chapter_pages = load_positional_index("FCOM1", corpus).search(APU_CHAPTER_QUERY)
+            apu_chapter_start = chapter_pages[0] if chapter_pages else None
+
+        if apu_chapter_start is None:
+            print("APU chapter not found")
+            return None
+
+        text = corpus.page_text(apu_chapter_start)
+        print(f"\nFound APU chapter starting at page {apu_chapter_start}")
+        print(f"  Context: {text[:200].replace(chr(10), ' ')}")
+
+        # Pages of every term in the chapter, cached per term
+        with pipeline_profile.stage("match"):
+            term_pages = {
+                term: set(cached_find_pages(corpus, term, apu_chapter_start, apu_chapter_end))
+                for query_info in search_queries.values()
+                for term in query_info["terms"]
+            }
 
-        for page_num in range(total_pages):
-            if page_num % 100 == 0:
-                print(f"Searching page {page_num + 1}/{total_pages}...")
+        for actual_page in range(apu_chapter_start, (apu_chapter_end or total_pages) + 1):
+            if actual_page % 100 == 0:
+                print(f"Searching page {actual_page}/{total_pages}...")
 
-            page = reader.pages[page_num]
-            text = page.extract_text()
+            text = corpus.page_text(actual_page)
 
             if not text:
                 continue
 
-            text_upper = text.upper()
-            actual_page = page_num + 1
-
-            # Look for APU chapter marker - look for actual chapter content, not TOC
-            if apu_chapter_start is None:
-                # Look for the actual APU chapter (04APU) with more specific patterns
-                if ("04APU" in text_upper and "AUXILIARY POWER UNIT" in text_upper) or \
-                   ("CHAPTER 04" in text_upper and "APU" in text_upper):
-                    # Make sure it's not just a TOC entry
-                    if "TABLE OF CONTENTS" not in text_upper and "EFFECTIVITY" not in text_upper:
-                        apu_chapter_start = actual_page
-                        print(f"\nFound APU chapter starting at page {actual_page}")
-                        print(f"  Context: {text[:200].replace(chr(10), ' ')}")
-
-            # If we found the chapter, search within reasonable range
-            if apu_chapter_start and actual_page >= apu_chapter_start:
-                # Stop if we've definitely moved to next chapter (look for chapter 05 or 06)
-                if actual_page > apu_chapter_start + 100:
-                    # Check if we've moved to a new chapter
-                    if ("CHAPTER 05" in text_upper or "CHAPTER 06" in text_upper or
-                        "05−01" in text or "06−01" in text):
-                        print(f"\nReached next chapter at page {actual_page}, stopping search.")
-                        break
-
-                # Check each APU topic
+            with pipeline_profile.stage("normalize", pages=1, nbytes=len(text)):
+                text_upper = text.upper()
+
+            # Without outline bounds, stop once we've definitely moved to the next chapter
+            if apu_chapter_end is None and actual_page > apu_chapter_start + 100:
+                # Check if we've moved to a new chapter
+                if ("CHAPTER 05" in text_upper or "CHAPTER 06" in text_upper or
+                    "05−01" in text or "06−01" in text):
+                    print(f"\nReached next chapter at page {actual_page}, stopping search.")
+                    break
+
+            # Check each APU topic
+            with pipeline_profile.stage("match"):
                 for topic, query_info in search_queries.items():
                     for term in query_info["terms"]:
-                        if term.upper() in text_upper:
+                        if actual_page in term_pages[term]:
                             if topic not in page_matches:
                                 page_matches[topic] = set()
 
@@ -158,9 +184,11 @@ def search_pdf(pdf_path):
                                     if len(context) >= 1:
                                         break
 
-                            print(f"\n  Found '{term}' on page {actual_page}")
-                            if context:
-                                print(f"    Context: {context[0][:100]}")
+                            pipeline_profile.record_match(term)
+                            with pipeline_profile.stage("output"):
+                                print(f"\n  Found '{term}' on page {actual_page}")
+                                if context:
+                                    print(f"    Context: {context[0][:100]}")
 
                             break  # Move to next topic
 
@@ -224,5 +252,6 @@ def search_pdf(pdf_path):
     return final_results
 
 if __name__ == "__main__":
-    pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
-    search_pdf(pdf_path)
+    pdf_path = FCOM1_PDF
+    with pipeline_profile.profiled_run("search_apu_pypdf"):
+        search_pdf(pdf_path)
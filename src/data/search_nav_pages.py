@@ -6,8 +6,10 @@ Search A220 FCOM1 PDF for Navigation chapter topics and extract actual PDF page
 import pdfplumber
 import re
 import json
+import os
+from manual_corpus import DATA_DIR, FCOM1_PDF
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+pdf_path = FCOM1_PDF
 
 # Search terms for each topic
 search_topics = {
@@ -106,7 +108,7 @@ for finding in detailed_findings[:20]:
     print(f"  {finding['context']}")
 
 # Save results to file
-output_file = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/quiz-app/src/data/nav_pages_results.json"
+output_file = os.path.join(DATA_DIR, "nav_pages_results.json")
 with open(output_file, 'w') as f:
     json.dump({
         "summary": json_output,
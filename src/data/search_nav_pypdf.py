@@ -5,9 +5,11 @@ Search A220 FCOM1 PDF for Navigation chapter topics using pypdf.
 
 from pypdf import PdfReader
 import json
+import os
 import re
+from manual_corpus import DATA_DIR, FCOM1_PDF
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+pdf_path = FCOM1_PDF
 
 # Search terms for each topic
 search_topics = {
@@ -102,7 +104,7 @@ try:
         print(f"  {finding['context'][:150]}...")
 
     # Save results to file
-    output_file = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/quiz-app/src/data/nav_pages_results.json"
+    output_file = os.path.join(DATA_DIR, "nav_pages_results.json")
     with open(output_file, 'w') as f:
         json.dump({
             "summary": json_output,
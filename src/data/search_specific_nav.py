@@ -4,10 +4,13 @@ Search A220 FCOM1 PDF for specific Navigation questions based on their actual co
 This script searches for the most relevant terms from each question.
 """
 
-from pypdf import PdfReader
 import json
+import os
 
-pdf_path = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/A220-300_FCOM1.pdf"
+import pipeline_profile
+from manual_corpus import DATA_DIR, FCOM1_PDF, open_page_corpus
+
+pdf_path = FCOM1_PDF
 
 # Question-specific search terms based on actual question content
 question_searches = {
@@ -130,109 +133,112 @@ print("SEARCHING A220 FCOM1 FOR NAVIGATION QUESTIONS")
 print("="*80)
 print(f"PDF: {pdf_path}\n")
 
-try:
-    reader = PdfReader(pdf_path)
-    total_pages = len(reader.pages)
-    print(f"Total pages in PDF: {total_pages}\n")
-
-    results = {}
-    detailed_findings = {}
+with pipeline_profile.profiled_run("search_specific_nav"):
+    try:
+        # Page text is extracted once and memory-mapped; every question after
+        # that is a byte-level scan of the cached corpus instead of a PDF pass
+        corpus = open_page_corpus("FCOM1", pdf_path)
+        total_pages = len(corpus)
+        print(f"Total pages in PDF: {total_pages}\n")
 
-    # For each question, search through the PDF
-    for question_id, search_info in question_searches.items():
-        print(f"\nSearching for {question_id}: {search_info['topic']}")
-        print(f"  Terms: {', '.join(search_info['terms'][:3])}")
+        results = {}
+        detailed_findings = {}
 
-        found_pages = []
+        # For each question, search through the PDF
+        for question_id, search_info in question_searches.items():
+            print(f"\nSearching for {question_id}: {search_info['topic']}")
+            print(f"  Terms: {', '.join(search_info['terms'][:3])}")
 
-        for page_num in range(total_pages):
-            page = reader.pages[page_num]
-            text = page.extract_text()
+            found_pages = []
 
-            if text:
+            # First matching term (in list order) for each page
+            first_term = {}
+            with pipeline_profile.stage("match", pages=total_pages):
+                for term in search_info['terms']:
+                    term_pages = corpus.find_pages(term)
+                    pipeline_profile.record_match(term, len(term_pages))
+                    for actual_page in term_pages:
+                        first_term.setdefault(actual_page, term)
+
+            for actual_page in sorted(first_term):
+                term = first_term[actual_page]
+                text = corpus.page_text(actual_page)
                 text_lower = text.lower()
 
-                # Check if any search term is found
-                for term in search_info['terms']:
-                    if term.lower() in text_lower:
-                        actual_page = page_num + 1
-
-                        # Extract context
-                        term_pos = text_lower.find(term.lower())
-                        context_start = max(0, term_pos - 150)
-                        context_end = min(len(text), term_pos + 150)
-                        context = text[context_start:context_end].replace('\n', ' ').strip()
-
-                        found_pages.append({
-                            "page": actual_page,
-                            "term": term,
-                            "context": context[:200]
-                        })
-
-                        # Use the first occurrence
-                        if question_id not in results:
-                            results[question_id] = actual_page
-                            detailed_findings[question_id] = {
-                                "topic": search_info['topic'],
-                                "page": actual_page,
-                                "term_found": term,
-                                "context": context[:200],
-                                "all_occurrences": []
-                            }
-
-                        # Add to all occurrences
-                        if question_id in detailed_findings:
-                            detailed_findings[question_id]["all_occurrences"].append({
-                                "page": actual_page,
-                                "term": term
-                            })
-
-                        break  # Found this term, move to next page
-
-        if question_id in results:
-            print(f"  ✓ Found on page {results[question_id]}")
-        else:
-            print(f"  ✗ Not found")
-
-    print("\n" + "="*80)
-    print("SUMMARY OF FINDINGS")
-    print("="*80)
-
-    # Create JSON output
-    json_output = {}
-    for question_id in sorted(results.keys(), key=lambda x: int(x.replace("16NAV", ""))):
-        json_output[question_id] = {
-            "pdf": "FCOM1",
-            "page": results[question_id]
-        }
-        print(f"{question_id}: Page {results[question_id]} - {detailed_findings[question_id]['topic']}")
-
-    print("\n" + "="*80)
-    print("JSON OUTPUT FOR page_references.json")
-    print("="*80)
-    print(json.dumps(json_output, indent=2))
-
-    # Save results
-    output_file = "/Users/petruinstagram/Desktop/web-apps/gabi-airbus/quiz-app/src/data/nav_search_results.json"
-    with open(output_file, 'w') as f:
-        json.dump({
-            "summary": json_output,
-            "detailed_findings": detailed_findings,
-            "not_found": [qid for qid in question_searches.keys() if qid not in results]
-        }, f, indent=2)
-
-    print(f"\n\nDetailed results saved to: {output_file}")
-
-    # Show what wasn't found
-    not_found = [qid for qid in question_searches.keys() if qid not in results]
-    if not_found:
-        print(f"\n⚠ Questions not found ({len(not_found)}):")
-        for qid in not_found:
-            print(f"  - {qid}: {question_searches[qid]['topic']}")
-
-    print(f"\n✓ Found {len(results)} out of {len(question_searches)} questions")
-
-except Exception as e:
-    print(f"\nError: {e}")
-    import traceback
-    traceback.print_exc()
+                # Extract context
+                term_pos = text_lower.find(term.lower())
+                context_start = max(0, term_pos - 150)
+                context_end = min(len(text), term_pos + 150)
+                context = text[context_start:context_end].replace('\n', ' ').strip()
+
+                found_pages.append({
+                    "page": actual_page,
+                    "term": term,
+                    "context": context[:200]
+                })
+
+                # Use the first occurrence
+                if question_id not in results:
+                    results[question_id] = actual_page
+                    detailed_findings[question_id] = {
+                        "topic": search_info['topic'],
+                        "page": actual_page,
+                        "term_found": term,
+                        "context": context[:200],
+                        "all_occurrences": []
+                    }
+
+                # Add to all occurrences
+                if question_id in detailed_findings:
+                    detailed_findings[question_id]["all_occurrences"].append({
+                        "page": actual_page,
+                        "term": term
+                    })
+
+            if question_id in results:
+                print(f"  ✓ Found on page {results[question_id]}")
+            else:
+                print(f"  ✗ Not found")
+
+        print("\n" + "="*80)
+        print("SUMMARY OF FINDINGS")
+        print("="*80)
+
+        # Create JSON output
+        json_output = {}
+        for question_id in sorted(results.keys(), key=lambda x: int(x.replace("16NAV", ""))):
+            json_output[question_id] = {
+                "pdf": "FCOM1",
+                "page": results[question_id]
+            }
+            print(f"{question_id}: Page {results[question_id]} - {detailed_findings[question_id]['topic']}")
+
+        print("\n" + "="*80)
+        print("JSON OUTPUT FOR page_references.json")
+        print("="*80)
+        print(json.dumps(json_output, indent=2))
+
+        # Save results
+        output_file = os.path.join(DATA_DIR, "nav_search_results.json")
+        with open(output_file, 'w') as f:
+            json.dump({
+                "summary": json_output,
+                "detailed_findings": detailed_findings,
+                "not_found": [qid for qid in question_searches.keys() if qid not in results]
+            }, f, indent=2)
+
+        print(f"\n\nDetailed results saved to: {output_file}")
+
+        # Show what wasn't found
+        not_found = [qid for qid in question_searches.keys() if qid not in results]
+        if not_found:
+            print(f"\n⚠ Questions not found ({len(not_found)}):")
+            for qid in not_found:
+                print(f"  - {qid}: {question_searches[qid]['topic']}")
+
+        print(f"\n✓ Found {len(results)} out of {len(question_searches)} questions")
+
+    except Exception as e:
+        print(f"\nError: {e}")
+        import traceback
+        traceback.print_exc()
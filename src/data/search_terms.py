@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Mine search terms for every question from its text and correct answer.
+
+The search scripts carry hand-written term lists (`search_queries`,
+`question_searches`, `search_topics`). This derives them instead: each
+question's text and correct option(s) are tokenized the way manual_corpus
+indexes pages, and every word and adjacent word pair is scored by
+
+    corpus idf   how few manual pages contain it (rare = discriminative)
+    bank idf     how few other questions use it ("A220", "AIRCRAFT" and
+                 "SELECTED" say nothing about a particular question)
+    acronym      written in capitals in the question (WAIV, EMER DEPRESS)
+    cohesion     for a pair: how often its words appear side by side in
+                 the manuals rather than just on the same page (MAN RATE)
+
+Terms the manuals never use are dropped. Page and pair frequencies are
+precomputed per manual and cached by corpus sha1 in
+.fcom_cache/<PDF ID>.termstats.pickle. Without the manuals the bank's own
+frequencies stand in for the corpus ones.
+
+The output holds one spec per question in the shape the search scripts
+use, plus a page_query.py query ORing the terms:
+
+    {"02AIR23": {"topic": "...", "terms": ["EMER DEPRESS", "MAN RATE"],
+                 "query": "\\"EMER DEPRESS\\" OR \\"MAN RATE\\""}}
+
+    python3 search_terms.py
+    python3 search_terms.py --code 02AIR23 --show
+
+With --code only those questions' specs are rebuilt and merged into the
+existing file, unless --out names another file.
+"""
+
+import argparse
+import json
+import math
+import os
+import pickle
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_profile
+from explanation_data import QUIZ_DATA, load_json
+from manual_corpus import CACHE_DIR, ManualCorpus, configured_manuals_dir, ensure_page_corpus, tokenize
+from page_corpus import PageCorpus
+from verify_explanations import STOPWORDS
+
+SPECS_PATH = os.path.join(CACHE_DIR, "query_specs.json")
+
+MAX_TERMS = 6
+ACRONYM_BONUS = 1.5
+PHRASE_BONUS = 1.25
+MIN_COHESION = 0.2
+
+QUESTION_STOPWORDS = STOPWORDS | set("""
+WHAT WHICH WHO WHY HOW HAPPENS HAPPEN FOLLOWING TRUE FALSE STATEMENT STATEMENTS ABOUT DURING AFTER
+BEFORE ABOVE BELOW IS ARE THE A220 AIRCRAFT SELECTED PRESSED INDICATE INDICATES INDICATED SHOWN
+DISPLAYED PLEASE IDENTIFY EXCEPT NONE EITHER WHICHEVER ONCE THROUGH UNTIL SHALL MOVES SETS CAN
+""".split())
+
+# "(02AIR23)[A220] " / "(PERF 12) " prefixes and "(Refer to the A220 flight deck foldout)"
+PREFIX_RE = re.compile(r"^\s*\([^)]*\)\s*(?:\[[^\]]*\]\s*)?")
+REFER_RE = re.compile(r"\(\s*refer to[^)]*\)", re.IGNORECASE)
+ACRONYM_RE = re.compile(r"\b[A-Z][A-Z0-9/]*[A-Z0-9]\b")
+
+
+def question_text(question):
+    """Question text without its code prefix and foldout note, plus the correct option(s)."""
+    text = REFER_RE.sub(" ", PREFIX_RE.sub("", question.get("text", "")))
+    correct = set(question.get("correct") or [])
+    answers = [option.get("text", "") for option in question.get("options", []) if option.get("letter") in correct]
+    return text.strip(), answers
+
+
+def acronyms(text):
+    """Tokens written in capitals in the raw text (WAIV, EMER, CAB ALT's parts)."""
+    return {token for match in ACRONYM_RE.findall(text) for token in tokenize(match)}
+
+
+def candidates(text, capitals):
+    """(unigrams, bigrams) worth scoring: no stopwords, no bare numbers."""
+    unigrams = set()
+    bigrams = set()
+    previous = None
+    for token in tokenize(text):
+        if token in QUESTION_STOPWORDS or (len(token) < 2 and token.isalpha()):
+            previous = None
+            continue
+        if not token.isdigit():
+            unigrams.add(token)
+        # A number only belongs to the acronym before it: "HYD 1", "DU 2", not "1 FAILS" or "900 FEET"
+        if previous is not None and not previous.isdigit() and (not token.isdigit() or previous in capitals):
+            bigrams.add(f"{previous} {token}")
+        previous = token
+    return unigrams, bigrams
+
+
+def count_terms(pages):
+    """(page count, word page frequency, adjacent-pair page frequency) of a sequence of pages."""
+    df = Counter()
+    pair_df = Counter()
+    page_count = 0
+    for page_count, text in enumerate(pages, 1):
+        tokens = tokenize(text)
+        df.update(set(tokens))
+        pair_df.update({f"{a} {b}" for a, b in zip(tokens, tokens[1:])})
+    return page_count, df, pair_df
+
+
+def _stats_chunk(doc_id, pdf_path, cache_dir):
+    with pipeline_profile.worker_profile(f"termstats {doc_id}") as profile:
+        corpus_path, _, _ = ensure_page_corpus(doc_id, pdf_path, cache_dir)
+        with PageCorpus(corpus_path) as corpus:
+            stats = load_term_stats(doc_id, corpus, cache_dir)
+    return doc_id, stats, profile.to_dict()
+
+
+def load_term_stats(doc_id, corpus, cache_dir=CACHE_DIR):
+    """Word and pair page frequencies of one manual, cached next to its corpus by sha1."""
+    path = os.path.join(cache_dir, f"{doc_id}.termstats.pickle")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            sha1, page_count, df, pair_df = pickle.load(f)
+        if sha1 == corpus.sha1:
+            return page_count, df, pair_df
+
+    with pipeline_profile.stage("termstats", pages=len(corpus)):
+        page_count, df, pair_df = count_terms(corpus)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((corpus.sha1, page_count, df, pair_df), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return page_count, df, pair_df
+
+
+class TermScorer:
+    """Scores a question's candidate terms against corpus and bank frequencies."""
+
+    def __init__(self, corpus_stats, bank_stats):
+        self.pages, self.df, self.pair_df = corpus_stats
+        self.questions, self.bank_df, self.bank_pair_df = bank_stats
+
+    def _frequency(self, term):
+        return (self.pair_df if " " in term else self.df).get(term, 0)
+
+    def score(self, term, capitals):
+        frequency = self._frequency(term)
+        if not frequency:
+            return 0.0
+        corpus_idf = math.log((self.pages + 1) / (frequency + 1))
+        bank_frequency = (self.bank_pair_df if " " in term else self.bank_df).get(term, 0)
+        bank_idf = math.log((self.questions + 1) / (bank_frequency + 1)) / math.log(self.questions + 1)
+        score = corpus_idf * (0.5 + bank_idf)
+
+        words = term.split()
+        if all(word in capitals or word.isdigit() for word in words):
+            score *= ACRONYM_BONUS
+        if len(words) > 1:
+            cohesion = frequency / min(self.df.get(word, 0) or frequency for word in words)
+            if cohesion < MIN_COHESION:
+                return 0.0  # the words share pages but are not a phrase
+            score *= PHRASE_BONUS
+        return score
+
+    def terms(self, text, answers, limit=MAX_TERMS):
+        """Best terms of a question, highest score first; answer terms count for less."""
+        scored = {}
+        for source, weight in [(text, 1.0)] + [(answer, 0.8) for answer in answers]:
+            capitals = acronyms(source)
+            unigrams, bigrams = candidates(source, capitals)
+            for term in unigrams | bigrams:
+                score = self.score(term, capitals) * weight
+                if score > scored.get(term, 0.0):
+                    scored[term] = score
+
+        chosen = []
+        for term, score in sorted(scored.items(), key=lambda item: (-item[1], item[0])):
+            if score <= 0 or len(chosen) >= limit:
+                break
+            words = set(term.split())
+            # A word already covered by a better phrase adds nothing
+            if len(words) == 1 and any(term in c.split() for c, _ in chosen):
+                continue
+            chosen.append((term, score))
+        return chosen
+
+
+def page_query(terms):
+    """page_query.py query matching any of the terms."""
+    return " OR ".join(f'"{term}"' if " " in term else term for term in terms)
+
+
+def bank_questions(quiz_data=QUIZ_DATA):
+    """(code, text, correct option texts) for every question in the bank."""
+    for quiz in load_json(quiz_data)["quizzes"]:
+        for question in quiz["questions"]:
+            text, answers = question_text(question)
+            yield question["code"], text, answers
+
+
+def corpus_stats(pdfs=None, workers=None):
+    """Summed page frequencies over the available manuals; None when none is available."""
+    if configured_manuals_dir(required=False) is None:
+        return None
+    corpus = ManualCorpus.from_page_references()
+    pending = {}
+    for doc_id, pdf_path in corpus.manuals.items():
+        if pdfs and doc_id not in pdfs:
+            continue
+        if not os.path.exists(pdf_path):
+            print(f"Skipping {doc_id}: file not found at {pdf_path}")
+            continue
+        pending[doc_id] = pdf_path
+    if not pending:
+        return None
+
+    total_pages, df, pair_df = 0, Counter(), Counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_stats_chunk, doc_id, path, CACHE_DIR) for doc_id, path in pending.items()]
+        for future in futures:
+            doc_id, (page_count, doc_df, doc_pair_df), profile = future.result()
+            pipeline_profile.merge(profile)
+            total_pages += page_count
+            df.update(doc_df)
+            pair_df.update(doc_pair_df)
+            print(f"{doc_id}: {page_count} pages, {len(doc_df)} words, {len(doc_pair_df)} pairs")
+    return total_pages, df, pair_df
+
+
+def build_specs(questions, scorer, limit=MAX_TERMS):
+    specs = {}
+    for code, text, answers in questions:
+        terms = scorer.terms(text, answers, limit)
+        specs[code] = {
+            "topic": text if len(text) <= 80 else text[:77].rstrip() + "...",
+            "terms": [term for term, _ in terms],
+            "scores": [round(score, 2) for _, score in terms],
+            "query": page_query([term for term, _ in terms]),
+        }
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mine search terms for every question in the bank.")
+    parser.add_argument("--code", action="append", help="only this question (repeatable)")
+    parser.add_argument("--pdf", action="append", help="only count this manual (repeatable)")
+    parser.add_argument("--max-terms", type=int, default=MAX_TERMS)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--out", help=f"spec file to write (default: merge into {SPECS_PATH})")
+    parser.add_argument("--show", action="store_true", help="print every spec")
+    args = parser.parse_args()
+
+    with pipeline_profile.profiled_run("search_terms"):
+        questions = list(bank_questions())
+        bank = count_terms(f"{text}\n" + "\n".join(answers) for _, text, answers in questions)
+        stats = corpus_stats(args.pdf, args.workers)
+        if stats is None:
+            print("No manuals available; scoring against the question bank only")
+            stats = bank
+
+        if args.code:
+            questions = [q for q in questions if q[0] in args.code]
+        specs = build_specs(questions, TermScorer(stats, bank), args.max_terms)
+
+    out = args.out or SPECS_PATH
+    written = specs
+    if args.code and not args.out and os.path.exists(out):
+        # Rebuilding a few questions must not drop the rest of the bank's specs
+        written = {**load_json(out), **specs}
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(written, f, indent=2, ensure_ascii=False)
+
+    empty = [code for code, spec in specs.items() if not spec["terms"]]
+    print("\n" + "=" * 80)
+    print(f"Query specs: {len(specs)} questions, {len(empty)} without terms")
+    if args.show:
+        for code, spec in specs.items():
+            print(f"  {code:10s} {', '.join(spec['terms'])}")
+    print(f"Saved to: {out}" + (f" ({len(written)} questions)" if written is not specs else ""))
+
+
+if __name__ == "__main__":
+    main()
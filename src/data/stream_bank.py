@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Streaming reader/writer for question banks shaped like quizData.json.
+
+    {"quizzes": [{"name": ..., "questions": [{...}, ...]}, ...], "totalQuestions": ..., ...}
+
+The reader never holds more than the question being parsed: the file is
+read in chunks and each value is decoded with `json.JSONDecoder.raw_decode`
+as soon as it is complete in the buffer. It yields events
+
+    ("meta", key, value)          a top-level key other than "quizzes"
+    ("quiz", index, header)       quiz keys seen before its "questions"
+    ("question", index, question)
+    ("quiz_end", index, header)   all quiz keys except "questions"
+
+BankWriter writes the same structure incrementally, byte-identical to
+`json.dump(data, f, indent=2, ensure_ascii=False)`, so a bank can be
+validated, transformed or split into JSONL chunks in bounded memory:
+
+    python3 stream_bank.py validate quizData.json
+    python3 stream_bank.py copy quizData.json out.json --strip-images
+    python3 stream_bank.py chunks quizData.json chunks/ --size 10000
+"""
+
+import argparse
+import codecs
+import json
+import os
+import re
+import tempfile
+
+from explanation_data import CODE_RE, QUIZ_DATA
+
+CHUNK_BYTES = 1 << 16
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+
+class BankFormatError(ValueError):
+    """The file does not have the quizzes[].questions[] structure."""
+
+
+class _Scanner:
+    """Pull parser over a chunked UTF-8 stream; values are decoded whole."""
+
+    def __init__(self, f, chunk_bytes=CHUNK_BYTES):
+        self.f = f
+        self.chunk_bytes = chunk_bytes
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        data = self.f.read(size or self.chunk_bytes)
+        if not data:
+            self.eof = True
+        text = self.utf8.decode(data, final=not data)
+        # Drop the consumed prefix so the buffer only holds the current value
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += text
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end of input)."""
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise BankFormatError(f"expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                value, end = None, None
+            # A number or literal ending exactly at the buffer edge may continue
+            if end is not None and (end < len(self.buf) or self.eof):
+                self.pos = end
+                return value
+            # Read at least as much again as the value so far, so large values stay linear
+            self._fill(max(self.chunk_bytes, len(self.buf) - self.pos))
+
+    def _sequence(self, open_char, close_char, keyed):
+        self.expect(open_char)
+        if self.peek() == close_char:
+            self.pos += 1
+            return
+        while True:
+            if keyed:
+                key = self.value()
+                self.expect(":")
+                yield key
+            else:
+                yield None
+            found = self.peek()
+            self.pos += 1
+            if found == close_char:
+                return
+            if found != ",":
+                raise BankFormatError(f"expected ',' or {close_char!r}, found {found or 'end of file'!r}")
+
+    def members(self):
+        """Yield the keys of an object; the caller must consume each value."""
+        return self._sequence("{", "}", keyed=True)
+
+    def items(self):
+        """Yield once per array item; the caller must consume each item."""
+        return self._sequence("[", "]", keyed=False)
+
+
+def stream_events(path, chunk_bytes=CHUNK_BYTES):
+    """Events of a question bank, reading it incrementally."""
+    with open(path, "rb") as f:
+        scanner = _Scanner(f, chunk_bytes)
+        for key in scanner.members():
+            if key != "quizzes":
+                yield "meta", key, scanner.value()
+                continue
+
+            for index, _ in enumerate(scanner.items()):
+                header = {}
+                started = False
+                for quiz_key in scanner.members():
+                    if quiz_key != "questions":
+                        header[quiz_key] = scanner.value()
+                        continue
+                    yield "quiz", index, dict(header)
+                    started = True
+                    for _ in scanner.items():
+                        yield "question", index, scanner.value()
+                if not started:
+                    yield "quiz", index, dict(header)
+                yield "quiz_end", index, header
+
+        if scanner.peek():
+            raise BankFormatError("unexpected data after the top-level object")
+
+
+def iter_questions(path):
+    """(quiz name, question) for every question in the bank."""
+    names = {}
+    for kind, key, value in stream_events(path):
+        if kind == "quiz":
+            names[key] = value.get("name")
+        elif kind == "question":
+            yield names[key], value
+
+
+class BankWriter:
+    """Incrementally writes quizzes[].questions[] in json.dump(indent=2) layout.
+
+    Meta keys given before the first quiz are written ahead of "quizzes",
+    later ones after it. The file is replaced atomically on close.
+    """
+
+    def __init__(self, path, indent=2):
+        self.path = path
+        self.indent = " " * indent
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+        self.f = os.fdopen(fd, "w", encoding="utf-8")
+        self.stack = []
+        self.quizzes = "pending"  # pending -> open -> closed
+        self.in_quiz = False
+        self.count = 0
+        self._open("{", "}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # Layout helpers: the stack holds [items written, closing char] per open container
+
+    def _item(self):
+        top = self.stack[-1]
+        self.f.write(("," if top[0] else "") + "\n" + self.indent * len(self.stack))
+        top[0] += 1
+
+    def _open(self, char, close_char):
+        self.f.write(char)
+        self.stack.append([0, close_char])
+
+    def _close(self):
+        count, close_char = self.stack.pop()
+        if count:
+            self.f.write("\n" + self.indent * len(self.stack))
+        self.f.write(close_char)
+
+    def _dumps(self, value):
+        text = json.dumps(value, indent=len(self.indent), ensure_ascii=False)
+        return text.replace("\n", "\n" + self.indent * len(self.stack))
+
+    def _member(self, key, value):
+        self._item()
+        self.f.write(json.dumps(key, ensure_ascii=False) + ": " + self._dumps(value))
+
+    # Public API
+
+    def meta(self, key, value):
+        if self.in_quiz:
+            raise BankFormatError("meta keys cannot be written inside a quiz")
+        if self.quizzes == "open":
+            self._close()
+            self.quizzes = "closed"
+        self._member(key, value)
+
+    def begin_quiz(self, header):
+        if self.quizzes == "closed":
+            raise BankFormatError("quizzes were already closed by a later meta key")
+        if self.in_quiz:
+            self.end_quiz()
+        if self.quizzes == "pending":
+            self._item()
+            self.f.write('"quizzes": ')
+            self._open("[", "]")
+            self.quizzes = "open"
+        self._item()
+        self._open("{", "}")
+        for key, value in header.items():
+            if key != "questions":
+                self._member(key, value)
+        self._item()
+        self.f.write('"questions": ')
+        self._open("[", "]")
+        self.in_quiz = True
+
+    def question(self, question):
+        if not self.in_quiz:
+            raise BankFormatError("question written outside a quiz")
+        self._item()
+        self.f.write(self._dumps(question))
+        self.count += 1
+
+    def end_quiz(self, trailing=None):
+        """Close the current quiz, adding keys that are only known afterwards."""
+        self._close()
+        for key, value in (trailing or {}).items():
+            self._member(key, value)
+        self._close()
+        self.in_quiz = False
+
+    def close(self):
+        if self.in_quiz:
+            self.end_quiz()
+        if self.quizzes == "pending":
+            self._member("quizzes", [])
+        elif self.quizzes == "open":
+            self._close()
+        while self.stack:
+            self._close()
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.f.close()
+        os.unlink(self.tmp_path)
+
+
+def transform_bank(src, dst, transform=None):
+    """Stream src to dst, passing each question through transform (None drops it)."""
+    with BankWriter(dst) as writer:
+        header = None
+        for kind, key, value in stream_events(src):
+            if kind == "meta":
+                writer.meta(key, value)
+            elif kind == "quiz":
+                header = value
+                writer.begin_quiz(value)
+            elif kind == "question":
+                question = transform(value) if transform else value
+                if question is not None:
+                    writer.question(question)
+            else:
+                trailing = {k: v for k, v in value.items() if k not in header}
+                writer.end_quiz(trailing)
+        return writer.count
+
+
+def validate_question(question):
+    """Problems with one question record."""
+    problems = []
+    code = question.get("code")
+    if not isinstance(code, str) or not CODE_RE.match(code):
+        problems.append(f"bad code {code!r}")
+    if not isinstance(question.get("text"), str) or not question["text"].strip():
+        problems.append("empty text")
+
+    letters = [option.get("letter") for option in question.get("options") or []]
+    if len(letters) < 2:
+        problems.append("fewer than two options")
+    if len(set(letters)) != len(letters):
+        problems.append("duplicate option letters")
+
+    correct = question.get("correct") or []
+    if not correct:
+        problems.append("no correct answer")
+    elif not set(correct) <= set(letters):
+        problems.append(f"correct {correct} not among options {letters}")
+
+    kind = question.get("type")
+    if kind not in ("single", "multiple"):
+        problems.append(f"unknown type {kind!r}")
+    elif kind == "single" and len(correct) != 1:
+        problems.append(f"single-answer question with {len(correct)} correct answers")
+
+    if not all(isinstance(image, str) for image in question.get("images", [])):
+        problems.append("non-string image entry")
+    return problems
+
+
+def validate_bank(path):
+    """Yield (quiz name, code, problem) while streaming; returns question count via StopIteration."""
+    seen = set()  # codes only; bounded by the number of questions, not their size
+    name = None
+    quiz_count = 0
+    total = 0
+    meta = {}
+    for kind, key, value in stream_events(path):
+        if kind == "meta":
+            meta[key] = value
+        elif kind == "quiz":
+            name = value.get("name")
+            quiz_count = 0
+        elif kind == "question":
+            quiz_count += 1
+            total += 1
+            code = value.get("code")
+            for problem in validate_question(value):
+                yield name, code, problem
+            if code in seen:
+                yield name, code, "duplicate code"
+            seen.add(code)
+        elif "totalQuestions" in value and value["totalQuestions"] != quiz_count:
+            yield name, None, f"totalQuestions {value['totalQuestions']} but {quiz_count} questions"
+
+    for quiz_name, count in (meta.get("selection") or {}).items():
+        if not isinstance(count, int) or count < 0:
+            yield quiz_name, None, f"bad selection count {count!r}"
+    return total
+
+
+def write_chunks(path, out_dir, size=10000, prefix="questions"):
+    """Split the bank into JSONL files of `size` {"quiz", "question"} records."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    f = None
+    written = 0
+    try:
+        for quiz_name, question in iter_questions(path):
+            if written % size == 0:
+                if f:
+                    f.close()
+                    os.replace(f.name, paths[-1])
+                paths.append(os.path.join(out_dir, f"{prefix}-{len(paths):05d}.jsonl"))
+                f = open(paths[-1] + ".tmp", "w", encoding="utf-8")
+            f.write(json.dumps({"quiz": quiz_name, "question": question}, ensure_ascii=False) + "\n")
+            written += 1
+    finally:
+        if f:
+            f.close()
+            os.replace(f.name, paths[-1])
+    return paths
+
+
+def strip_images(question):
+    return {**question, "images": []}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream-process a quizzes[].questions[] bank.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    validate = sub.add_parser("validate", help="check every question")
+    validate.add_argument("path", nargs="?", default=QUIZ_DATA)
+
+    copy = sub.add_parser("copy", help="rewrite the bank, optionally transformed")
+    copy.add_argument("src")
+    copy.add_argument("dst")
+    copy.add_argument("--strip-images", action="store_true")
+
+    chunks = sub.add_parser("chunks", help="split into JSONL chunks")
+    chunks.add_argument("path")
+    chunks.add_argument("out_dir")
+    chunks.add_argument("--size", type=int, default=10000)
+
+    args = parser.parse_args()
+
+    if args.command == "validate":
+        problems = validate_bank(args.path)
+        count = 0
+        while True:
+            try:
+                quiz_name, code, problem = next(problems)
+            except StopIteration as stop:
+                total = stop.value
+                break
+            count += 1
+            print(f"  {quiz_name} {code or '-'}: {problem}")
+        print(f"\n{total} questions, {count} problems")
+    elif args.command == "copy":
+        total = transform_bank(args.src, args.dst, strip_images if args.strip_images else None)
+        print(f"Wrote {total} questions to {args.dst}")
+    else:
+        paths = write_chunks(args.path, args.out_dir, args.size)
+        print(f"Wrote {len(paths)} chunks to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
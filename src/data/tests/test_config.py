@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+import manual_corpus
+import pipeline_profile
+from query_cache import QueryCache
+
+
+def test_cache_subdirectories_follow_the_configured_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(manual_corpus, "CACHE_DIR", str(tmp_path))
+    assert QueryCache().directory == os.path.join(str(tmp_path), "queries")
+    assert pipeline_profile.profile_dir() == os.path.join(str(tmp_path), "profiles")
+
+
+def test_missing_manuals_dir_points_at_the_config(monkeypatch):
+    monkeypatch.setattr(manual_corpus, "_MANUALS_DIR", None)
+    with pytest.raises(SystemExit, match="fcom_config.json"):
+        manual_corpus.FCOM1_PDF
+    monkeypatch.setattr(manual_corpus, "_MANUALS_DIR", "/manuals")
+    assert manual_corpus.FCOM1_PDF == os.path.join("/manuals", "A220-300_FCOM1.pdf")
+
+
+def test_optional_manuals_dir_is_none_when_unset(monkeypatch):
+    monkeypatch.setattr(manual_corpus, "_MANUALS_DIR", None)
+    assert manual_corpus.configured_manuals_dir(required=False) is None
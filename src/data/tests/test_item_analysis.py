@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from item_analysis import bank_masks, progress_answers, read_columns  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "a220_quiz_progress.jsonl")
+
+
+def test_progress_answers_are_keyed_by_position_in_the_saved_questions():
+    record = {"questions": [{"code": "01GEN10"}, {"code": "PERF06"}],
+              "selectedAnswers": {"0": ["c"], "1": ["b"], "7": ["a"]}}
+    assert progress_answers(record) == ({"01GEN10": ["c"], "PERF06": ["b"]}, 1)
+
+
+def test_read_columns_maps_app_progress_export_to_codes():
+    codes, correct_masks, _ = bank_masks()
+    code_index = {code: i for i, code in enumerate(codes)}
+    questions, masks, attempts, skipped = read_columns(FIXTURE, code_index)
+
+    assert [codes[i] for i in questions] == ["01GEN10", "PERF06"]
+    assert list(masks) == [0b100, 0b010]
+    assert list(attempts) == [0, 0]
+    assert skipped == 1
+    # 01GEN10 answered correctly (c), PERF06 wrongly (b, correct is d)
+    assert list(masks == correct_masks[questions]) == [True, False]
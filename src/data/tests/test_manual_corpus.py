@@ -0,0 +1,31 @@
+from manual_corpus import ManualCorpus, build_page_index
+from page_corpus import PageCorpus, write_corpus
+from query_cache import QueryCache
+
+PAGES = [
+    "APU BLEED\nAPU start sequence",
+    "Set FLAP 50 for approach",
+    "AP engaged\nflap 5 selected",
+]
+
+
+def _manual(tmp_path):
+    path = str(tmp_path / "T.corpus")
+    write_corpus(path, PAGES, "sha")
+    corpus = ManualCorpus(cache_dir=str(tmp_path), query_cache=QueryCache(str(tmp_path / "queries"), disk=False))
+    corpus.documents["T"] = {"pdf": "T", "sha1": "sha", "pages": PageCorpus(path), "index": build_page_index(PAGES)}
+    return corpus
+
+
+def test_search_matches_substrings_across_token_boundaries(tmp_path):
+    corpus = _manual(tmp_path)
+    assert [m["page"] for m in corpus.search("AP", context_lines=0)] == [1, 1, 2, 3, 3]
+    assert [m["context"] for m in corpus.search("flap 5", context_lines=0)] == [
+        "Set FLAP 50 for approach", "flap 5 selected"]
+
+
+def test_whole_word_search_uses_the_token_index(tmp_path):
+    corpus = _manual(tmp_path)
+    assert corpus.candidate_pages("T", "AP", whole_words=True) == [3]
+    assert [m["context"] for m in corpus.search("AP", context_lines=0, whole_words=True)] == ["AP engaged"]
+    assert [m["page"] for m in corpus.search("flap 5", context_lines=0, whole_words=True)] == [3]
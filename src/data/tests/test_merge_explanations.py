@@ -0,0 +1,61 @@
+import json
+import os
+
+from merge_explanations import CURATED, ExplanationMerger
+
+
+def test_rebuild_is_a_no_op_on_checked_in_files():
+    merger = ExplanationMerger().load()
+    assert merger.rebuild() == set()
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _merger(tmp_path, merged, files):
+    merged_path = tmp_path / "merged.json"
+    _write(merged_path, {"explanations": merged})
+    paths = []
+    for name, entries in files.items():
+        paths.append(str(tmp_path / name))
+        _write(paths[-1], entries)
+    merger = ExplanationMerger(merged_path=str(merged_path))
+    return merger.load(paths), paths
+
+
+def test_recorded_source_and_curated_entries_are_kept(tmp_path):
+    merger, _ = _merger(tmp_path, {
+        "02AIR01": {"explanation": "from chapter"},
+        "02AIR02": {"explanation": "edited in the merged file"},
+    }, {
+        "air_conditioning.json": {"02AIR01": {"explanation": "from chapter"},
+                                  "02AIR02": {"explanation": "draft"}},
+        "batch_01.json": {"02AIR01": {"explanation": "from batch"}},
+    })
+    assert merger.rebuild() == set()
+    assert merger.sources["02AIR01"].endswith("air_conditioning.json")
+    assert merger.sources["02AIR02"] == CURATED
+
+
+def test_edit_to_any_file_wins(tmp_path):
+    merger, paths = _merger(tmp_path, {"02AIR01": {"explanation": "from batch"}}, {
+        "air_conditioning.json": {"02AIR01": {"explanation": "draft"}},
+        "batch_01.json": {"02AIR01": {"explanation": "from batch"}},
+    })
+    _write(paths[0], {"02AIR01": {"explanation": "trainer's fix"}})
+    changed = merger.apply(merger.update_file(paths[0]))
+    assert changed == {"02AIR01"}
+    assert merger.merged["explanations"]["02AIR01"] == {"explanation": "trainer's fix"}
+
+
+def test_new_code_takes_most_recently_modified_file(tmp_path):
+    merger, paths = _merger(tmp_path, {}, {
+        "air_conditioning.json": {"02AIR05": {"explanation": "older"}},
+        "batch_01.json": {"02AIR05": {"explanation": "newer"}},
+    })
+    os.utime(paths[0], ns=(1_000_000_000, 1_000_000_000))
+    merger.mtimes[paths[0]] = 1_000_000_000
+    assert merger.rebuild() == {"02AIR05"}
+    assert merger.merged["explanations"]["02AIR05"] == {"explanation": "newer"}
@@ -0,0 +1,19 @@
+from page_corpus import PageCorpus, write_corpus
+
+
+def _corpus(tmp_path, pages):
+    path = str(tmp_path / "t.corpus")
+    write_corpus(path, pages, "sha")
+    return PageCorpus(path)
+
+
+def test_greedy_match_does_not_hide_matches_on_adjacent_pages(tmp_path):
+    with _corpus(tmp_path, ["x", "abc"]) as corpus:
+        assert [(page, m.group()) for page, m in corpus.finditer(rb"[a-z]+")] == [(1, b"x"), (2, b"abc")]
+
+
+def test_matches_stay_within_a_page(tmp_path):
+    with _corpus(tmp_path, ["APU BLE", "ED AIR", "APU BLEED"]) as corpus:
+        assert corpus.find_pages("bleed") == [3]
+        assert corpus.find_pages("apu", start_page=2) == [3]
+        assert [page for page, _ in corpus.finditer(rb"APU")] == [1, 3]
@@ -0,0 +1,39 @@
+import pytest
+
+from page_query import PositionalIndex, QuerySyntaxError, parse_query
+
+PAGES = [
+    "APU GEN switch off",
+    "switch APU GEN",
+    "APU BLEED valve closed",
+    "APU limitations table of contents",
+    "GEN 1 and APU start limits",
+]
+
+
+@pytest.fixture
+def index():
+    return PositionalIndex.build(PAGES)
+
+
+def test_phrase_near_is_measured_from_the_phrase_edges(index):
+    assert index.search('"APU GEN" NEAR/1 SWITCH') == [1, 2]
+    assert index.search('SWITCH NEAR/1 "APU GEN"') == [1, 2]
+    assert index.search("APU NEAR/1 SWITCH") == [2]
+
+
+def test_nested_near_keeps_the_whole_span(index):
+    assert index.search("(APU NEAR/1 GEN) NEAR/1 OFF") == []
+    assert index.search('"APU GEN" NEAR/2 OFF') == [1]
+
+
+def test_prefix_and_not(index):
+    assert index.search("LIMIT*") == [4, 5]
+    assert index.search('APU NOT "TABLE OF CONTENTS"') == [1, 2, 3, 5]
+    assert index.search("(BLEED OR LIMIT*) NOT START") == [3, 4]
+
+
+@pytest.mark.parametrize("query", ["", "(APU", "APU OR", '"  "', "NEAR/2 APU"])
+def test_syntax_errors(query):
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
@@ -0,0 +1,40 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from perf_generator import failure_factors, generate_old, generate_rwycc, generate_vref  # noqa: E402
+
+
+def test_catalog_includes_the_table_and_its_mirrors():
+    names = {name for name, _, _, _ in failure_factors()}
+    assert {"L ENG FAIL", "R ENG FAIL", "HYD 2 HI TEMP", "L ENG FIRE", "ICE DETECTED"} <= names
+
+
+def test_old_variants_are_distinct_and_capped():
+    catalog = failure_factors()
+    questions = generate_old(100000, np.random.default_rng(0), catalog)
+    keys = {(q["text"], tuple(q["correct"])) for q in questions}
+    assert len(keys) == len(questions) < 100000
+    # Two engine failures are never combined as "unrelated"
+    assert not any(q["text"].count("ENG F") > 1 for q in questions)
+
+
+def _tables():
+    from perf_tables import PerfTables
+
+    return PerfTables({
+        "vref": (np.array([40000.0, 50000.0]), np.array([5, 20]), np.array([[120.0, 115.0], [130.0, 125.0]])),
+        "runway_factors": (np.array([6, 5, 4, 3]), np.array([1.0, 1.2, 1.3, 1.5])),
+    }, {})
+
+
+def test_rwycc_variants_are_distinct_and_capped():
+    questions = generate_rwycc(100000, np.random.default_rng(0), _tables())
+    assert len(questions) == 4 * 81
+    assert len({q["text"] for q in questions}) == len(questions)
+
+
+def test_vref_variants_are_distinct_and_capped():
+    questions = generate_vref(100000, np.random.default_rng(0), _tables())
+    assert len(questions) == 1001 * 2
+    assert len({q["text"] for q in questions}) == len(questions)
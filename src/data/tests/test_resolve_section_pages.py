@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from resolve_section_pages import manual_aliases, manual_id, resolve_files
+
+
+@pytest.fixture(scope="module")
+def aliases():
+    return manual_aliases()
+
+
+@pytest.mark.parametrize("name, doc_id", [
+    ("FCOM1", "FCOM1"),
+    ("FCOM1 - APU System, SmartCockpit A220 APU Documentation", "FCOM1"),
+    ("A220-300 FCOM Vol 1", "FCOM1"),
+    ("A220-300_FCOM1", "FCOM1"),
+    ("Operations Manual", "OM"),
+    ("Operations Manual Part B / Aircraft Characteristics", "OM"),
+    ("Operations_Manual_Part_B_A220_TR027.6", "OM"),
+    ("A220 Operations Manual", "OM"),
+    ("SmartCockpit", None),
+    ("FCOMX", None),
+    (None, None),
+])
+def test_manual_names_map_to_document_ids(aliases, name, doc_id):
+    assert manual_id(name, aliases) == doc_id
+
+
+class FixedResolver:
+    def resolve(self, text, code):
+        return {"page": 42, "confidence": 0.9, "method": "heading", "matched": text} if text == "APU" else None
+
+
+def test_unknown_manuals_are_reported_apart_from_unmatched_headings(tmp_path, aliases):
+    path = tmp_path / "explanations.json"
+    path.write_text(json.dumps({"explanations": {
+        "04APU01": {"source": "A220-300 FCOM Vol 1", "page": "APU"},
+        "04APU02": {"sources": [{"pdf": "Operations Manual", "page": "Nothing like it"}]},
+        "04APU03": {"source": "SmartCockpit", "page": "APU"},
+    }}))
+    report = resolve_files([str(path)], {"FCOM1": FixedResolver(), "OM": FixedResolver()}, aliases=aliases)
+    assert [(r["code"], r["pdf"], r["page"]) for r in report["resolved"]] == [("04APU01", "FCOM1", 42)]
+    assert [(r["code"], r["pdf"], r["reason"]) for r in report["unresolved"]] == [
+        ("04APU02", "OM", "no matching heading")]
+    assert [(r["code"], r["source"]) for r in report["unknownManual"]] == [("04APU03", "SmartCockpit")]
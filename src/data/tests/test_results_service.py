@@ -0,0 +1,67 @@
+import json
+import sqlite3
+
+import pytest
+
+from results_service import export_attempts, open_db, parse_attempt
+
+
+def test_attempt_needs_question_count():
+    with pytest.raises(ValueError, match="totalQuestions"):
+        parse_attempt({"trainee": "T1", "answers": {"02AIR01": ["a"]}}, 0.0)
+    with pytest.raises(ValueError, match="less than"):
+        parse_attempt({"trainee": "T1", "answers": {"02AIR01": ["a"], "02AIR02": ["b"]},
+                       "totalQuestions": 1}, 0.0)
+
+
+def test_question_count_is_stored_and_exported(tmp_path):
+    db_path = str(tmp_path / "results.sqlite3")
+    row = parse_attempt({"trainee": "T1", "answers": {"02AIR01": "a"}, "questions": ["02AIR01", "02AIR02"]}, 1.0)
+    db = open_db(db_path)
+    with db:
+        db.execute("INSERT INTO attempts (trainee, quiz, submitted_at, received_at, time_used, score,"
+                   " total_questions, answers) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+    db.close()
+
+    out = tmp_path / "attempts.jsonl"
+    assert export_attempts(db_path, str(out)) == 1
+    assert json.loads(out.read_text())["totalQuestions"] == 2
+
+
+def test_old_store_gains_question_count_column(tmp_path):
+    db_path = str(tmp_path / "old.sqlite3")
+    db = sqlite3.connect(db_path)
+    db.execute("CREATE TABLE attempts (id INTEGER PRIMARY KEY, trainee TEXT NOT NULL, quiz TEXT,"
+               " submitted_at REAL NOT NULL, received_at REAL NOT NULL, time_used REAL, score REAL,"
+               " answers TEXT NOT NULL)")
+    db.close()
+    db = open_db(db_path)
+    assert "total_questions" in {row[1] for row in db.execute("PRAGMA table_info(attempts)")}
+    db.close()
+
+
+def _status(db_path, header):
+    """Status line the service answers a POST /attempts carrying the given Content-Length."""
+    import asyncio
+
+    from results_service import ResultsService
+
+    async def run():
+        service = ResultsService(db_path)
+        server = await asyncio.start_server(service.connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST /attempts HTTP/1.1\r\nHost: x\r\nContent-Length: {header}\r\n\r\n{{}}".encode())
+        status = (await reader.readline()).split(b" ")[1]
+        writer.close()
+        server.close()
+        await service.writer.close()
+        service.db.close()
+        return int(status)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("header, status", [("abc", 400), ("-1", 400), ("1e3", 400), ("99999999", 413)])
+def test_bad_content_length_is_rejected_before_reading(tmp_path, header, status):
+    assert _status(str(tmp_path / "results.sqlite3"), header) == status
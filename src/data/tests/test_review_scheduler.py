@@ -0,0 +1,52 @@
+import json
+
+from review_scheduler import DAY, START_EASE, Bank, TraineeState
+
+
+def _bank(tmp_path, chapters):
+    path = tmp_path / "quizData.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"quizzes": [
+            {"name": name, "questions": [{"code": code} for code in codes]} for name, codes in chapters.items()
+        ]}, f)
+    return Bank(str(path))
+
+
+def test_state_round_trips_on_the_same_bank(tmp_path):
+    bank = _bank(tmp_path, {"A": ["A1", "A2"], "B": ["B1"]})
+    state = TraineeState(bank, seed="T1")
+    state.record(bank.index["A2"], True, now=1000.0)
+    loaded = TraineeState.from_bytes(bank, state.to_bytes(), seed="T1")
+    assert list(loaded.due) == list(state.due)
+    assert list(loaded.tiebreak) == list(state.tiebreak)
+
+
+def test_state_is_remapped_by_code_when_the_bank_changes(tmp_path):
+    old_bank = _bank(tmp_path, {"A": ["A1", "A2", "A3"], "B": ["B1"]})
+    state = TraineeState(old_bank, seed="T1")
+    state.record(old_bank.index["A2"], True, now=1000.0)
+    state.record(old_bank.index["B1"], False, now=2000.0)
+    data = state.to_bytes()
+
+    # A1 removed, A0 added in front, chapters reordered
+    new_bank = _bank(tmp_path, {"B": ["B1"], "A": ["A0", "A2", "A3"]})
+    loaded = TraineeState.from_bytes(new_bank, data, seed="T1")
+    assert len(loaded.due) == 4
+    assert loaded.due[new_bank.index["A2"]] == state.due[old_bank.index["A2"]]
+    assert loaded.reps[new_bank.index["A2"]] == 1
+    assert loaded.due[new_bank.index["B1"]] == state.due[old_bank.index["B1"]]
+    assert loaded.lapses[new_bank.index["B1"]] == 1
+    assert loaded.due[new_bank.index["A0"]] == 0.0
+    assert loaded.ease[new_bank.index["A0"]] == START_EASE
+    assert loaded.reps[new_bank.index["A3"]] == 0
+    assert new_bank.codes[loaded.next_due(1, now=2000.0)[0]] in ("A0", "A3")
+
+
+def test_re_recording_at_the_same_time_does_not_duplicate_an_item(tmp_path):
+    bank = _bank(tmp_path, {"A": ["A1", "A2", "A3"], "B": ["B1"]})
+    state = TraineeState(bank, seed="T1")
+    state.next_due(4, now=0.0)  # heaps built before the answers
+    state.record(bank.index["A2"], False, now=1000.0)
+    state.record(bank.index["A2"], False, now=1000.0)
+    drawn = state.next_due(10, now=1000.0 + DAY)
+    assert sorted(drawn) == sorted(set(drawn)) == [0, 1, 2, 3]
@@ -0,0 +1,16 @@
+from xref_graph import reference_targets
+
+
+def test_ref_abbreviation_is_a_cue():
+    assert reference_targets("Landing distance: REF. 05-01-3 applies.") == ["05-01-3"]
+
+
+def test_target_must_follow_the_cue():
+    assert reference_targets("See table 10-12 for the corrections.") == []
+    assert reference_targets("Refer to the procedure, then check 04-02-10.") == []
+
+
+def test_connecting_words_titles_and_lists():
+    assert reference_targets("SEE ALSO CHAPTER 31-10") == ["31-10"]
+    assert reference_targets("see Air Conditioning, 04−02") == ["04-02"]
+    assert reference_targets("Refer to FCOM 04-02-10 and 04-03, 21-30.") == ["04-02-10", "04-03", "21-30"]
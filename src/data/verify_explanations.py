@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Check that each explanation is backed by the manual page it cites.
+
+For every explanation (explanations/*.json resolved as merge_explanations.py
+does, over src/data/explanations.json) the key terms are pulled out:
+numbers, acronyms and other words that are not stopwords, each weighted by
+how rare it is in the manual (inverse page frequency), plus adjacent-word
+phrases. A page's evidence is the weighted share of those terms it contains
+(phrases found verbatim count again), computed from the manual's token ->
+pages index and the cached page text, never from the PDF. Pages the cited
+page refers to (xref_graph.py) are always weighed as alternatives, however
+few of the rarest terms they share.
+
+    supported   the cited page holds at least SUPPORTED of the evidence
+    weak        it holds less, and no other page does much better
+    misplaced   another page holds clearly more; it is suggested
+    unverified  no cited page, or the cited manual is not available
+
+Explanations are checked in chunks across a process pool. The report also
+lists pages cited by suspiciously many questions (e.g. every 02AIR
+question citing the chapter's first page).
+
+    python3 verify_explanations.py
+    python3 verify_explanations.py --code 02AIR14 --code 02AIR15
+"""
+
+import argparse
+import json
+import math
+import os
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pipeline_profile
+from explanation_data import load_json
+from manual_corpus import CACHE_DIR, PAGE_REFERENCES, ManualCorpus, tokenize
+from merge_explanations import ExplanationMerger, flatten_entry
+from page_corpus import PageCorpus
+from xref_graph import load_xref_graph
+
+REPORT_PATH = os.path.join(CACHE_DIR, "verify_report.json")
+
+SUPPORTED = 0.5
+BETTER_BY = 1.5
+SUGGESTIONS = 3
+MAX_TERMS = 25
+NUMBER_WEIGHT = 2.0
+CROWDED_PAGE = 10
+
+STOPWORDS = set("""
+A AN AND ARE AS AT BE BEEN BEING BUT BY CAN COULD DO DOES EACH FOR FROM HAS HAVE IF IN INTO IS IT ITS
+MAY MUST NO NOT OF ON ONE ONLY OR OTHER SO SUCH THAN THAT THE THEIR THEM THEN THERE THESE THEY THIS
+THOSE TO TWO UNDER UP WAS WHEN WHERE WHICH WHILE WILL WITH WITHIN WOULD ALSO ALL ANY BOTH
+SYSTEM PROVIDES ENSURE ENSURES ENSURING USED USES USING DESIGNED CORRECT ANSWER REFERENCE OPTION
+OPTIONS QUESTION THEREFORE BECAUSE HOWEVER PROPER MAINTAINING MAINTAIN WHETHER
+""".split())
+
+_documents = {}
+
+
+def key_terms(text):
+    """(terms, phrases) of an explanation: tokens worth finding and adjacent pairs of them."""
+    tokens = tokenize(text)
+    terms = []
+    phrases = set()
+    previous = None
+    for token in tokens:
+        if token not in STOPWORDS and (len(token) >= 3 or not token.isalpha()):
+            terms.append(token)
+            if previous is not None:
+                phrases.add((previous, token))
+            previous = token
+        else:
+            previous = None
+    return list(dict.fromkeys(terms)), phrases
+
+
+def _init_worker(documents):
+    """Index and corpus path of each manual, handed to the worker once."""
+    _documents.update(documents)
+
+
+@lru_cache(maxsize=4096)
+def page_bigrams(doc_id, page):
+    words = tokenize(_pages(doc_id).page_text(page))
+    return set(zip(words, words[1:]))
+
+
+@lru_cache(maxsize=None)
+def _pages(doc_id):
+    return PageCorpus(_documents[doc_id]["corpus"])
+
+
+def _on_page(postings, page):
+    i = bisect_left(postings, page)
+    return i < len(postings) and postings[i] == page
+
+
+def weigh(doc_id, terms):
+    """term -> weight in one manual (terms the manual never uses are left out)."""
+    doc = _documents[doc_id]
+    page_count = doc["page_count"]
+    weights = {}
+    for term in terms:
+        postings = doc["index"].get(term)
+        if not postings:
+            continue
+        weight = math.log((page_count + 1) / (len(postings) + 1))
+        weights[term] = weight * (NUMBER_WEIGHT if any(c.isdigit() for c in term) else 1.0)
+    # Rarest terms carry the evidence; very common ones only dilute it
+    return dict(sorted(weights.items(), key=lambda item: -item[1])[:MAX_TERMS])
+
+
+def page_scores(doc_id, weights):
+    """page -> summed weight of the terms on it, from the postings."""
+    scores = Counter()
+    index = _documents[doc_id]["index"]
+    for term, weight in weights.items():
+        for page in index[term]:
+            scores[page] += weight
+    return scores
+
+
+def evidence(doc_id, page, weights, term_score, phrases):
+    """Share of the claim found on a page: term weight plus verbatim phrases."""
+    total = sum(weights.values())
+    if not total:
+        return 0.0
+    wanted = [p for p in phrases if p[0] in weights and p[1] in weights]
+    if not wanted:
+        return term_score / total
+    found = page_bigrams(doc_id, page)
+    phrase_share = sum(1 for p in wanted if p in found) / len(wanted)
+    return 0.75 * term_score / total + 0.25 * phrase_share
+
+
+def verify_one(code, text, cited):
+    terms, phrases = key_terms(text)
+    result = {"code": code, "cited": [], "suggested": []}
+    docs = [ref["pdf"] for ref in cited if ref.get("pdf") in _documents]
+    if not docs:
+        result["verdict"] = "unverified"
+        return result
+
+    best_cited = 0.0
+    candidates = []
+    for doc_id in dict.fromkeys(docs):
+        weights = weigh(doc_id, terms)
+        scores = page_scores(doc_id, weights)
+        for ref in cited:
+            if ref.get("pdf") == doc_id:
+                share = evidence(doc_id, ref["page"], weights, scores.get(ref["page"], 0.0), phrases)
+                missing = [t for t in weights if not _on_page(_documents[doc_id]["index"][t], ref["page"])]
+                result["cited"].append({"pdf": doc_id, "page": ref["page"], "evidence": round(share, 3),
+                                        "missing": missing[:8]})
+                best_cited = max(best_cited, share)
+        pages = dict.fromkeys(page for page, _ in scores.most_common(SUGGESTIONS * 3))
+        related = _documents[doc_id]["related"]
+        for ref in cited:
+            if ref.get("pdf") == doc_id:
+                pages.update(dict.fromkeys(related.get(ref["page"], ())))
+        for page in pages:
+            candidates.append((evidence(doc_id, page, weights, scores.get(page, 0.0), phrases), doc_id, page))
+
+    cited_pages = {(ref.get("pdf"), ref.get("page")) for ref in cited}
+    candidates.sort(reverse=True)
+    for share, doc_id, page in candidates:
+        if (doc_id, page) in cited_pages or len(result["suggested"]) >= SUGGESTIONS:
+            continue
+        if share >= SUPPORTED and share > best_cited * BETTER_BY:
+            result["suggested"].append({"pdf": doc_id, "page": page, "evidence": round(share, 3)})
+
+    if best_cited >= SUPPORTED:
+        result["verdict"] = "supported"
+    elif result["suggested"]:
+        result["verdict"] = "misplaced"
+    else:
+        result["verdict"] = "weak"
+    return result
+
+
+def _verify_chunk(items):
+    with pipeline_profile.worker_profile(f"verify {items[0][0]}-{items[-1][0]}") as profile:
+        with pipeline_profile.stage("verify"):
+            results = [verify_one(code, text, cited) for code, text, cited in items]
+    return results, profile.to_dict()
+
+
+def load_explanations(codes=None):
+    """code -> explanation text: the merged file, overridden by the explanation files."""
+    merger = ExplanationMerger().load()
+    explanations = {code: flatten_entry(entry) for code, entry in merger.merged.get("explanations", {}).items()}
+    for code in merger.all_codes():
+        explanations[code] = merger.resolve(code)
+    texts = {}
+    for code, entry in explanations.items():
+        text = entry.get("explanation") if isinstance(entry, dict) else None
+        if isinstance(text, str) and text.strip() and (not codes or code in codes):
+            texts[code] = text
+    return texts
+
+
+def crowded_pages(references):
+    """(pdf, page, codes) for pages cited by more than CROWDED_PAGE questions."""
+    by_page = {}
+    for code, ref in references.items():
+        for page in ref.get("pages", []):
+            by_page.setdefault((page.get("pdf"), page.get("page")), []).append(code)
+    return sorted(
+        ((pdf, page, sorted(codes)) for (pdf, page), codes in by_page.items() if len(codes) > CROWDED_PAGE),
+        key=lambda item: -len(item[2]),
+    )
+
+
+def verify(codes=None, workers=None, chunk_size=40):
+    references = load_json(PAGE_REFERENCES).get("references", {})
+    texts = load_explanations(codes)
+
+    corpus = ManualCorpus.from_page_references().build()
+    documents = {}
+    for doc_id, doc in corpus.documents.items():
+        graph = load_xref_graph(doc)
+        documents[doc_id] = {
+            "index": doc["index"], "corpus": doc["corpus"], "page_count": len(doc["pages"]),
+            "related": {page: graph.related(page) for page in graph.hoods},
+        }
+
+    items = [(code, texts[code], references.get(code, {}).get("pages", [])) for code in sorted(texts)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(documents,)) as pool:
+        futures = [pool.submit(_verify_chunk, items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+        for future in futures:
+            chunk, profile = future.result()
+            pipeline_profile.merge(profile)
+            results.extend(chunk)
+    return results, crowded_pages({code: references[code] for code in texts if code in references})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check explanations against the pages they cite.")
+    parser.add_argument("--code", action="append", help="only this question (repeatable)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    with pipeline_profile.profiled_run("verify_explanations"):
+        results, crowded = verify(set(args.code) if args.code else None, args.workers)
+
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump({
+            "results": results,
+            "crowdedPages": [{"pdf": pdf, "page": page, "codes": codes} for pdf, page, codes in crowded],
+        }, f, indent=2, ensure_ascii=False)
+
+    verdicts = Counter(result["verdict"] for result in results)
+    print("\n" + "=" * 80)
+    print(f"Explanations checked: {len(results)}")
+    for verdict in ("supported", "weak", "misplaced", "unverified"):
+        print(f"  {verdict:11s} {verdicts.get(verdict, 0)}")
+    print("=" * 80)
+    for result in results:
+        if result["verdict"] == "misplaced":
+            cited = ", ".join(f"{c['pdf']} p.{c['page']} ({c['evidence']:.2f})" for c in result["cited"])
+            better = ", ".join(f"{s['pdf']} p.{s['page']} ({s['evidence']:.2f})" for s in result["suggested"])
+            print(f"  {result['code']:10s} cites {cited} -> try {better}")
+    for pdf, page, codes in crowded:
+        print(f"  {pdf} p.{page} is cited by {len(codes)} questions ({codes[0]} ... {codes[-1]})")
+    print(f"\nReport saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Cross-reference graph of a manual's sections, built at index time.
+
+FCOM text points at other sections all the time ("Refer to 04−02−10",
+"see Air Conditioning, 04−02"). Every such reference is pulled out of the
+cached page text and turned into an edge from the page it is printed on to
+the page it names:
+
+    04−02−10    the page carrying that marker (resolve_section_pages'
+                page-marker index)
+    04−02       the first page of that section
+
+The graph keeps both directions and, for every page, its neighbourhood up
+to MAX_HOPS references away, so widening a candidate page to the sections
+it refers to (or that refer to it) is a dictionary lookup. It is cached per
+corpus sha1 in .fcom_cache/<PDF ID>.xref.json.
+
+    python3 xref_graph.py                       # build for every manual
+    python3 xref_graph.py --pdf FCOM1 --page 143 --hops 2
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import deque
+
+from manual_corpus import CACHE_DIR, ManualCorpus
+from resolve_section_pages import MARKER_RE, build_heading_index, normalize_marker
+
+MAX_HOPS = 2
+# Bumped when reference matching changes, so cached graphs are rebuilt
+GRAPH_VERSION = 2
+
+# No \b after "REF.": there is no word boundary between "." and a space
+CUE_RE = re.compile(r"\b(?:REFER\s+TO|REFER|SEE)\b|\bREF\.", re.IGNORECASE)
+TARGET_RE = re.compile(r"\b(\d{2})\s*[−–-]\s*(\d{2})(?:\s*[−–-]\s*(\d{1,3}))?\b")
+# Between a cue and its first target only connecting words and a section
+# title ending in a comma may stand ("see also chapter 04-02", "see Air
+# Conditioning, 04-02"); "see table 10-12" names no section
+LEAD_RE = re.compile(
+    r"\s*(?:(?:ALSO|THE|TO|IN|CHAPTER|CHAP\.|SECTION|SECT\.|PAGE|PARAGRAPH|PARA\.|FCOM|QRH|FCTM)\s+)*"
+    r"(?:[A-Z][^,.;:()\n\d]{0,40},\s*)?",
+    re.IGNORECASE,
+)
+# Further targets of the same reference: "04-02-10 and 04-03", "04-02, 04-05"
+SEPARATOR_RE = re.compile(r"\s*(?:,|;|&|\band\b|\bor\b)\s*", re.IGNORECASE)
+
+
+def section_of(marker):
+    """"04-02-10" -> "04-02"."""
+    return marker.rsplit("-", 1)[0]
+
+
+def reference_targets(text):
+    """Markers ("04-02-10") and sections ("04-02") referred to in a page's text."""
+    targets = []
+    for cue in CUE_RE.finditer(text):
+        position = LEAD_RE.match(text, cue.end()).end()
+        while True:
+            target = TARGET_RE.match(text, position)
+            if not target:
+                break
+            chapter, section, page = target.groups()
+            if page:
+                targets.append(normalize_marker(chapter, section, page))
+            else:
+                targets.append(f"{int(chapter):02d}-{int(section):02d}")
+            separator = SEPARATOR_RE.match(text, target.end())
+            if not separator:
+                break
+            position = separator.end()
+    return list(dict.fromkeys(targets))
+
+
+def section_starts(markers):
+    """Section ("04-02") -> first page carrying one of its markers."""
+    starts = {}
+    for marker, page in markers.items():
+        section = section_of(marker)
+        if section not in starts or page < starts[section]:
+            starts[section] = page
+    return starts
+
+
+def neighbourhoods(edges, reverse, max_hops=MAX_HOPS):
+    """page -> {neighbour: hops} within max_hops, following references both ways."""
+    hoods = {}
+    for start in set(edges) | set(reverse):
+        seen = {start: 0}
+        queue = deque([start])
+        while queue:
+            page = queue.popleft()
+            if seen[page] == max_hops:
+                continue
+            for neighbour in edges.get(page, []) + reverse.get(page, []):
+                if neighbour not in seen:
+                    seen[neighbour] = seen[page] + 1
+                    queue.append(neighbour)
+        del seen[start]
+        hoods[start] = seen
+    return hoods
+
+
+class XrefGraph:
+    """Page-level reference graph of one manual with precomputed neighbourhoods."""
+
+    def __init__(self, data):
+        self.sha1 = data["sha1"]
+        self.max_hops = data["maxHops"]
+        self.markers = data["markers"]
+        self.sections = data["sections"]
+        self.dangling = data["dangling"]
+        self.edges = {int(page): targets for page, targets in data["edges"].items()}
+        self.reverse = {int(page): sources for page, sources in data["reverse"].items()}
+        self.hoods = {
+            int(page): {int(n): hops for n, hops in hood.items()} for page, hood in data["hoods"].items()
+        }
+
+    @classmethod
+    def build(cls, doc, markers, max_hops=MAX_HOPS):
+        """Graph of one indexed manual (ManualCorpus document) given its page markers."""
+        sections = section_starts(markers)
+        edges = {}
+        dangling = {}
+        for page_num, text in enumerate(doc["pages"], 1):
+            targets = set()
+            for target in reference_targets(text):
+                page = markers.get(target) or sections.get(target)
+                if page is None:
+                    dangling.setdefault(target, []).append(page_num)
+                elif page != page_num:
+                    targets.add(page)
+            if targets:
+                edges[page_num] = sorted(targets)
+
+        reverse = {}
+        for page, targets in edges.items():
+            for target in targets:
+                reverse.setdefault(target, []).append(page)
+
+        return cls({
+            "sha1": doc["sha1"],
+            "maxHops": max_hops,
+            "markers": markers,
+            "sections": sections,
+            "dangling": dangling,
+            "edges": edges,
+            "reverse": reverse,
+            "hoods": neighbourhoods(edges, reverse, max_hops),
+        })
+
+    def to_dict(self):
+        return {
+            "sha1": self.sha1, "maxHops": self.max_hops, "markers": self.markers,
+            "sections": self.sections, "dangling": self.dangling,
+            "edges": self.edges, "reverse": self.reverse, "hoods": self.hoods,
+        }
+
+    def refers_to(self, page):
+        """Pages the given page refers to."""
+        return self.edges.get(page, [])
+
+    def referred_from(self, page):
+        """Pages that refer to the given page."""
+        return self.reverse.get(page, [])
+
+    def related(self, page, hops=1):
+        """Pages within `hops` references of a page (either direction), nearest first."""
+        if hops > self.max_hops:
+            raise ValueError(f"neighbourhoods were built up to {self.max_hops} hops")
+        hood = self.hoods.get(page, {})
+        return sorted((n for n, d in hood.items() if d <= hops), key=lambda n: (hood[n], n))
+
+    def widen(self, pages, hops=1):
+        """Candidate pages plus everything within `hops` references of them."""
+        widened = dict.fromkeys(pages)
+        for page in pages:
+            widened.update(dict.fromkeys(self.related(page, hops)))
+        return list(widened)
+
+    def page_for(self, reference):
+        """PDF page of a marker ("04-02-10") or section ("04-02") reference."""
+        match = MARKER_RE.fullmatch(reference.strip())
+        if match:
+            return self.markers.get(normalize_marker(*match.groups()))
+        match = TARGET_RE.fullmatch(reference.strip())
+        return self.sections.get(f"{int(match.group(1)):02d}-{int(match.group(2)):02d}") if match else None
+
+
+def load_xref_graph(doc, cache_dir=CACHE_DIR, max_hops=MAX_HOPS):
+    """Cross-reference graph of an indexed manual, rebuilt when its corpus changes."""
+    cache_path = os.path.join(cache_dir, f"{doc['pdf']}.xref.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if (cached.get("sha1") == doc["sha1"] and cached.get("maxHops") == max_hops
+                and cached.get("version") == GRAPH_VERSION):
+            return XrefGraph(cached)
+
+    markers = build_heading_index(doc, cache_dir)["markers"]
+    graph = XrefGraph.build(doc, markers, max_hops)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**graph.to_dict(), "version": GRAPH_VERSION}, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the section cross-reference graph of each manual.")
+    parser.add_argument("--pdf", action="append", help="only this manual (repeatable)")
+    parser.add_argument("--page", type=int, help="show the pages related to this page")
+    parser.add_argument("--hops", type=int, default=1)
+    parser.add_argument("--max-hops", type=int, default=MAX_HOPS, help="neighbourhood depth to precompute")
+    args = parser.parse_args()
+
+    corpus = ManualCorpus.from_page_references()
+    if args.pdf:
+        for doc_id in list(corpus.manuals):
+            if doc_id not in args.pdf:
+                del corpus.manuals[doc_id]
+    corpus.build()
+
+    print("\n" + "=" * 80)
+    for doc_id, doc in corpus.documents.items():
+        graph = load_xref_graph(doc, max_hops=args.max_hops)
+        edge_count = sum(len(targets) for targets in graph.edges.values())
+        print(f"{doc_id}: {edge_count} references between {len(set(graph.edges) | set(graph.reverse))} pages, "
+              f"{len(graph.dangling)} unresolved targets")
+
+        if args.page:
+            print(f"  p.{args.page} refers to:     {graph.refers_to(args.page)}")
+            print(f"  p.{args.page} referred from: {graph.referred_from(args.page)}")
+            print(f"  within {args.hops} hop(s):    {graph.related(args.page, args.hops)}")
+
+
+if __name__ == "__main__":
+    main()
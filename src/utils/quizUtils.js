@@ -359,3 +359,85 @@ export const generateSeededQuizSets = (quizData, questionsPerQuiz = 100, seed =
 
   return quizSets;
 };
+
+/**
+ * Fetch a static JSON asset once; concurrent and later calls share the request
+ * @param {string} url - Asset URL
+ * @returns {Promise<Object>} - Parsed JSON
+ */
+const jsonAssets = {};
+const fetchJsonOnce = (url) => {
+  if (!jsonAssets[url]) {
+    jsonAssets[url] = fetch(url)
+      .then((response) => {
+        if (!response.ok) throw new Error(`Request for ${url} failed: ${response.status}`);
+        return response.json();
+      })
+      .catch((error) => {
+        delete jsonAssets[url];
+        throw error;
+      });
+  }
+  return jsonAssets[url];
+};
+
+/**
+ * Load the prebuilt keyword index (public/search_index.json, built by
+ * src/data/build_search_index.py)
+ * @param {string} url - Where the index is served from
+ * @returns {Promise<Object>} - The search index
+ */
+export const loadSearchIndex = (url = '/search_index.json') => fetchJsonOnce(url);
+
+/**
+ * Load the pre-rendered source page manifest (public/pages/manifest.json,
+ * built by src/data/render_source_pages.py)
+ * @param {string} url - Where the manifest is served from
+ * @returns {Promise<Object>} - {pages: {pdf: {page: {image, width, height, snippet}}}}
+ */
+export const loadSourcePages = (url = '/pages/manifest.json') => fetchJsonOnce(url);
+
+/**
+ * Split text into the uppercase alphanumeric tokens used by the index
+ * @param {string} text - Text to tokenize
+ * @returns {Array} - Tokens
+ */
+export const tokenizeSearch = (text) => (text || '').toUpperCase().match(/[A-Z0-9]+/g) || [];
+
+/**
+ * Find question codes matching every query token as a term prefix
+ * Each token costs a binary search in the sorted term table plus a walk
+ * over the terms sharing that prefix
+ * @param {Object} index - Index from loadSearchIndex()
+ * @param {string} query - Keywords, e.g. "IASC" or "waiv"
+ * @returns {Array} - Matching question codes in bank order
+ */
+export const searchIndex = (index, query) => {
+  const { terms, offsets, postings, codes } = index;
+  let result = null;
+
+  for (const token of tokenizeSearch(query)) {
+    // Lower bound: first term >= token
+    let lo = 0;
+    let hi = terms.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (terms[mid] < token) lo = mid + 1;
+      else hi = mid;
+    }
+
+    const matches = new Set();
+    for (let i = lo; i < terms.length && terms[i].startsWith(token); i++) {
+      let position = 0;
+      for (let p = offsets[i]; p < offsets[i + 1]; p++) {
+        position += postings[p];
+        if (!result || result.has(position)) matches.add(position);
+      }
+    }
+    result = matches;
+    if (result.size === 0) break;
+  }
+
+  if (!result) return [];
+  return [...result].sort((a, b) => a - b).map((position) => codes[position]);
+};